@@ -1,11 +1,21 @@
 #!/bin/sh
 
-# Migrate
+# Migrate. Migrations are part of the code, they are not generated here.
 cd sport_league
-python manage.py makemigrations
-python manage.py migrate
+python manage.py migrate --noinput
+# Table of the database cache, the default cache of the production profile
+python manage.py createcachetable
 
 # Compile messages
 #python manage.py compilemessages
 
+# Without a command, serve the application as selected by SERVER_PROFILE.
+if [ "$#" -eq 0 ]; then
+    if [ "${SERVER_PROFILE:-development}" = "production" ]; then
+        set -- gunicorn --config gunicorn.conf.py
+    else
+        set -- python manage.py runserver 0.0.0.0:8000
+    fi
+fi
+
 exec "$@"
@@ -1,7 +1,132 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.shortcuts import redirect
+from django.urls import path
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_POST
 
+from .bulk import delete_games, delete_teams
+from .cache import bump_league_version
 from .models import Game, Team, User
+from .pagination import EstimatedCountPaginator
+from .ratings import rebuild_ratings
+from .snapshots import refresh_snapshots
+from .standings import rebuild_standings
 
 admin.site.register(User)
-admin.site.register(Game)
-admin.site.register(Team)
+
+
+class PrefixSearchMixin:
+    """
+    Matches the whole search term as a case-insensitive prefix of the ``^``
+    search fields, e.g. "team 1" finds the names starting with "Team 1",
+    rather than Django's default of matching every word of the term
+    separately.
+
+    The prefix is matched with ``startswith`` on ``LOWER(field)``, the
+    expression of the field's index. Fields of related models, e.g.
+    ``^home_team__name``, match the rows whose relation is in a subquery of
+    the matching related rows.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        query = Q()
+        for field in self.get_search_fields(request):
+            *path, name = field.lstrip("^").split("__")
+            alias = f"{name}_search"
+            lookup = {f"{alias}__startswith": search_term.lower()}
+            if not path:
+                queryset = queryset.alias(**{alias: Lower(name)})
+                query |= Q(**lookup)
+                continue
+            model = queryset.model
+            for part in path:
+                model = model._meta.get_field(part).related_model
+            matches = model._default_manager.alias(**{alias: Lower(name)})
+            query |= Q(
+                **{f"{'__'.join(path)}__in": matches.filter(**lookup).values("pk")}
+            )
+        return queryset.filter(query), False
+
+
+@admin.register(Team)
+class TeamAdmin(PrefixSearchMixin, admin.ModelAdmin):
+    list_display = ["name", "id"]
+    ordering = ["name"]
+    search_fields = ["^name"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, Team.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        delete_teams(queryset)
+
+
+@admin.register(Game)
+class GameAdmin(PrefixSearchMixin, admin.ModelAdmin):
+    list_display = [
+        "id",
+        "home_team",
+        "home_team_score",
+        "away_team",
+        "away_team_score",
+        "round",
+        "played_at",
+    ]
+    list_select_related = ["home_team", "away_team"]
+    autocomplete_fields = ["home_team", "away_team"]
+    search_fields = ["^home_team__name", "^away_team__name"]
+    ordering = ["-id"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_deleted_objects(self, objs, request):
+        if hasattr(objs, "select_related"):
+            objs = objs.select_related("home_team", "away_team")
+        return super().get_deleted_objects(objs, request)
+
+    def delete_queryset(self, request, queryset):
+        delete_games(queryset)
+
+    def get_urls(self):
+        return [
+            path(
+                "rebuild/",
+                self.admin_site.admin_view(self.rebuild_view),
+                name="core_game_rebuild",
+            ),
+            *super().get_urls(),
+        ]
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {
+            "can_rebuild": self.has_change_permission(request),
+            **(extra_context or {}),
+        }
+        return super().changelist_view(request, extra_context)
+
+    @method_decorator(require_POST)
+    def rebuild_view(self, request):
+        """
+        Recomputes the standings, snapshots and ratings from all the games,
+        from the button of the game list.
+        """
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        with transaction.atomic():
+            rebuild_standings()
+            refresh_snapshots()
+            rebuild_ratings()
+            bump_league_version()
+        self.message_user(
+            request, "Rebuilt the standings, snapshots and ratings.", messages.SUCCESS
+        )
+        return redirect("admin:core_game_changelist")
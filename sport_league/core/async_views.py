@@ -0,0 +1,176 @@
+"""
+Async versions of the read endpoints, for ASGI servers.
+
+Under ASGI, Django runs every sync view in one shared thread, so a slow query
+or a slow cache holds back all the other sync requests of the process. Django
+3.2 has no async ORM and Django REST framework views are sync only, so the
+async views below run the read path of the sync ones, template rendering and
+serialization included, in the threads of the executor instead, each with its
+own database connection. Requests then only wait for one another when the
+executor is busy, and the event loop keeps serving slow clients meanwhile.
+
+Django 3.2 iterates streamed responses inside the event loop, where the
+queries of a lazily streamed queryset are not allowed. ``StreamingASGIHandler``
+serves them from a worker thread instead, a chunk at a time.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import close_old_connections, connections
+from django.http import HttpResponseNotAllowed
+
+from . import views
+
+SAFE_METHODS = ("GET", "HEAD")
+
+
+def _thread_sensitive():
+    # Only set by the tests, whose data is only visible in their transaction.
+    return getattr(settings, "ASYNC_DB_THREAD_SENSITIVE", False)
+
+
+def database_sync_to_async(func):
+    """
+    Wraps ``func`` in a coroutine function running it in a worker thread,
+    closing the connections of the thread that expired afterwards.
+
+    With ``ASYNC_DB_THREAD_SENSITIVE``, a setting of the tests only, it runs
+    in the thread of the sync code instead, to see the data of their
+    transaction.
+    """
+
+    @wraps(func)
+    def run(*args, **kwargs):
+        thread_sensitive = _thread_sensitive()
+        if not thread_sensitive:
+            close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if not thread_sensitive:
+                close_old_connections()
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await sync_to_async(run, thread_sensitive=_thread_sensitive())(
+            *args, **kwargs
+        )
+
+    return wrapper
+
+
+_END = object()
+
+
+def _next_part(parts):
+    return next(parts, _END)
+
+
+def _close_connections():
+    for connection in connections.all():
+        connection.close()
+
+
+class _ResponseHead:
+    """
+    The status, headers and cookies of a streamed response, without its
+    content, for ``ASGIHandler.send_response`` to send the start message.
+    """
+
+    streaming = True
+
+    def __init__(self, response):
+        self.response = response
+
+    def __getattr__(self, name):
+        return getattr(self.response, name)
+
+    def __iter__(self):
+        return iter(())
+
+    def close(self):
+        pass
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """
+    ASGI handler producing the parts of streamed responses in a worker
+    thread, one per response so that a streamed queryset keeps its
+    connection, and sending every part as soon as it is produced.
+
+    In tests, with ``ASYNC_DB_THREAD_SENSITIVE``, the parts are produced in
+    the thread of the sync code, like the views of ``async_read_view``.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        # Django 3.2's send_response() sends the start message, then iterates
+        # the content inside the event loop. Only its start message is kept,
+        # the content is sent below.
+        async def send_start(message):
+            if message["type"] == "http.response.start":
+                await send(message)
+
+        await super().send_response(_ResponseHead(response), send_start)
+        parts = iter(response)
+        if _thread_sensitive():
+            executor = None
+            next_part = sync_to_async(_next_part, thread_sensitive=True)
+        else:
+            executor = ThreadPoolExecutor(max_workers=1)
+            loop = asyncio.get_running_loop()
+
+            async def next_part(parts):
+                return await loop.run_in_executor(executor, _next_part, parts)
+
+        try:
+            while True:
+                part = await next_part(parts)
+                if part is _END:
+                    break
+                for chunk, _ in self.chunk_bytes(part):
+                    await send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+            await send({"type": "http.response.body"})
+        finally:
+            if executor is not None:
+                await loop.run_in_executor(executor, _close_connections)
+                executor.shutdown(wait=False)
+            await sync_to_async(response.close, thread_sensitive=True)()
+
+
+def async_read_view(view):
+    """
+    Returns an async view running the safe methods of the sync ``view`` in a
+    worker thread, and refusing the other ones.
+    """
+
+    def render(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if callable(getattr(response, "render", None)):
+            response.render()
+        return response
+
+    render = database_sync_to_async(render)
+
+    @wraps(view)
+    async def async_view(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return HttpResponseNotAllowed(SAFE_METHODS)
+        return await render(request, *args, **kwargs)
+
+    return async_view
+
+
+ranking = async_read_view(views.ranking)
+standings = async_read_view(views.StandingsAPIView.as_view())
+game_list = async_read_view(views.GameListCreateAPIView.as_view())
+game_detail = async_read_view(views.GameRetrieveUpdateDestroyAPIView.as_view())
+team_games = async_read_view(views.TeamGamesAPIView.as_view())
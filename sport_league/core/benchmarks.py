@@ -0,0 +1,234 @@
+"""
+Benchmark scenarios run by the ``bench`` management command.
+
+A scenario is a function taking a ``BenchmarkContext`` and returning the
+callable to time. Everything done before returning, e.g. inserting the games
+to delete, is not timed. Every round runs in a transaction rolled back
+afterwards, so the rounds of a scenario all start from the same data.
+"""
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from tablib import Dataset
+
+from . import vectorized
+from .bulk import create_games, delete_games, update_game_scores
+from .cache import bump_league_version
+from .importers import GAME_IMPORT_HEADERS
+from .models import Game, Team
+from .resources import GameResource
+from .serializers import GameRowSerializer, GameSerializer
+from .simulation import simulate_season
+from .standings import GameResult
+from .strategies import get_ranking_strategy
+from .synthetic import SyntheticLeague
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+
+    return register
+
+
+class BenchmarkContext:
+    """
+    The league the scenarios run against, and the rows they import.
+    """
+
+    def __init__(self, league, import_rows):
+        self.league = league
+        self.team_ids = league.create()
+        self.import_league = SyntheticLeague(
+            league.teams, import_rows, seed=league.seed + 1, prefix="Imported team"
+        )
+        user = get_user_model().objects.create_user("bench", "bench@example.com")
+        self.client = Client()
+        self.client.force_login(user)
+
+    def new_results(self, count):
+        league = SyntheticLeague(self.league.teams, count, seed=self.league.seed + 2)
+        return [
+            GameResult(self.team_ids[home], home_score, self.team_ids[away], away_score)
+            for home, home_score, away, away_score in league.rows()
+        ]
+
+
+@scenario("rankings")
+def bench_rankings(context):
+    strategy = get_ranking_strategy("basic")
+    return lambda: strategy.calculate_rankings(Team.objects.all())
+
+
+@scenario("rankings_vectorized")
+def bench_rankings_vectorized(context):
+    strategy = get_ranking_strategy("basic")
+    return lambda: vectorized.calculate_rankings(strategy, Team.objects.all())
+
+
+@scenario("import_upload_game")
+def bench_import_upload_game(context):
+    content = context.import_league.csv()
+    url = reverse("game:upload_game")
+
+    def run():
+        # Import inline whatever the size of the file.
+        with override_settings(GAME_IMPORT_BACKGROUND_THRESHOLD=len(content)):
+            response = context.client.post(
+                url, {"csv_file": SimpleUploadedFile("games.csv", content)}
+            )
+        assert response.status_code == 302, response.status_code
+
+    return run
+
+
+@scenario("import_game_resource")
+def bench_import_game_resource(context):
+    dataset = Dataset(*context.import_league.rows(), headers=GAME_IMPORT_HEADERS)
+
+    def run():
+        result = GameResource().import_data(dataset)
+        assert not result.has_errors()
+
+    return run
+
+
+@scenario("api_game_list")
+def bench_api_game_list(context):
+    url = reverse("game:game-list")
+    # Start from a cold cache.
+    bump_league_version()
+    return lambda: context.client.get(url)
+
+
+@scenario("api_game_list_stream")
+def bench_api_game_list_stream(context):
+    url = reverse("game:game-list")
+
+    def run():
+        response = context.client.get(url, {"stream": 1})
+        b"".join(response.streaming_content)
+
+    return run
+
+
+@scenario("serialize_games")
+def bench_serialize_games(context):
+    games = Game.objects.select_related("home_team", "away_team")
+    return lambda: GameSerializer(games, many=True).data
+
+
+@scenario("serialize_game_rows")
+def bench_serialize_game_rows(context):
+    rows = GameRowSerializer.rows(Game.objects.all())
+    return lambda: GameRowSerializer(rows, many=True).data
+
+
+@scenario("bulk_create_games")
+def bench_bulk_create_games(context):
+    results = context.new_results(context.import_league.games)
+    return lambda: create_games(results)
+
+
+@scenario("bulk_update_games")
+def bench_bulk_update_games(context):
+    games = list(Game.objects.all()[: context.import_league.games])
+    for game in games:
+        game.home_team_score, game.away_team_score = (
+            game.away_team_score,
+            game.home_team_score,
+        )
+    return lambda: update_game_scores(games)
+
+
+@scenario("bulk_delete_games")
+def bench_bulk_delete_games(context):
+    games = create_games(context.new_results(context.import_league.games))
+    return lambda: delete_games(Game.objects.filter(pk__in=[g.pk for g in games]))
+
+
+@scenario("simulate_season")
+def bench_simulate_season(context):
+    strategy = get_ranking_strategy("basic")
+    return lambda: simulate_season(strategy, 10_000, workers=1)
+
+
+def summarize(timings):
+    """
+    Returns pytest-benchmark style statistics of ``timings`` in seconds.
+    """
+    mean = statistics.mean(timings)
+    return {
+        "min": min(timings),
+        "max": max(timings),
+        "mean": mean,
+        "median": statistics.median(timings),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "rounds": len(timings),
+        "ops": 1 / mean if mean else None,
+    }
+
+
+def run_scenario(name, context, rounds):
+    timings = []
+    for _ in range(rounds):
+        with transaction.atomic():
+            target = SCENARIOS[name](context)
+            started = time.perf_counter()
+            target()
+            timings.append(time.perf_counter() - started)
+            transaction.set_rollback(True)
+    return timings
+
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "database": connection.vendor,
+        "cache": settings.CACHES[settings.LEAGUE_CACHE_ALIAS]["BACKEND"],
+    }
+
+
+def run_benchmarks(names, teams, games, import_rows, rounds, seed=0):
+    """
+    Runs the ``names`` scenarios against a synthetic league and returns the
+    report as a JSON-serializable dict. Nothing is left in the database.
+    """
+    params = {
+        "teams": teams,
+        "games": games,
+        "import_rows": import_rows,
+        "seed": seed,
+    }
+    benchmarks = []
+    with transaction.atomic():
+        context = BenchmarkContext(SyntheticLeague(teams, games, seed), import_rows)
+        for name in names:
+            benchmarks.append(
+                {
+                    "name": name,
+                    "params": params,
+                    "stats": summarize(run_scenario(name, context, rounds)),
+                }
+            )
+        transaction.set_rollback(True)
+    return {
+        "machine_info": machine_info(),
+        "datetime": datetime.now(timezone.utc).isoformat(),
+        "benchmarks": benchmarks,
+    }
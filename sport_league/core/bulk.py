@@ -0,0 +1,104 @@
+"""
+Set-based write helpers shared by the import, API and admin bulk paths.
+
+They bypass the per-instance model signals, so they send ``games_changed``
+themselves to keep the standings in sync.
+"""
+from django.db import connections, transaction
+from django.db.models import Max
+
+from .cache import bump_league_version
+from .models import Game, Team
+from .ratings import ensure_ratings
+from .signals import batch_games_changed, games_changed
+from .standings import GameResult, ensure_standings
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def resolve_team_ids(names, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Returns a ``{name: team_id}`` dict for ``names``, creating missing teams
+    with a single ``bulk_create``.
+    """
+    names = set(names)
+    if not names:
+        return {}
+    with transaction.atomic():
+        Team.objects.bulk_create(
+            [Team(name=name) for name in names],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        team_ids = dict(Team.objects.filter(name__in=names).values_list("name", "pk"))
+        ensure_standings(list(team_ids.values()))
+        ensure_ratings(list(team_ids.values()))
+        bump_league_version()
+    return team_ids
+
+
+def create_games(results, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Inserts ``GameResult`` rows with batched ``bulk_create`` calls.
+    """
+    games = [Game(**result._asdict()) for result in results]
+    with transaction.atomic():
+        Game.objects.bulk_create(games, batch_size=batch_size)
+        _set_created_pks(games)
+        games_changed.send(
+            sender=Game,
+            added=[GameResult.from_game(game) for game in games],
+            removed=[],
+        )
+    return games
+
+
+def _set_created_pks(games):
+    # Backends that cannot return the inserted rows (SQLite on Django 3.2)
+    # leave the pks unset. Inside the transaction the rows just inserted hold
+    # the highest, consecutive ids.
+    if not games or games[0].pk is not None:
+        return
+    if connections[Game.objects.db].features.can_return_rows_from_bulk_insert:
+        return
+    last_pk = Game.objects.aggregate(last_pk=Max("pk"))["last_pk"]
+    for pk, game in enumerate(games, last_pk - len(games) + 1):
+        game.pk = pk
+
+
+def update_game_scores(games, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Saves the scores of already loaded ``games`` with ``bulk_update``.
+    """
+    pks = [game.pk for game in games]
+    with transaction.atomic():
+        removed = [
+            GameResult(*row)
+            for row in Game.objects.filter(pk__in=pks).values_list(*GameResult._fields)
+        ]
+        Game.objects.bulk_update(
+            games, ["home_team_score", "away_team_score"], batch_size=batch_size
+        )
+        games_changed.send(
+            sender=Game,
+            added=[GameResult.from_game(game) for game in games],
+            removed=removed,
+        )
+    return games
+
+
+def delete_games(queryset):
+    """
+    Deletes the games of ``queryset``, updating the standings only once.
+    """
+    with transaction.atomic(), batch_games_changed():
+        return queryset.delete()
+
+
+def delete_teams(queryset):
+    """
+    Deletes the teams of ``queryset`` and, by cascade, their games, updating
+    the standings only once.
+    """
+    with transaction.atomic(), batch_games_changed():
+        return queryset.delete()
@@ -0,0 +1,81 @@
+"""
+Caching of the league read paths.
+
+Cached entries are keyed by a league "version" which is bumped whenever a game
+or a team is written, so stale entries are never read again and simply expire.
+The cache alias is ``LEAGUE_CACHE_ALIAS``; with several server processes it
+must point to a shared backend (memcached, redis, database) for the version to
+be seen by all of them.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+
+VERSION_KEY = "league:version"
+
+
+def get_cache():
+    return caches[settings.LEAGUE_CACHE_ALIAS]
+
+
+def league_version():
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock so that a version lost by the cache can never
+        # match entries cached before.
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _bump():
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+
+
+def bump_league_version():
+    """
+    Invalidates everything cached for the league.
+
+    The version is bumped right away and again once the transaction commits,
+    so that nothing read before the commit stays cached under the new version.
+    """
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def cache_key(*parts):
+    return ":".join(["league", str(league_version()), *map(str, parts)])
+
+
+def get_or_set(key, default):
+    """
+    Returns the cached value of ``key``, computing it with ``default()`` on a
+    miss.
+    """
+    cache = get_cache()
+    value = cache.get(key)
+    if value is None:
+        value = default()
+        cache.set(key, value, settings.LEAGUE_CACHE_TIMEOUT)
+    return value
+
+
+def request_etag(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()[:16]
+    return f'"{league_version()}-{path}"'
+
+
+def not_modified_response(request, etag):
+    """
+    Returns a 304 response when the client already has ``etag``.
+    """
+    return get_conditional_response(request, etag=etag)
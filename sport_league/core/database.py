@@ -0,0 +1,34 @@
+"""
+Database connection setup.
+
+New SQLite connections get the ``SQLITE_PRAGMAS`` settings. With persistent
+connections (``CONN_MAX_AGE``) and ``DB_HEALTH_CHECKS``, the open connections
+are checked at the start of every request and closed when unusable, so that
+Django opens a new one instead of failing on a connection the server dropped.
+"""
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    # On the DB-API connection, so that they are not counted in the queries
+    # of the request opening the connection.
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(request_started)
+def check_connections(sender, **kwargs):
+    if not settings.DB_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        if not connection.is_usable():
+            connection.close()
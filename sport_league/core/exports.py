@@ -0,0 +1,319 @@
+"""
+Streaming exports of the games and the standings.
+
+CSV exports fetch the rows with ``QuerySet.iterator()`` and write them a chunk
+at a time, so that neither the rows nor the file are held in memory. The games
+CSV has the header and the columns of ``GameResource``, which imports it again
+with ``GameResource().import_data(tablib.Dataset().load(csv))``. The upload
+form does not read it: it expects the four columns of ``BulkGameImporter``.
+
+The columnar format stores every column as one contiguous little-endian typed
+array, so that a reader can memory-map each column without parsing it::
+
+    b"SLCOLUMN"                  8 bytes magic
+    uint32 version, uint32 size  of the JSON header
+    JSON header                  padded with spaces to a multiple of 8 bytes
+    column data                  each column padded to a multiple of 8 bytes
+
+The header holds the number of ``rows``, and for every column its ``name``,
+NumPy ``dtype``, ``offset`` from the end of the header and ``null`` value,
+if any. Team columns are dictionary-encoded: they hold positions in the list
+of ``{"id", "name"}`` teams of the ``dictionary`` of the header they name.
+The games columns are streamed one after the other, each read by a query of
+its own a chunk of rows at a time, so that only one chunk is held in memory.
+"""
+import csv
+import json
+import struct
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Max
+
+from .models import Game, Team, TeamRating
+from .resources import GameResource
+from .standings import get_ranking
+
+COLUMNAR_MAGIC = b"SLCOLUMN"
+COLUMNAR_VERSION = 1
+COLUMNAR_ALIGNMENT = 8
+COLUMNAR_CONTENT_TYPE = "application/octet-stream"
+
+# Bytes of column data yielded at once.
+COLUMNAR_CHUNK_BYTES = 1 << 20
+
+GAME_EXPORT_HEADERS = [
+    "id",
+    "home_team",
+    "home_team_score",
+    "away_team",
+    "away_team_score",
+    "round",
+    "played_at",
+]
+STANDINGS_EXPORT_HEADERS = [
+    "position",
+    "team",
+    "points",
+    "played",
+    "wins",
+    "draws",
+    "losses",
+    "goals_for",
+    "goals_against",
+    "goal_difference",
+    "rating",
+]
+
+# ``(name, dtype, null)`` of the columnar files. Missing ratings are NaN.
+GAME_COLUMNS = [
+    ("id", "<i8", None),
+    ("home_team", "<i4", None),
+    ("home_team_score", "<i4", None),
+    ("away_team", "<i4", None),
+    ("away_team_score", "<i4", None),
+    ("round", "<i4", 0),
+    # Microseconds since the epoch, in UTC.
+    ("played_at", "<i8", int(np.iinfo(np.int64).min)),
+]
+STANDINGS_COLUMNS = [
+    *((name, "<i4", None) for name in STANDINGS_EXPORT_HEADERS[:-1]),
+    ("rating", "<f8", None),
+]
+TEAM_COLUMNS = {"home_team", "away_team", "team"}
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _chunked(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_csv(headers, rows, chunk_size=None):
+    """
+    Yields the CSV lines of ``rows`` a chunk of ``chunk_size`` rows at a time.
+    """
+    chunk_size = chunk_size or settings.API_STREAM_CHUNK_SIZE
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for chunk in _chunked(rows, chunk_size):
+        yield "".join(writer.writerow(row) for row in chunk)
+
+
+def game_csv_rows(queryset=None, chunk_size=None):
+    if queryset is None:
+        queryset = Game.objects.all()
+    rows = queryset.order_by("id").values_list(
+        "id",
+        "home_team__name",
+        "home_team_score",
+        "away_team__name",
+        "away_team_score",
+        "round",
+        "played_at",
+    )
+    played_at_widget = GameResource.fields["played_at"].widget
+    for *row, played_at in rows.iterator(
+        chunk_size=chunk_size or settings.API_STREAM_CHUNK_SIZE
+    ):
+        yield [*row, played_at_widget.render(played_at)]
+
+
+def standings_rows(strategy_name):
+    """
+    Returns the ranking of a strategy as ``STANDINGS_EXPORT_HEADERS`` rows,
+    with the team as a ``Team``.
+    """
+    rows = []
+    for position, (team, points, totals) in enumerate(get_ranking(strategy_name), 1):
+        try:
+            rating = team.rating.rating
+        except TeamRating.DoesNotExist:
+            rating = None
+        rows.append(
+            [
+                position,
+                team,
+                points,
+                *totals,
+                totals.goals_for - totals.goals_against,
+                rating,
+            ]
+        )
+    return rows
+
+
+def iter_games_csv(queryset=None, chunk_size=None):
+    return iter_csv(
+        GAME_EXPORT_HEADERS, game_csv_rows(queryset, chunk_size), chunk_size
+    )
+
+
+def iter_standings_csv(strategy_name):
+    rows = standings_rows(strategy_name)
+    for row in rows:
+        row[1] = row[1].name
+    return iter_csv(STANDINGS_EXPORT_HEADERS, rows)
+
+
+def _padding(size):
+    return -size % COLUMNAR_ALIGNMENT
+
+
+def iter_columnar(
+    columns, rows, column_chunks, teams, chunk_bytes=COLUMNAR_CHUNK_BYTES
+):
+    """
+    Yields a columnar file of ``rows`` rows described by ``(name, dtype,
+    null)`` ``columns``, with the ``(id, name)`` ``teams`` as the dictionary of
+    the ``team`` columns.
+
+    ``column_chunks`` yields, for every column in turn, the arrays of its
+    values a chunk of rows at a time.
+    """
+    described = []
+    offset = 0
+    for name, dtype, null in columns:
+        column = {"name": name, "dtype": dtype, "offset": offset}
+        if null is not None:
+            column["null"] = null
+        if name in TEAM_COLUMNS:
+            column["dictionary"] = "teams"
+        described.append(column)
+        offset += rows * np.dtype(dtype).itemsize
+        offset += _padding(offset)
+    header = json.dumps(
+        {
+            "rows": rows,
+            "columns": described,
+            "dictionaries": {"teams": [{"id": pk, "name": name} for pk, name in teams]},
+        }
+    ).encode()
+    header += b" " * _padding(len(header))
+    yield COLUMNAR_MAGIC + struct.pack("<II", COLUMNAR_VERSION, len(header)) + header
+    for (name, dtype, null), chunks in zip(columns, column_chunks):
+        written = 0
+        for values in chunks:
+            data = memoryview(np.ascontiguousarray(values, dtype=dtype)).cast("B")
+            written += len(values)
+            for start in range(0, len(data), chunk_bytes):
+                yield bytes(data[start : start + chunk_bytes])
+        if written != rows:
+            raise RuntimeError(
+                f"Column {name} has {written} rows instead of {rows}: the data "
+                "changed during the export."
+            )
+        yield b"\0" * _padding(rows * np.dtype(dtype).itemsize)
+
+
+def _game_column_values(name, null, values, team_ids):
+    """
+    Converts the values of a chunk of a ``GAME_COLUMNS`` column to an array.
+    """
+    if name in TEAM_COLUMNS:
+        # Positions in the teams sorted by id
+        return np.searchsorted(team_ids, np.array(values, dtype=np.int64))
+    if name == "played_at":
+        values = [
+            null if played_at is None else (played_at - EPOCH) // MICROSECOND
+            for played_at in values
+        ]
+    elif null is not None:
+        values = [null if value is None else value for value in values]
+    return np.array(values, dtype=np.int64)
+
+
+def iter_games_columnar(queryset=None, chunk_size=None):
+    """
+    Yields the games as a columnar file, one column after the other.
+
+    Every column is read by a query of its own over the games up to the last
+    id when the export starts, a chunk of ``chunk_size`` rows at a time, so
+    that only one chunk of values is held in memory.
+    """
+    if queryset is None:
+        queryset = Game.objects.all()
+    chunk_size = chunk_size or settings.API_STREAM_CHUNK_SIZE
+    teams = list(Team.objects.order_by("pk").values_list("pk", "name"))
+    team_ids = np.array([pk for pk, _ in teams], dtype=np.int64)
+    last_id = queryset.aggregate(last_id=Max("id"))["last_id"] or 0
+    queryset = queryset.filter(id__lte=last_id).order_by("id")
+    fields = {"home_team": "home_team_id", "away_team": "away_team_id"}
+
+    def column_chunks():
+        for name, _, null in GAME_COLUMNS:
+            values = queryset.values_list(fields.get(name, name), flat=True)
+            yield (
+                _game_column_values(name, null, chunk, team_ids)
+                for chunk in _chunked(
+                    values.iterator(chunk_size=chunk_size), chunk_size
+                )
+            )
+
+    return iter_columnar(GAME_COLUMNS, queryset.count(), column_chunks(), teams)
+
+
+def iter_standings_columnar(strategy_name):
+    rows = standings_rows(strategy_name)
+    teams = [(row[1].pk, row[1].name) for row in rows]
+    for code, row in enumerate(rows):
+        row[1] = code
+        if row[-1] is None:
+            row[-1] = np.nan
+    columns = [list(column) for column in zip(*rows)] or [[] for _ in STANDINGS_COLUMNS]
+    return iter_columnar(
+        STANDINGS_COLUMNS, len(rows), ([column] for column in columns), teams
+    )
+
+
+def read_columnar(path):
+    """
+    Returns ``(columns, dictionaries)`` of a columnar file, ``columns`` being
+    ``{name: array}`` memory-mapped read-only from the file.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(COLUMNAR_MAGIC))
+        if magic != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} is not a columnar export.")
+        version, size = struct.unpack("<II", f.read(8))
+        if version != COLUMNAR_VERSION:
+            raise ValueError(f"Unsupported columnar version {version}.")
+        header = json.loads(f.read(size))
+    start = len(COLUMNAR_MAGIC) + 8 + size
+    columns = {}
+    for column in header["columns"]:
+        if header["rows"]:
+            columns[column["name"]] = np.memmap(
+                path,
+                dtype=column["dtype"],
+                mode="r",
+                offset=start + column["offset"],
+                shape=(header["rows"],),
+            )
+        else:
+            columns[column["name"]] = np.empty(0, dtype=column["dtype"])
+    return columns, header["dictionaries"]
+
+
+EXPORT_FORMATS = {"csv": "text/csv", "columnar": COLUMNAR_CONTENT_TYPE}
+EXPORT_EXTENSIONS = {"csv": "csv", "columnar": "col"}
+EXPORTS = {
+    ("games", "csv"): iter_games_csv,
+    ("games", "columnar"): iter_games_columnar,
+    ("standings", "csv"): iter_standings_csv,
+    ("standings", "columnar"): iter_standings_columnar,
+}
@@ -0,0 +1,115 @@
+"""
+Game history of a team.
+
+The games a team played at home and away are read with two indexed lookups
+combined by a ``UNION ALL``, with the opponent and the result of the team
+computed by the database, instead of OR-ing the two foreign key columns.
+"""
+from collections import namedtuple
+
+from django.db.models import Case, CharField, F, Value, When
+
+from .models import Game
+
+WIN, DRAW, LOSS = "W", "D", "L"
+FORM_LENGTH = 5
+
+HistoryRow = namedtuple(
+    "HistoryRow",
+    [
+        "id",
+        "venue",
+        "opponent_id",
+        "opponent_name",
+        "goals_for",
+        "goals_against",
+        "result",
+    ],
+)
+
+
+def _side_history(team_id, side, opponent_side, opponent_id, before):
+    games = Game.objects.filter(**{f"{side}_team": team_id})
+    if opponent_id is not None:
+        games = games.filter(**{f"{opponent_side}_team": opponent_id})
+    if before is not None:
+        games = games.filter(id__lt=before)
+    scored = f"{side}_team_score"
+    conceded = f"{opponent_side}_team_score"
+    return games.annotate(
+        venue=Value(side, output_field=CharField()),
+        opponent_id=F(f"{opponent_side}_team"),
+        opponent_name=F(f"{opponent_side}_team__name"),
+        goals_for=F(scored),
+        goals_against=F(conceded),
+        result=Case(
+            When(**{f"{scored}__gt": F(conceded)}, then=Value(WIN)),
+            When(**{scored: F(conceded)}, then=Value(DRAW)),
+            default=Value(LOSS),
+            output_field=CharField(),
+        ),
+    ).values_list(*HistoryRow._fields)
+
+
+def team_history(team_id, opponent_id=None, before=None):
+    """
+    Returns the games of a team as ``HistoryRow`` tuples, most recent first.
+
+    ``opponent_id`` restricts them to the games against one team and
+    ``before`` is the id of the last game of the previous page.
+    """
+    home = _side_history(team_id, "home", "away", opponent_id, before)
+    away = _side_history(team_id, "away", "home", opponent_id, before)
+    return home.union(away, all=True).order_by("-id")
+
+
+def iter_team_history(queryset):
+    return (HistoryRow(*row) for row in queryset)
+
+
+def summarize(results):
+    """
+    Summarizes the results of a team, most recent first.
+    """
+    record = {WIN: 0, DRAW: 0, LOSS: 0}
+    current = None
+    current_length = longest_win = longest_unbeaten = 0
+    win_run = unbeaten_run = 0
+    # Runs are counted from the oldest game so the longest ones come out
+    # whatever the order of the recent games.
+    for result in reversed(results):
+        record[result] += 1
+        win_run = win_run + 1 if result == WIN else 0
+        unbeaten_run = unbeaten_run + 1 if result != LOSS else 0
+        longest_win = max(longest_win, win_run)
+        longest_unbeaten = max(longest_unbeaten, unbeaten_run)
+    for result in results:
+        if current is None:
+            current = result
+        if result != current:
+            break
+        current_length += 1
+    return {
+        "played": len(results),
+        "wins": record[WIN],
+        "draws": record[DRAW],
+        "losses": record[LOSS],
+        "form": "".join(results[:FORM_LENGTH]),
+        "streak": {"result": current, "length": current_length},
+        "longest_win_streak": longest_win,
+        "longest_unbeaten_streak": longest_unbeaten,
+    }
+
+
+def team_summary(team_id, opponent_id=None):
+    rows = team_history(team_id, opponent_id=opponent_id)
+    results = []
+    goals_for = goals_against = 0
+    for row in iter_team_history(rows):
+        results.append(row.result)
+        goals_for += row.goals_for
+        goals_against += row.goals_against
+    summary = summarize(results)
+    summary["goals_for"] = goals_for
+    summary["goals_against"] = goals_against
+    return summary
@@ -0,0 +1,229 @@
+import codecs
+import csv
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+from itertools import islice
+
+from django.db import transaction
+
+from .bulk import DEFAULT_BATCH_SIZE, create_games, resolve_team_ids
+from .models import Team
+from .standings import GameResult
+
+GAME_IMPORT_HEADERS = ["home_team", "home_team_score", "away_team", "away_team_score"]
+# Trailing columns a row may have on top of ``GAME_IMPORT_HEADERS``.
+GAME_IMPORT_OPTIONAL_HEADERS = ["round"]
+TEAM_NAME_MAX_LENGTH = Team._meta.get_field("name").max_length
+MAX_KEPT_ERRORS = 100
+
+RowError = namedtuple("RowError", ["line", "message"])
+
+
+class ImportResult(
+    namedtuple("ImportResult", ["rows", "created", "errors", "invalid", "duration"])
+):
+    """
+    Outcome of an import. ``errors`` keeps the first ``RowError`` only,
+    ``invalid`` counts all the invalid rows.
+    """
+
+    @property
+    def has_errors(self):
+        return bool(self.invalid)
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.duration if self.duration else 0.0
+
+
+def iter_lines(chunks, encoding="utf-8"):
+    """
+    Decodes an iterable of byte chunks incrementally and yields text lines,
+    line endings included, so that only one chunk is held in memory.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+    for chunk in chunks:
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def iter_csv_rows(chunks, encoding="utf-8"):
+    """
+    Lazily parses CSV rows out of byte chunks, e.g. ``UploadedFile.chunks()``.
+    """
+    return csv.reader(iter_lines(chunks, encoding))
+
+
+class _CappedErrors(list):
+    """
+    A list keeping only the first ``limit`` errors while counting all of them.
+    """
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+        self.count = 0
+
+    def append(self, error):
+        self.count += 1
+        if len(self) < self.limit:
+            super().append(error)
+
+
+class BulkGameImporter:
+    """
+    Imports ``home_team,home_team_score,away_team,away_team_score`` rows,
+    optionally followed by a ``round`` column.
+
+    Rows are consumed lazily in batches of ``batch_size``: the missing teams of
+    a batch are created with one ``bulk_create``, names are resolved from an
+    in-memory map and the games are inserted with ``bulk_create``. Memory use
+    is bounded by the batch size and the number of teams, not by the number of
+    rows. Everything runs in one transaction which is rolled back when any row
+    is invalid; the remaining rows are still validated to report their errors.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, max_errors=MAX_KEPT_ERRORS):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+
+    def clean_team(self, value, field):
+        if not value:
+            raise ValueError(f"{field} may not be blank.")
+        if len(value) > TEAM_NAME_MAX_LENGTH:
+            raise ValueError(
+                f"{field} may not be longer than {TEAM_NAME_MAX_LENGTH} characters."
+            )
+        return value
+
+    def clean_score(self, value, field):
+        try:
+            score = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be an integer, got {value!r}.")
+        if score < 0:
+            raise ValueError(f"{field} may not be negative.")
+        return score
+
+    def clean_round(self, value, field):
+        if value == "":
+            return None
+        round_number = self.clean_score(value, field)
+        if round_number < 1:
+            raise ValueError(f"{field} must be at least 1.")
+        return round_number
+
+    def clean_row(self, row):
+        min_columns = len(GAME_IMPORT_HEADERS)
+        max_columns = min_columns + len(GAME_IMPORT_OPTIONAL_HEADERS)
+        if not min_columns <= len(row) <= max_columns:
+            raise ValueError(
+                f"Expected {min_columns} columns, or {max_columns} with a round, "
+                f"got {len(row)}."
+            )
+        home_team, home_team_score, away_team, away_team_score, *rest = row
+        return (
+            self.clean_team(home_team, "home_team"),
+            self.clean_score(home_team_score, "home_team_score"),
+            self.clean_team(away_team, "away_team"),
+            self.clean_score(away_team_score, "away_team_score"),
+            self.clean_round(rest[0], "round") if rest else None,
+        )
+
+    def iter_batches(self, rows, errors):
+        """
+        Yields lists of cleaned rows, appending invalid rows to ``errors``.
+        """
+        cleaned = (
+            self.clean_numbered_row(line, row, errors)
+            for line, row in enumerate(rows, 1)
+            if row
+        )
+        cleaned = (row for row in cleaned if row is not None)
+        while True:
+            batch = list(islice(cleaned, self.batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def clean_numbered_row(self, line, row, errors):
+        try:
+            return self.clean_row(row)
+        except ValueError as e:
+            errors.append(RowError(line, str(e)))
+            return None
+
+    def write_batch(self, batch, team_ids):
+        new_names = {name for row in batch for name in (row[0], row[2])}
+        new_names.difference_update(team_ids)
+        with transaction.atomic():
+            if new_names:
+                team_ids.update(resolve_team_ids(new_names, batch_size=self.batch_size))
+            games = create_games(
+                (
+                    GameResult(
+                        team_ids[home], home_score, team_ids[away], away_score, round
+                    )
+                    for home, home_score, away, away_score, round in batch
+                ),
+                batch_size=self.batch_size,
+            )
+        return len(games)
+
+    def validate(self, rows, progress=None):
+        """
+        Validates ``rows`` without writing anything.
+        """
+        started = time.monotonic()
+        errors = _CappedErrors(self.max_errors)
+        total = 0
+        for batch in self.iter_batches(rows, errors):
+            total += len(batch)
+            if progress is not None:
+                progress(total + errors.count, 0, errors.count)
+        return ImportResult(
+            total + errors.count,
+            0,
+            list(errors),
+            errors.count,
+            time.monotonic() - started,
+        )
+
+    def run(self, rows, progress=None, atomic=True):
+        """
+        Imports ``rows``, calling ``progress(rows, created, invalid)`` after
+        every batch when given.
+
+        With ``atomic=False`` every batch is committed on its own, together
+        with what ``progress`` writes, which lets other connections see the
+        progress of a long import; the rows should then have been checked with
+        ``validate`` beforehand.
+        """
+        started = time.monotonic()
+        errors = _CappedErrors(self.max_errors)
+        team_ids = {}
+        total = created = 0
+        with transaction.atomic() if atomic else nullcontext():
+            for batch in self.iter_batches(rows, errors):
+                total += len(batch)
+                with transaction.atomic():
+                    if not errors.count:
+                        created += self.write_batch(batch, team_ids)
+                    if progress is not None:
+                        progress(total + errors.count, created, errors.count)
+            if errors.count and atomic:
+                transaction.set_rollback(True)
+                created = 0
+        return ImportResult(
+            total + errors.count,
+            created,
+            list(errors),
+            errors.count,
+            time.monotonic() - started,
+        )
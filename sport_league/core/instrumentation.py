@@ -0,0 +1,231 @@
+"""
+Per-request performance instrumentation.
+
+``PerformanceMiddleware`` records the number of SQL queries, the time spent in
+the database, in serialization and in template rendering for every request.
+It sends them back in a ``Server-Timing`` header, logs them on the
+``core.performance`` logger and checks them against ``QUERY_BUDGETS``.
+
+Every database connection records its queries in the metrics of the current
+request, found in a context variable, so that the queries run by async views
+in worker threads are counted as well.
+
+The content of a streamed response is produced after the middleware returns:
+the queries run meanwhile are counted, logged and checked against the budget
+once it is exhausted, but its ``Server-Timing`` header, sent first, only
+covers the view.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends.django import DjangoTemplates, Template
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger("core.performance")
+
+_current_metrics = ContextVar("request_metrics", default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.timings = defaultdict(float)
+
+    def __call__(self, execute, sql, params, many, context):
+        # Database execute wrapper, see ``connection.execute_wrapper()``.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.timings["db"] += time.perf_counter() - started
+
+    def server_timing(self):
+        entries = [
+            f'db;dur={self.timings["db"] * 1000:.1f};desc="{self.queries} queries"'
+        ]
+        entries += [
+            f"{name};dur={duration * 1000:.1f}"
+            for name, duration in self.timings.items()
+            if name != "db"
+        ]
+        return ", ".join(entries)
+
+
+def record_query(execute, sql, params, many, context):
+    # Database execute wrapper installed on every connection.
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    # First in the list, so that the wrappers pushed and popped by
+    # ``connection.execute_wrapper()`` around a new connection stay last.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@contextmanager
+def measure(name):
+    """
+    Adds the time spent in the block to the ``name`` timing of the request.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.timings[name] += time.perf_counter() - started
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        with measure("render"):
+            return super().render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """
+    Django template backend timing the rendering of its templates.
+    """
+
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return InstrumentedTemplate(template.template, self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
+
+
+class InstrumentedJSONRenderer(JSONRenderer):
+    """
+    JSON renderer timing the serialization of API responses.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with measure("serialize"):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+def get_view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else None
+
+
+def get_query_budget(view_name, method):
+    """
+    Returns the query budget of a view, either a number for every method or a
+    ``{method: number}`` dict, or ``None`` when the view has no budget.
+    """
+    budget = settings.QUERY_BUDGETS.get(view_name)
+    if isinstance(budget, dict):
+        budget = budget.get(method)
+    return budget
+
+
+def check_query_budget(view_name, method, queries):
+    budget = get_query_budget(view_name, method)
+    if budget is None or queries <= budget:
+        return
+    message = f"{method} {view_name} ran {queries} queries, its budget is {budget}."
+    if settings.QUERY_BUDGETS_ENFORCED:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+class PerformanceMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Marks the instance as a coroutine function for Django.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.process_metrics(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.process_metrics(request, response, metrics, started)
+
+    def process_metrics(self, request, response, metrics, started):
+        metrics.timings["total"] = time.perf_counter() - started
+        response["Server-Timing"] = metrics.server_timing()
+        request.metrics = metrics
+        if response.streaming:
+            response.streaming_content = self.stream(
+                request, response, response.streaming_content, metrics, started
+            )
+        else:
+            self.report(request, response, metrics)
+        return response
+
+    def stream(self, request, response, content, metrics, started):
+        """
+        Yields the parts of the streamed ``content``, counting the queries run
+        to produce them, then reports the metrics of the whole request.
+        """
+        parts = iter(content)
+        while True:
+            token = _current_metrics.set(metrics)
+            try:
+                part = next(parts, None)
+            finally:
+                _current_metrics.reset(token)
+            if part is None:
+                break
+            yield part
+        metrics.timings["total"] = time.perf_counter() - started
+        self.report(request, response, metrics)
+
+    def report(self, request, response, metrics):
+        view_name = get_view_name(request)
+        logger.info(
+            "view=%s method=%s status=%s queries=%d db_ms=%.1f serialize_ms=%.1f "
+            "render_ms=%.1f total_ms=%.1f",
+            view_name,
+            request.method,
+            response.status_code,
+            metrics.queries,
+            metrics.timings["db"] * 1000,
+            metrics.timings["serialize"] * 1000,
+            metrics.timings["render"] * 1000,
+            metrics.timings["total"] * 1000,
+            extra={"view": view_name, "queries": metrics.queries},
+        )
+        check_query_budget(view_name, request.method, metrics.queries)
@@ -0,0 +1,158 @@
+"""
+Database-backed queue of background game imports.
+
+Uploads are stored with an ``ImportJob`` row by ``enqueue_import`` and picked
+up by ``manage.py run_import_worker``, which needs no broker: workers claim
+pending jobs with a conditional ``UPDATE`` so a job is only run once.
+
+A running job reports a heartbeat with every batch. When a worker dies, its
+job is claimed again once the heartbeat is ``GAME_IMPORT_JOB_TIMEOUT`` seconds
+old and resumes after the rows already committed. The uploaded file is
+deleted when the job finishes.
+"""
+import logging
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import DateTimeField, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .importers import BulkGameImporter, iter_csv_rows
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+
+class JobReclaimed(Exception):
+    """
+    Raised in a worker whose job was claimed by another worker.
+    """
+
+
+def enqueue_import(uploaded_file, user=None):
+    return ImportJob.objects.create(file=uploaded_file, user=user)
+
+
+def claimable_jobs():
+    stale = timezone.now() - timedelta(seconds=settings.GAME_IMPORT_JOB_TIMEOUT)
+    return ImportJob.objects.filter(
+        Q(status=ImportJob.PENDING)
+        | Q(status=ImportJob.RUNNING, heartbeat_at__lt=stale)
+    )
+
+
+def claim_next_job():
+    """
+    Marks the oldest pending or stale running job as running and returns it,
+    or ``None``.
+    """
+    claimable = claimable_jobs()
+    for pk, attempts in claimable.order_by("pk").values_list("pk", "attempts")[:10]:
+        now = timezone.now()
+        claimed = claimable.filter(pk=pk, attempts=attempts).update(
+            status=ImportJob.RUNNING,
+            attempts=attempts + 1,
+            started_at=Coalesce("started_at", Value(now, DateTimeField())),
+            heartbeat_at=now,
+        )
+        if claimed:
+            return ImportJob.objects.get(pk=pk)
+    return None
+
+
+def _iter_job_rows(job):
+    with job.file.open("rb") as f:
+        yield from iter_csv_rows(f.chunks())
+
+
+def _delete_file(job):
+    try:
+        job.file.delete(save=False)
+    except OSError:
+        logger.exception("Could not delete the file of import job %s", job.pk)
+
+
+def run_job(job):
+    """
+    Validates the whole file first, then imports it batch by batch so that the
+    progress stored on the job is visible to the pollers while it runs.
+    """
+    importer = BulkGameImporter(batch_size=settings.GAME_IMPORT_BATCH_SIZE)
+    # Only updated while the job is still claimed by this worker
+    jobs = ImportJob.objects.filter(pk=job.pk, attempts=job.attempts)
+
+    def update(**fields):
+        if not jobs.update(heartbeat_at=timezone.now(), **fields):
+            raise JobReclaimed(f"Import job {job.pk} was claimed by another worker.")
+
+    total = None
+    try:
+        result = importer.validate(
+            _iter_job_rows(job), progress=lambda rows, created, invalid: update()
+        )
+        if result.has_errors:
+            update(
+                status=ImportJob.FAILED,
+                rows_total=result.rows,
+                rows_invalid=result.invalid,
+                errors=[error._asdict() for error in result.errors],
+                message=f"{result.invalid} invalid rows, nothing was imported.",
+                finished_at=timezone.now(),
+            )
+            _delete_file(job)
+            return
+        update(rows_total=result.rows)
+        total = result.rows
+
+        def progress(rows, created, invalid):
+            # Committed with the batch, so that a reclaimed job resumes right
+            # after it.
+            update(rows_processed=job.rows_processed + rows)
+
+        rows = (row for row in _iter_job_rows(job) if row)
+        result = importer.run(
+            islice(rows, job.rows_processed, None), progress=progress, atomic=False
+        )
+        update(
+            status=ImportJob.SUCCEEDED,
+            rows_processed=job.rows_processed + result.rows,
+            message=f"{job.rows_processed + result.created} games uploaded "
+            "successfully.",
+            finished_at=timezone.now(),
+        )
+    except JobReclaimed:
+        logger.warning("Import job %s was claimed by another worker", job.pk)
+        return
+    except Exception as e:
+        logger.exception("Import job %s failed", job.pk)
+        message = f"Error uploading games: {e}"
+        failed = 0
+        if total is not None:
+            processed = jobs.values_list("rows_processed", flat=True).first() or 0
+            failed = total - processed
+            message += (
+                f" ({processed} rows were imported before the error, "
+                f"{failed} were not)"
+            )
+        jobs.update(
+            status=ImportJob.FAILED,
+            rows_failed=failed,
+            message=message,
+            finished_at=timezone.now(),
+        )
+    _delete_file(job)
+
+
+def process_next_job():
+    """
+    Runs the next pending job, returning it or ``None`` when the queue is empty.
+    """
+    close_old_connections()
+    job = claim_next_job()
+    if job is not None:
+        run_job(job)
+        job.refresh_from_db()
+    return job
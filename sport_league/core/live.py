@@ -0,0 +1,262 @@
+"""
+Live standings pushed to the ranking page with Server-Sent Events.
+
+``LiveStandingsMiddleware`` wraps the Django ASGI application in ``asgi.py``
+and serves ``LIVE_STANDINGS_PATH`` itself, since Django 3.2 cannot stream a
+response from an async view. Every open connection subscribes to the
+``broadcaster`` of its process for a ranking strategy. Once a game write
+commits, the broadcaster computes the table of every subscribed strategy a
+single time and pushes the rows that changed to all of their subscribers.
+
+The fan-out is in-process: a server process only hears of the writes it
+handled itself. Idle connections therefore ask the broadcaster to check the
+shared league version every ``LIVE_STANDINGS_KEEPALIVE`` seconds, which
+catches up with the writes of the other processes.
+"""
+import asyncio
+import json
+import threading
+from collections import namedtuple
+from http import HTTPStatus
+from http.cookies import SimpleCookie
+from importlib import import_module
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.db import close_old_connections
+from django.http import HttpRequest
+
+from .cache import league_version
+from .serializers import RankingEntrySerializer
+from .standings import get_ranking
+from .strategies import DEFAULT_RANKING_STRATEGY, ranking_strategies
+
+Table = namedtuple("Table", ["version", "rows"])
+
+# Queued instead of a diff when a subscriber fell too far behind, asking for
+# the whole table.
+RESET = object()
+
+
+def standings_rows(strategy_name):
+    """
+    Returns the ranking of a strategy as ``StandingsAPIView`` results.
+    """
+    return [
+        {"position": position, **row}
+        for position, row in enumerate(
+            RankingEntrySerializer(get_ranking(strategy_name), many=True).data, 1
+        )
+    ]
+
+
+def diff_rows(previous, rows):
+    """
+    Returns the ``(changed, removed)`` rows between two tables: the new rows
+    that differ from the previous ones and the ids of the teams gone.
+    """
+    previous = {row["team"]["id"]: row for row in previous}
+    changed = [row for row in rows if previous.pop(row["team"]["id"], None) != row]
+    return changed, list(previous)
+
+
+class Subscription:
+    """
+    The queue of the events sent to one connection, fed from any thread.
+    """
+
+    def __init__(self, strategy, loop):
+        self.strategy = strategy
+        self.loop = loop
+        self.queue = asyncio.Queue(settings.LIVE_STANDINGS_QUEUE_SIZE)
+
+    def put(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = RESET
+        self.queue.put_nowait(event)
+
+
+class StandingsBroadcaster:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._tables = {}
+
+    def subscribe(self, strategy, loop):
+        subscription = Subscription(strategy, loop)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            if not any(
+                s.strategy == subscription.strategy for s in self._subscriptions
+            ):
+                self._tables.pop(subscription.strategy, None)
+
+    def table(self, strategy):
+        """
+        Returns the current ``Table`` of a subscribed strategy.
+        """
+        self.refresh([strategy])
+        return self._tables[strategy]
+
+    def refresh(self, strategies=None):
+        """
+        Recomputes the tables of the subscribed strategies which are older than
+        the league version, and pushes what changed to their subscribers.
+        """
+        if not self._subscriptions:
+            return
+        version = league_version()
+        with self._lock:
+            if strategies is None:
+                strategies = {s.strategy for s in self._subscriptions}
+            for strategy in strategies:
+                previous = self._tables.get(strategy)
+                if previous is not None and previous.version == version:
+                    continue
+                table = self._tables[strategy] = Table(
+                    version, standings_rows(strategy)
+                )
+                if previous is None:
+                    continue
+                changed, removed = diff_rows(previous.rows, table.rows)
+                if changed or removed:
+                    event = {"version": version, "changed": changed, "removed": removed}
+                    for subscription in self._subscriptions:
+                        if subscription.strategy == strategy:
+                            subscription.put(event)
+
+
+broadcaster = StandingsBroadcaster()
+
+
+def publish_standings():
+    broadcaster.refresh()
+
+
+def format_event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+@sync_to_async
+def get_scope_user(scope):
+    """
+    Returns the user of the session cookie of an ASGI connection.
+    """
+    cookies = SimpleCookie()
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            cookies.load(value.decode("latin-1"))
+    session_key = cookies.get(settings.SESSION_COOKIE_NAME)
+    request = HttpRequest()
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore(
+        session_key.value if session_key else None
+    )
+    try:
+        return get_user(request)
+    finally:
+        close_old_connections()
+
+
+async def send_error(send, status, message):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"text/plain; charset=utf-8")],
+        }
+    )
+    await send({"type": "http.response.body", "body": message.encode()})
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def standings_events(scope, receive, send):
+    """
+    Streams ``standings`` events holding the whole table of
+    ``?strategy=<name>``, then ``diff`` events with the rows that changed.
+    """
+    if scope["method"] != "GET":
+        return await send_error(send, HTTPStatus.METHOD_NOT_ALLOWED, "Use GET.")
+    user = await get_scope_user(scope)
+    if not user.is_authenticated:
+        return await send_error(send, HTTPStatus.FORBIDDEN, "Log in first.")
+    query = parse_qs(scope["query_string"].decode("latin-1"))
+    strategy = query.get("strategy", [DEFAULT_RANKING_STRATEGY])[0]
+    if strategy not in ranking_strategies():
+        return await send_error(
+            send, HTTPStatus.BAD_REQUEST, f"Unknown strategy {strategy!r}."
+        )
+
+    subscription = broadcaster.subscribe(strategy, asyncio.get_running_loop())
+    disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        table = await sync_to_async(broadcaster.table)(strategy)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": HTTPStatus.OK,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+        while True:
+            if table is not None:
+                body = format_event("standings", table._asdict())
+            else:
+                event = asyncio.ensure_future(subscription.queue.get())
+                done, _ = await asyncio.wait(
+                    {event, disconnect},
+                    timeout=settings.LIVE_STANDINGS_KEEPALIVE,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnect in done:
+                    event.cancel()
+                    break
+                if event in done:
+                    event = event.result()
+                    if event is RESET:
+                        table = await sync_to_async(broadcaster.table)(strategy)
+                        continue
+                    body = format_event("diff", event)
+                else:
+                    event.cancel()
+                    await sync_to_async(broadcaster.refresh)([strategy])
+                    body = b": keepalive\n\n"
+            await send({"type": "http.response.body", "body": body, "more_body": True})
+            table = None
+    finally:
+        disconnect.cancel()
+        broadcaster.unsubscribe(subscription)
+
+
+class LiveStandingsMiddleware:
+    """
+    ASGI middleware serving the live standings stream, passing every other
+    connection to ``app``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == settings.LIVE_STANDINGS_PATH:
+            return await standings_events(scope, receive, send)
+        return await self.app(scope, receive, send)
@@ -0,0 +1,219 @@
+"""
+Load test of the sync read endpoints against their async versions.
+
+The endpoints are called in-process through the ASGI application, as an ASGI
+server would, by ``clients`` concurrent clients sending ``requests`` requests
+each, first to the sync endpoint and then to its async version. Every query is
+delayed by ``latency`` seconds, standing for a database reached over the
+network, and every client reads its response ``client_delay`` seconds late,
+like a slow mobile client. The league cache is bypassed unless ``use_cache``,
+so that every request runs the read path.
+
+Sync views share one thread under ASGI and queue behind each other; the async
+ones run their queries in the threads of the executor.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from .benchmarks import machine_info, summarize
+from .bulk import delete_teams
+from .models import Game, Team
+from .synthetic import SyntheticLeague
+
+LOAD_TEST_TEAM_PREFIX = "Load test"
+LOAD_TEST_USER = "loadtest@example.com"
+
+# ``(sync URL name, async URL name, needs a game or a team id)``
+ENDPOINTS = {
+    "ranking": ("game:ranking_table", "game:async-ranking_table", None),
+    "game-list": ("game:game-list", "game:async-game-list", None),
+    "game-detail": ("game:game-detail", "game:async-game-detail", Game),
+    "team-games": ("game:team-games", "game:async-team-games", Team),
+    "standings": ("game:standings", "game:async-standings", None),
+}
+
+
+@contextmanager
+def simulated_latency(seconds):
+    """
+    Delays every query of every thread by ``seconds`` within the block.
+    """
+    active = [True]
+
+    def delay(execute, sql, params, many, context):
+        if active[0]:
+            time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.insert(0, delay)
+
+    if not seconds:
+        yield
+        return
+    for connection in connections.all():
+        install(None, connection)
+    connection_created.connect(install, weak=False)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(install)
+        # Worker threads keep their connections, the delay is disabled there.
+        active[0] = False
+        for connection in connections.all():
+            if delay in connection.execute_wrappers:
+                connection.execute_wrappers.remove(delay)
+
+
+def endpoint_paths(name):
+    sync_name, async_name, model = ENDPOINTS[name]
+    args = []
+    if model is not None:
+        pk = model.objects.order_by("pk").values_list("pk", flat=True).first()
+        if pk is None:
+            raise ValueError(f"{name} needs at least one {model.__name__.lower()}.")
+        args = [pk]
+    return reverse(sync_name, args=args), reverse(async_name, args=args)
+
+
+async def get(app, path, cookie, client_delay):
+    """
+    Sends a GET request to the ASGI ``app``, returning the response status.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"cookie", cookie.encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    status = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif client_delay:
+            await asyncio.sleep(client_delay)
+
+    await app(scope, receive, send)
+    return status
+
+
+async def drive(app, path, cookie, clients, requests, client_delay):
+    """
+    Returns the response times and the number of errors of ``clients``
+    concurrent clients sending ``requests`` requests each to ``path``.
+    """
+    timings = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        for _ in range(requests):
+            started = time.perf_counter()
+            status = await get(app, path, cookie, client_delay)
+            timings.append(time.perf_counter() - started)
+            if status != 200:
+                errors += 1
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return timings, errors
+
+
+def p95(timings):
+    return sorted(timings)[int(0.95 * (len(timings) - 1))]
+
+
+def login_cookie():
+    User = get_user_model()
+    user, _ = User.objects.get_or_create(**{User.USERNAME_FIELD: LOAD_TEST_USER})
+    client = Client()
+    client.force_login(user)
+    return "; ".join(
+        f"{name}={morsel.value}" for name, morsel in client.cookies.items()
+    )
+
+
+def create_league(teams, games, seed=0):
+    SyntheticLeague(teams, games, seed, prefix=LOAD_TEST_TEAM_PREFIX).create()
+
+
+def delete_league():
+    delete_teams(Team.objects.filter(name__startswith=LOAD_TEST_TEAM_PREFIX))
+    User = get_user_model()
+    User.objects.filter(**{User.USERNAME_FIELD: LOAD_TEST_USER}).delete()
+
+
+def run_load_test(
+    names, clients, requests, latency=0.0, client_delay=0.0, use_cache=False
+):
+    """
+    Runs the load test of the ``names`` endpoints and returns the report as a
+    JSON-serializable dict.
+    """
+    overrides = {"ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "testserver"]}
+    if not use_cache:
+        overrides["CACHES"] = {
+            **settings.CACHES,
+            "loadtest": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        }
+        overrides["LEAGUE_CACHE_ALIAS"] = "loadtest"
+    params = {
+        "clients": clients,
+        "requests": requests,
+        "latency": latency,
+        "client_delay": client_delay,
+        "cache": use_cache,
+    }
+    results = []
+    with override_settings(**overrides):
+        app = get_asgi_application()
+        cookie = login_cookie()
+        with simulated_latency(latency):
+            for name in names:
+                for mode, path in zip(("sync", "async"), endpoint_paths(name)):
+                    started = time.perf_counter()
+                    timings, errors = async_to_sync(drive)(
+                        app, path, cookie, clients, requests, client_delay
+                    )
+                    elapsed = time.perf_counter() - started
+                    results.append(
+                        {
+                            "endpoint": name,
+                            "mode": mode,
+                            "path": path,
+                            "errors": errors,
+                            "elapsed": elapsed,
+                            "throughput": len(timings) / elapsed,
+                            "stats": {**summarize(timings), "p95": p95(timings)},
+                        }
+                    )
+    return {
+        "machine_info": machine_info(),
+        "datetime": datetime.now(timezone.utc).isoformat(),
+        "params": params,
+        "results": results,
+    }
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from ...cache import bump_league_version
+from ...snapshots import assign_rounds, refresh_snapshots
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the per-round standings snapshots from the games."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--assign-rounds",
+            action="store_true",
+            help="First give a round to the games without one.",
+        )
+        parser.add_argument(
+            "--games-per-round",
+            type=int,
+            help="Games per assigned round when they have no date, "
+            "half the number of teams by default.",
+        )
+
+    def handle(self, *args, **options):
+        if options["assign_rounds"]:
+            rounds = assign_rounds(options["games_per_round"])
+            self.stdout.write(f"Assigned {rounds} rounds.")
+        count = refresh_snapshots()
+        bump_league_version()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} round snapshots."))
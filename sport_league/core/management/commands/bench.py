@@ -0,0 +1,59 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...benchmarks import SCENARIOS, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the benchmark scenarios against a synthetic league and prints "
+        "the timings as JSON. The league is inserted in a transaction which is "
+        "rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "scenarios",
+            nargs="*",
+            help=f"Scenarios to run, all of them by default: {', '.join(SCENARIOS)}.",
+        )
+        parser.add_argument("--teams", type=int, default=20)
+        parser.add_argument("--games", type=int, default=10_000)
+        parser.add_argument(
+            "--import-rows",
+            type=int,
+            default=1000,
+            help="Number of games imported or written by the write scenarios.",
+        )
+        parser.add_argument("--rounds", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--output", help="Write the JSON report to this file instead of stdout."
+        )
+
+    def handle(self, *args, **options):
+        unknown = [name for name in options["scenarios"] if name not in SCENARIOS]
+        if unknown:
+            raise CommandError(
+                f"Unknown scenarios {', '.join(unknown)}; "
+                f"expected {', '.join(SCENARIOS)}."
+            )
+        report = run_benchmarks(
+            options["scenarios"] or list(SCENARIOS),
+            teams=options["teams"],
+            games=options["games"],
+            import_rows=options["import_rows"],
+            rounds=options["rounds"],
+            seed=options["seed"],
+        )
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+            for benchmark in report["benchmarks"]:
+                self.stdout.write(
+                    f'{benchmark["name"]}: {benchmark["stats"]["mean"] * 1000:.1f} ms'
+                )
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,45 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from ...exports import EXPORT_FORMATS, EXPORTS
+from ...strategies import DEFAULT_RANKING_STRATEGY, ranking_strategies
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes all the games, or the standings of a strategy, as CSV or as a "
+        "columnar file, streaming them from the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=["games", "standings"])
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv")
+        parser.add_argument(
+            "--strategy",
+            default=DEFAULT_RANKING_STRATEGY,
+            choices=list(ranking_strategies()),
+            help="Ranking strategy of the standings.",
+        )
+        parser.add_argument(
+            "--output", help="Write the export to this file instead of stdout."
+        )
+
+    def handle(self, *args, **options):
+        export = EXPORTS[options["dataset"], options["format"]]
+        if options["dataset"] == "standings":
+            chunks = export(options["strategy"])
+        else:
+            chunks = export()
+        binary = options["format"] != "csv"
+        if options["output"]:
+            mode, kwargs = ("wb", {}) if binary else ("w", {"newline": ""})
+            with open(options["output"], mode, **kwargs) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        elif binary:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
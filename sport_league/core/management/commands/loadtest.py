@@ -0,0 +1,81 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...loadtest import ENDPOINTS, create_league, delete_league, run_load_test
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the sync read endpoints with their async versions under many "
+        "concurrent slow clients, through the ASGI application, and prints the "
+        "report as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "endpoints",
+            nargs="*",
+            choices=[[]] + list(ENDPOINTS),
+            help="Endpoints to load, all of them by default.",
+        )
+        parser.add_argument("--clients", type=int, default=50)
+        parser.add_argument(
+            "--requests", type=int, default=5, help="Requests sent by each client."
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.005,
+            help="Seconds added to every query, for a remote database.",
+        )
+        parser.add_argument(
+            "--client-delay",
+            type=float,
+            default=0.05,
+            help="Seconds a client takes to read a response.",
+        )
+        parser.add_argument(
+            "--cache", action="store_true", help="Keep the league cache enabled."
+        )
+        parser.add_argument(
+            "--teams",
+            type=int,
+            default=0,
+            help="Load a synthetic league of this many teams, deleted afterwards.",
+        )
+        parser.add_argument("--games", type=int, default=1000)
+        parser.add_argument(
+            "--output", help="Write the JSON report to this file instead of stdout."
+        )
+
+    def handle(self, *args, **options):
+        if options["teams"]:
+            create_league(options["teams"], options["games"])
+        try:
+            report = run_load_test(
+                options["endpoints"] or list(ENDPOINTS),
+                clients=options["clients"],
+                requests=options["requests"],
+                latency=options["latency"],
+                client_delay=options["client_delay"],
+                use_cache=options["cache"],
+            )
+        except ValueError as e:
+            raise CommandError(e)
+        finally:
+            if options["teams"]:
+                delete_league()
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+            for result in report["results"]:
+                self.stdout.write(
+                    f'{result["endpoint"]} ({result["mode"]}): '
+                    f'{result["throughput"]:.1f} req/s, '
+                    f'p95 {result["stats"]["p95"] * 1000:.1f} ms, '
+                    f'{result["errors"]} errors'
+                )
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...ratings import rebuild_ratings, verify_ratings
+
+
+class Command(BaseCommand):
+    help = "Replays all the games to rebuild the team ratings, or verifies them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only compare the stored ratings with a full replay.",
+        )
+
+    def handle(self, *args, **options):
+        if options["verify"]:
+            mismatches = verify_ratings()
+            for team_id, expected, stored in mismatches:
+                self.stderr.write(
+                    f"team {team_id}: expected {expected}, stored {stored}"
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} team ratings are out of date.")
+            self.stdout.write(self.style.SUCCESS("Ratings are up to date."))
+            return
+
+        count = rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} team ratings."))
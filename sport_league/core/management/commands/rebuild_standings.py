@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...standings import rebuild_standings, verify_standings
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the standings table from the games, or verifies it."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only compare the stored standings with a full recomputation.",
+        )
+
+    def handle(self, *args, **options):
+        if options["verify"]:
+            mismatches = verify_standings()
+            for team_id, strategy, expected, stored in mismatches:
+                self.stderr.write(
+                    f"team {team_id} ({strategy}): expected {expected}, stored {stored}"
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} standings rows are out of date.")
+            self.stdout.write(self.style.SUCCESS("Standings are up to date."))
+            return
+
+        count = rebuild_standings()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} standings rows."))
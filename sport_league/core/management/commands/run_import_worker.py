@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from ...jobs import process_next_job
+
+
+class Command(BaseCommand):
+    help = "Runs the queued game imports in a pool of worker threads."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads", type=int, default=2, help="Number of worker threads."
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as the queue is empty.",
+        )
+
+    def work(self, poll_interval, once):
+        try:
+            while True:
+                job = process_next_job()
+                if job is not None:
+                    self.stdout.write(f"Import job {job.pk}: {job.status}")
+                elif once:
+                    return
+                else:
+                    time.sleep(poll_interval)
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        threads = max(options["threads"], 1)
+        self.stdout.write(f"Starting {threads} import worker(s).")
+        if threads == 1:
+            self.work(options["poll_interval"], options["once"])
+            return
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            futures = [
+                pool.submit(self.work, options["poll_interval"], options["once"])
+                for _ in range(threads)
+            ]
+            for future in futures:
+                future.result()
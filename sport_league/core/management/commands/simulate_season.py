@@ -0,0 +1,128 @@
+import csv
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...models import Team
+from ...simulation import DEFAULT_BATCH_SIZE, simulate_season
+from ...store import GameStore
+from ...strategies import DEFAULT_RANKING_STRATEGY, ranking_strategies
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulates the rest of the season many times from the current results "
+        "and prints the finishing position probabilities of every team."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--strategy",
+            default=DEFAULT_RANKING_STRATEGY,
+            choices=list(ranking_strategies()),
+        )
+        parser.add_argument("--simulations", type=int, default=100_000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.SIMULATION_WORKERS,
+            help="Processes simulating the seasons, all CPUs by default.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Seasons simulated at once by a worker.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--store",
+            nargs="?",
+            const=settings.GAME_STORE_PATH,
+            help=(
+                "Read the games from a game store written by snapshot_games, "
+                "GAME_STORE_PATH by default, instead of the database."
+            ),
+        )
+        parser.add_argument(
+            "--fixtures",
+            help=(
+                "CSV file of the home_team,away_team names of the games left to "
+                "play, the missing games of a double round-robin by default."
+            ),
+        )
+        parser.add_argument(
+            "--relegation-places",
+            type=int,
+            default=settings.SIMULATION_RELEGATION_PLACES,
+        )
+        parser.add_argument(
+            "--output", help="Write the JSON report to this file instead of stdout."
+        )
+
+    def read_fixtures(self, path, teams=None):
+        """
+        Returns the ``(home_team_id, away_team_id)`` pairs of a fixtures file.
+        """
+        if teams is None:
+            teams = Team.objects.all()
+        team_ids = {team.name: team.pk for team in teams}
+        fixtures = []
+        try:
+            with open(path, newline="") as f:
+                for line, row in enumerate(csv.reader(f), 1):
+                    if not row:
+                        continue
+                    if len(row) != 2:
+                        raise CommandError(
+                            f"{path}:{line}: expected home_team,away_team."
+                        )
+                    try:
+                        fixtures.append(tuple(team_ids[name.strip()] for name in row))
+                    except KeyError as e:
+                        raise CommandError(f"{path}:{line}: unknown team {e}.")
+        except OSError as e:
+            raise CommandError(e)
+        return fixtures
+
+    def handle(self, *args, **options):
+        source = {}
+        if options["store"]:
+            try:
+                store = GameStore(options["store"])
+            except (OSError, ValueError) as e:
+                raise CommandError(e)
+            source = {"arrays": store.arrays, "teams": store.teams()}
+        if options["fixtures"]:
+            source["fixtures"] = self.read_fixtures(
+                options["fixtures"], source.get("teams")
+            )
+        try:
+            result = simulate_season(
+                ranking_strategies()[options["strategy"]],
+                options["simulations"],
+                workers=options["workers"],
+                batch_size=options["batch_size"],
+                seed=options["seed"],
+                **source,
+            )
+        except ValueError as e:
+            raise CommandError(e)
+        report = {
+            "strategy": options["strategy"],
+            **result.as_dict(options["relegation_places"]),
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+            for position, row in enumerate(report["results"], 1):
+                self.stdout.write(
+                    f'{position:>3}. {row["team"]["name"]}: '
+                    f'expected {row["expected_position"]:.2f}, '
+                    f'title {row["title"]:.1%}, '
+                    f'relegation {row["relegation"]:.1%}'
+                )
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...store import write_game_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes the games and the team names to a compact file that analytics "
+        "processes map in memory instead of querying the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=settings.GAME_STORE_PATH,
+            help="Path of the game store, GAME_STORE_PATH by default.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            games = write_game_store(options["output"])
+        except ValueError as e:
+            raise CommandError(e)
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {games} games to {options['output']}.")
+        )
@@ -0,0 +1,80 @@
+# Generated by Django 3.2.18 on 2026-10-18 13:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# (win, draw, loss) points of the strategies existing at the time of this migration
+STRATEGY_WEIGHTS = {"basic": (3, 1, 0), "alternate": (2, 1, 0)}
+
+
+def build_standings(apps, schema_editor):
+    Game = apps.get_model("core", "Game")
+    Team = apps.get_model("core", "Team")
+    Standing = apps.get_model("core", "Standing")
+    totals = {pk: [0] * 6 for pk in Team.objects.values_list("pk", flat=True)}
+    for home_id, home_score, away_id, away_score in Game.objects.values_list(
+        "home_team_id", "home_team_score", "away_team_id", "away_team_score"
+    ).iterator():
+        for team_id, scored, conceded in (
+            (home_id, home_score, away_score),
+            (away_id, away_score, home_score),
+        ):
+            row = totals[team_id]
+            row[0] += 1
+            row[1] += scored > conceded
+            row[2] += scored == conceded
+            row[3] += scored < conceded
+            row[4] += scored
+            row[5] += conceded
+    Standing.objects.bulk_create(
+        [
+            Standing(
+                team_id=team_id,
+                strategy=strategy,
+                points=wins * win + draws * draw + losses * loss,
+                played=played,
+                wins=wins,
+                draws=draws,
+                losses=losses,
+                goals_for=goals_for,
+                goals_against=goals_against,
+            )
+            for team_id, (played, wins, draws, losses, goals_for, goals_against) in totals.items()
+            for strategy, (win, draw, loss) in STRATEGY_WEIGHTS.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Standing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('strategy', models.CharField(max_length=32)),
+                ('points', models.IntegerField(default=0)),
+                ('played', models.PositiveIntegerField(default=0)),
+                ('wins', models.PositiveIntegerField(default=0)),
+                ('draws', models.PositiveIntegerField(default=0)),
+                ('losses', models.PositiveIntegerField(default=0)),
+                ('goals_for', models.PositiveIntegerField(default=0)),
+                ('goals_against', models.PositiveIntegerField(default=0)),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='core.team')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='standing',
+            index=models.Index(fields=['strategy', '-points'], name='standing_points_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='standing',
+            constraint=models.UniqueConstraint(fields=('strategy', 'team'), name='unique_standing_per_strategy'),
+        ),
+        migrations.RunPython(build_standings, migrations.RunPython.noop),
+    ]
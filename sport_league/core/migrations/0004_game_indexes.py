@@ -0,0 +1,44 @@
+# Generated by Django 3.2.18 on 2026-10-18 14:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_importjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='game',
+            name='away_team',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='away_games', to='core.team'),
+        ),
+        migrations.AlterField(
+            model_name='game',
+            name='home_team',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='home_games', to='core.team'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['home_team', 'id'], name='game_home_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['away_team', 'id'], name='game_away_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['home_team', 'home_team_score', 'away_team_score'], name='game_home_results_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['away_team', 'away_team_score', 'home_team_score'], name='game_away_results_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['home_team', 'away_team'], name='game_pairing_idx'),
+        ),
+    ]
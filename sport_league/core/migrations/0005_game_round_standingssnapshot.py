@@ -0,0 +1,36 @@
+# Generated by Django 3.2.18 on 2026-10-18 14:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_game_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StandingsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('round', models.PositiveIntegerField(unique=True)),
+                ('deltas', models.JSONField(default=list)),
+                ('totals', models.JSONField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='played_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='round',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['round'], name='game_round_idx'),
+        ),
+    ]
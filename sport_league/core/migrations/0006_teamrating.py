@@ -0,0 +1,57 @@
+# Generated by Django 3.2.18 on 2026-10-18 14:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Elo parameters at the time of this migration
+INITIAL, K_FACTOR, HOME_ADVANTAGE = 1500.0, 20.0, 50.0
+
+
+def build_ratings(apps, schema_editor):
+    Game = apps.get_model("core", "Game")
+    Team = apps.get_model("core", "Team")
+    TeamRating = apps.get_model("core", "TeamRating")
+    ratings = {pk: [INITIAL, 0] for pk in Team.objects.values_list("pk", flat=True)}
+    for home_id, home_score, away_id, away_score in (
+        Game.objects.order_by("pk")
+        .values_list("home_team_id", "home_team_score", "away_team_id", "away_team_score")
+        .iterator()
+    ):
+        home, away = ratings[home_id], ratings[away_id]
+        expected = 1 / (1 + 10 ** ((away[0] - home[0] - HOME_ADVANTAGE) / 400))
+        result = 1.0 if home_score > away_score else 0.5 if home_score == away_score else 0.0
+        change = K_FACTOR * (result - expected)
+        home[0] += change
+        away[0] -= change
+        home[1] += 1
+        away[1] += 1
+    TeamRating.objects.bulk_create(
+        [
+            TeamRating(team_id=team_id, rating=rating, games=games)
+            for team_id, (rating, games) in ratings.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_game_round_standingssnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamRating',
+            fields=[
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating', serialize=False, to='core.team')),
+                ('rating', models.FloatField()),
+                ('games', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='teamrating',
+            index=models.Index(fields=['-rating'], name='team_rating_idx'),
+        ),
+        migrations.RunPython(build_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.18 on 2026-10-18 15:37
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_importjob_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='team_name_lower_idx'),
+        ),
+    ]
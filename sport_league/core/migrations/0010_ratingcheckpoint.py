@@ -0,0 +1,21 @@
+# Generated by Django 3.2.18 on 2026-10-18 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_team_name_lower_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game_id', models.PositiveIntegerField(unique=True)),
+                ('ratings', models.JSONField(default=list)),
+            ],
+        ),
+    ]
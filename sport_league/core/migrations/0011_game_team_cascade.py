@@ -0,0 +1,24 @@
+# Generated by Django 3.2.18 on 2026-10-18 16:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_ratingcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='game',
+            name='away_team',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='away_games', to='core.team'),
+        ),
+        migrations.AlterField(
+            model_name='game',
+            name='home_team',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='home_games', to='core.team'),
+        ),
+    ]
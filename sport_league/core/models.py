@@ -1,6 +1,8 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -52,6 +54,12 @@ class User(AbstractUser):
 class Team(models.Model):
     name = models.CharField(max_length=255, unique=True)
 
+    class Meta:
+        indexes = [
+            # Case-insensitive prefix searches of the admin
+            models.Index(Lower("name"), name="team_name_lower_idx"),
+        ]
+
     def __str__(self):
         return self.name if self.name else ""
 
@@ -61,14 +69,39 @@ class Team(models.Model):
 
 
 class Game(models.Model):
+    # The team columns are indexed by the composite indexes below. Delete teams
+    # with ``core.bulk.delete_teams`` to cascade to their games in one batch.
     home_team = models.ForeignKey(
-        Team, related_name="home_games", on_delete=models.CASCADE
+        Team, related_name="home_games", on_delete=models.CASCADE, db_index=False
     )
     home_team_score = models.PositiveIntegerField()
     away_team = models.ForeignKey(
-        Team, related_name="away_games", on_delete=models.CASCADE
+        Team, related_name="away_games", on_delete=models.CASCADE, db_index=False
     )
     away_team_score = models.PositiveIntegerField()
+    played_at = models.DateTimeField(null=True, blank=True)
+    # Matchday of the game, the unit of the standings snapshots
+    round = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Games of a team in order, for the team history and cursor pages
+            models.Index(fields=["home_team", "id"], name="game_home_history_idx"),
+            models.Index(fields=["away_team", "id"], name="game_away_history_idx"),
+            # Covering indexes of the standings aggregation, grouped by team
+            models.Index(
+                fields=["home_team", "home_team_score", "away_team_score"],
+                name="game_home_results_idx",
+            ),
+            models.Index(
+                fields=["away_team", "away_team_score", "home_team_score"],
+                name="game_away_results_idx",
+            ),
+            # Head-to-head lookups
+            models.Index(fields=["home_team", "away_team"], name="game_pairing_idx"),
+            # Replay of the games from a round, see core.snapshots
+            models.Index(fields=["round"], name="game_round_idx"),
+        ]
 
     def __str__(self):
         return f"{self.home_team}:{self.home_team_score}--{self.away_team}:{self.away_team_score}"
@@ -88,3 +121,150 @@ class Game(models.Model):
             return self.home_team
 
         return self.away_team
+
+
+class Standing(models.Model):
+    """
+    Materialized league table row of a team for one ranking strategy.
+
+    Rows are kept up to date by applying deltas whenever games are written,
+    see ``core.standings``.
+    """
+
+    team = models.ForeignKey(Team, related_name="standings", on_delete=models.CASCADE)
+    strategy = models.CharField(max_length=32)
+    points = models.IntegerField(default=0)
+    played = models.PositiveIntegerField(default=0)
+    wins = models.PositiveIntegerField(default=0)
+    draws = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    goals_for = models.PositiveIntegerField(default=0)
+    goals_against = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["strategy", "team"], name="unique_standing_per_strategy"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["strategy", "-points"], name="standing_points_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.team}:{self.points} ({self.strategy})"
+
+
+class StandingsSnapshot(models.Model):
+    """
+    Standings changes of one round, see ``core.snapshots``.
+
+    ``deltas`` holds what every team that played in the round added to its
+    totals. Keyframe rounds also store the cumulative ``totals`` of every team
+    after the round. Both are lists of ``[team_id, played, wins, draws,
+    losses, goals_for, goals_against]``.
+    """
+
+    round = models.PositiveIntegerField(unique=True)
+    deltas = models.JSONField(default=list)
+    totals = models.JSONField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Round {self.round}{' (keyframe)' if self.is_keyframe else ''}"
+
+    @property
+    def is_keyframe(self):
+        return self.totals is not None
+
+
+class TeamRating(models.Model):
+    """
+    Elo rating of a team, kept up to date as games are written, see
+    ``core.ratings``.
+    """
+
+    team = models.OneToOneField(
+        Team, related_name="rating", on_delete=models.CASCADE, primary_key=True
+    )
+    rating = models.FloatField()
+    games = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["-rating"], name="team_rating_idx")]
+
+    def __str__(self):
+        return f"{self.team}:{self.rating:.0f}"
+
+
+class RatingCheckpoint(models.Model):
+    """
+    Ratings of every team after the games up to ``game_id``, the point a
+    replay of the ratings starts from, see ``core.ratings``.
+
+    ``ratings`` is a list of ``[team_id, rating, games]``.
+    """
+
+    # Not a foreign key: the checkpoint stays valid if that game is deleted.
+    game_id = models.PositiveIntegerField(unique=True)
+    ratings = models.JSONField(default=list)
+
+    def __str__(self):
+        return f"Ratings after game {self.game_id}"
+
+
+class ImportJob(models.Model):
+    """
+    A games upload imported in the background by ``manage.py run_import_worker``.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, _("Pending")),
+        (RUNNING, _("Running")),
+        (SUCCEEDED, _("Succeeded")),
+        (FAILED, _("Failed")),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        related_name="import_jobs",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+    file = models.FileField(upload_to="imports/%Y/%m/%d/")
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=PENDING, db_index=True
+    )
+    rows_total = models.PositiveIntegerField(null=True, blank=True)
+    # Rows committed so far, the point a reclaimed job resumes from
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_invalid = models.PositiveIntegerField(default=0)
+    # Rows left unimported by an error
+    rows_failed = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    message = models.TextField(blank=True)
+    # Number of times the job was claimed by a worker
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.file.name} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+    @property
+    def rows_per_second(self):
+        if not self.started_at:
+            return 0.0
+        end = self.finished_at or timezone.now()
+        elapsed = (end - self.started_at).total_seconds()
+        return self.rows_processed / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination
+
+
+class GameCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the primary key: every page is an indexed
+    ``WHERE id > cursor ORDER BY id LIMIT n`` lookup, however deep it is.
+    """
+
+    ordering = "id"
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+def estimated_count(queryset):
+    """
+    Returns a cheap estimate of the number of rows of the table of an
+    unfiltered ``queryset``: the planner statistics on PostgreSQL, the largest
+    primary key elsewhere, which is an index lookup. Returns None when there is
+    no estimate.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # Tables never analyzed have no statistics.
+        return int(row[0]) if row and row[0] > 0 else None
+    return queryset.order_by().aggregate(largest=Max("pk"))["largest"]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Django paginator estimating the size of a whole table instead of running
+    a ``COUNT(*)`` over it, for the admin changelists of large tables.
+
+    Filtered querysets and tables estimated under
+    ``ADMIN_ESTIMATED_COUNT_THRESHOLD`` rows are counted exactly. The estimate
+    may be off by the rows deleted or inserted lately, so the last pages can
+    be empty.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset)
+            if estimate is not None and estimate >= (
+                settings.ADMIN_ESTIMATED_COUNT_THRESHOLD
+            ):
+                return estimate
+        return super().count
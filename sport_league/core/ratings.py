@@ -0,0 +1,250 @@
+"""
+Elo ratings of the teams.
+
+Every team has a ``TeamRating`` starting at ``RATING_INITIAL``. After a game
+the home team gains ``RATING_K_FACTOR`` times the difference between its
+result (1 for a win, 0.5 for a draw, 0 for a loss) and the result expected
+from the two ratings, counting ``RATING_HOME_ADVANTAGE`` extra points for the
+home team, and the away team loses as much. Ratings depend on the order of the
+games, which is the order they were created in.
+
+New games are applied to the stored ratings of their teams as they are saved.
+Changing or deleting a game changes every rating computed after it, so the
+games are then replayed in id order from the last ``RatingCheckpoint`` before
+the first changed game. A replay stores a checkpoint of the ratings of every
+team every ``RATING_CHECKPOINT_INTERVAL`` games, and only writes the ratings
+that changed. The same operations run in the same order as in a replay of
+all the games, so the ratings are exactly those of ``compute_team_ratings``.
+"""
+from array import array
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Game, RatingCheckpoint, Team, TeamRating
+
+RATING_GAME_FIELDS = (
+    "home_team_id",
+    "away_team_id",
+    "home_team_score",
+    "away_team_score",
+)
+
+
+def expected_result(rating, opponent_rating):
+    """
+    Returns the expected result of a team against an opponent, between 0 and 1.
+    """
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+
+
+def game_result(home_score, away_score):
+    """
+    Returns the result of the home team: 1 for a win, 0.5 for a draw and 0 for
+    a loss.
+    """
+    if home_score > away_score:
+        return 1.0
+    if home_score == away_score:
+        return 0.5
+    return 0.0
+
+
+def rating_change(home_rating, away_rating, home_score, away_score):
+    """
+    Returns the rating points the home team gains, and the away team loses.
+    """
+    expected = expected_result(
+        home_rating + settings.RATING_HOME_ADVANTAGE, away_rating
+    )
+    return settings.RATING_K_FACTOR * (game_result(home_score, away_score) - expected)
+
+
+def compute_ratings(team_ids, rows):
+    """
+    Returns ``(ratings, games)`` arrays indexed like ``team_ids`` after playing
+    the ``(home_id, away_id, home_score, away_score)`` rows in order.
+    """
+    index = {team_id: i for i, team_id in enumerate(team_ids)}
+    ratings = array("d", [settings.RATING_INITIAL]) * len(index)
+    games = array("L", [0]) * len(index)
+    for home_id, away_id, home_score, away_score in rows:
+        home, away = index[home_id], index[away_id]
+        change = rating_change(ratings[home], ratings[away], home_score, away_score)
+        ratings[home] += change
+        ratings[away] -= change
+        games[home] += 1
+        games[away] += 1
+    return ratings, games
+
+
+def game_rows(chunk_size=10000):
+    """
+    Streams the games in rating order as ``compute_ratings`` rows.
+    """
+    return (
+        Game.objects.order_by("pk")
+        .values_list(*RATING_GAME_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def compute_team_ratings(arrays=None, team_ids=None):
+    """
+    Computes the rating of every team from scratch, without saving them.
+
+    The games are streamed from the database, or read from ``arrays`` in id
+    order, e.g. those of a ``core.store.GameStore`` with its ``team_ids``.
+    """
+    if team_ids is None:
+        team_ids = Team.objects.order_by("pk").values_list("pk", flat=True)
+    team_ids = [int(team_id) for team_id in team_ids]
+    rows = game_rows() if arrays is None else arrays.rows()
+    ratings, games = compute_ratings(team_ids, rows)
+    return [
+        TeamRating(team_id=team_id, rating=rating, games=count)
+        for team_id, rating, count in zip(team_ids, ratings, games)
+    ]
+
+
+def rebuild_ratings():
+    """
+    Replays all the games, saving the ratings of every team and their
+    checkpoints, e.g. after changing the ``RATING_*`` settings.
+    """
+    return replay_ratings(create_missing=True)
+
+
+def verify_ratings(tolerance=1e-6):
+    """
+    Returns the list of ``(team_id, expected, stored)`` mismatches between the
+    stored ratings and a replay of all the games.
+    """
+    stored = dict(TeamRating.objects.values_list("team_id", "rating"))
+    mismatches = []
+    for row in compute_team_ratings():
+        rating = stored.pop(row.team_id, None)
+        if rating is None or abs(rating - row.rating) > tolerance:
+            mismatches.append((row.team_id, row.rating, rating))
+    for team_id, rating in stored.items():
+        mismatches.append((team_id, None, rating))
+    return mismatches
+
+
+def ensure_ratings(team_ids):
+    """
+    Creates the missing ratings of the given teams.
+    """
+    TeamRating.objects.bulk_create(
+        [
+            TeamRating(team_id=team_id, rating=settings.RATING_INITIAL)
+            for team_id in team_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def replay_ratings(first=None, create_missing=False, chunk_size=10000):
+    """
+    Replays the games from the game ``first``, all of them by default, and
+    saves the ratings that changed. Returns the number of teams rated.
+
+    The replay starts from the last checkpoint before ``first``; the later
+    checkpoints are stored again along the way. Without ``create_missing``,
+    only the existing rating rows are updated, so that none is created for a
+    team being deleted.
+    """
+    interval = settings.RATING_CHECKPOINT_INTERVAL
+    with transaction.atomic():
+        checkpoints = RatingCheckpoint.objects.select_for_update()
+        start = None
+        if first is not None:
+            start = checkpoints.filter(game_id__lt=first).order_by("-game_id").first()
+        ratings = {}
+        if start is None:
+            checkpoints.all().delete()
+        else:
+            checkpoints.filter(game_id__gt=start.game_id).delete()
+            ratings = {
+                team_id: [rating, games] for team_id, rating, games in start.ratings
+            }
+        rows = (
+            Game.objects.filter(pk__gt=start.game_id if start else 0)
+            .order_by("pk")
+            .values_list("pk", *RATING_GAME_FIELDS)
+            .iterator(chunk_size=chunk_size)
+        )
+        new_checkpoints = []
+        for count, (pk, home_id, away_id, home_score, away_score) in enumerate(rows, 1):
+            home = ratings.setdefault(home_id, [settings.RATING_INITIAL, 0])
+            away = ratings.setdefault(away_id, [settings.RATING_INITIAL, 0])
+            change = rating_change(home[0], away[0], home_score, away_score)
+            home[0] += change
+            away[0] -= change
+            home[1] += 1
+            away[1] += 1
+            if count % interval == 0:
+                new_checkpoints.append(
+                    RatingCheckpoint(
+                        game_id=pk,
+                        ratings=[
+                            [team_id, *ratings[team_id]] for team_id in sorted(ratings)
+                        ],
+                    )
+                )
+        RatingCheckpoint.objects.bulk_create(new_checkpoints, batch_size=100)
+
+        stored = TeamRating.objects.select_for_update().in_bulk()
+        team_ids = stored.keys()
+        if create_missing:
+            team_ids = Team.objects.values_list("pk", flat=True)
+        changed, missing = [], []
+        for team_id in team_ids:
+            rating, games = ratings.get(team_id, (settings.RATING_INITIAL, 0))
+            row = stored.get(team_id)
+            if row is None:
+                missing.append(TeamRating(team_id=team_id, rating=rating, games=games))
+            elif (row.rating, row.games) != (rating, games):
+                row.rating, row.games = rating, games
+                changed.append(row)
+        TeamRating.objects.bulk_update(changed, ["rating", "games"], batch_size=1000)
+        TeamRating.objects.bulk_create(missing, batch_size=1000, ignore_conflicts=True)
+    return len(team_ids)
+
+
+def apply_changes(added=(), removed=()):
+    """
+    Applies added and removed game results to the ratings.
+
+    Added games come after every stored game and are applied in order to the
+    ratings of their teams. Removed ones trigger a replay from the first
+    changed game, or of all the games without their ids, unless only the
+    round of a game changed.
+    """
+    if removed:
+        if len(removed) == len(added) == 1 and removed[0][:4] == added[0][:4]:
+            return
+        pks = [result.pk for result in (*added, *removed)]
+        replay_ratings(None if None in pks else min(pks))
+        return
+    if not added:
+        return
+    team_ids = {result.home_team_id for result in added}
+    team_ids.update(result.away_team_id for result in added)
+    with transaction.atomic():
+        ratings = TeamRating.objects.select_for_update().in_bulk(team_ids)
+        missing = team_ids.difference(ratings)
+        if missing:
+            ensure_ratings(missing)
+            ratings.update(TeamRating.objects.in_bulk(missing))
+        for result in added:
+            home = ratings[result.home_team_id]
+            away = ratings[result.away_team_id]
+            change = rating_change(
+                home.rating, away.rating, result.home_team_score, result.away_team_score
+            )
+            home.rating += change
+            away.rating -= change
+            home.games += 1
+            away.games += 1
+        TeamRating.objects.bulk_update(ratings.values(), ["rating", "games"])
@@ -1,8 +1,13 @@
+from itertools import chain
+
 from import_export import resources
 from import_export.fields import Field
 from import_export.widgets import ForeignKeyWidget
 
+from .bulk import resolve_team_ids
 from .models import Game, Team
+from .signals import games_changed
+from .standings import GameResult
 
 
 class GameResource(resources.ModelResource):
@@ -17,12 +22,88 @@ class GameResource(resources.ModelResource):
         widget=ForeignKeyWidget(Team, "name"),
     )
 
+    _missing_teams = {}
+
     class Meta:
         model = Game
-        fields = ("id", "home_team", "home_team_score", "away_team", "away_team_score")
+        fields = (
+            "id",
+            "home_team",
+            "home_team_score",
+            "away_team",
+            "away_team_score",
+            "round",
+            "played_at",
+        )
+        use_bulk = True
+        batch_size = 1000
+
+    def before_import(self, dataset, using_transactions, dry_run, **kwargs):
+        names = {
+            name for name in chain(dataset["home_team"], dataset["away_team"]) if name
+        }
+        self._missing_teams = {}
+        if dry_run and not using_transactions:
+            # Nothing would roll the teams back: the missing ones are unsaved
+            # instances instead.
+            existing = set(
+                Team.objects.filter(name__in=names).values_list("name", flat=True)
+            )
+            self._missing_teams = {name: Team(name=name) for name in names - existing}
+        else:
+            # Create all the missing teams at once instead of once per row.
+            resolve_team_ids(names)
+
+    def import_field(self, field, obj, data, is_m2m=False, **kwargs):
+        team = self._missing_teams.get(data.get(field.column_name))
+        if team is not None and field.attribute in ("home_team", "away_team"):
+            setattr(obj, field.attribute, team)
+        else:
+            super().import_field(field, obj, data, is_m2m, **kwargs)
+
+    def _send_games_changed(self, using_transactions, dry_run, result, errors, **kw):
+        # Bulk writes skip the model signals, so the standings have to be told.
+        # Nothing is written on a dry run outside of a transaction, and a failed
+        # batch is reported as a new base error.
+        if dry_run and not using_transactions:
+            return
+        if result is not None and len(result.base_errors) > errors:
+            return
+        games_changed.send(sender=Game, **kw)
+
+    def bulk_create(
+        self, using_transactions, dry_run, raise_errors, batch_size=None, result=None
+    ):
+        added = [GameResult.from_game(game) for game in self.create_instances]
+        errors = len(result.base_errors) if result is not None else 0
+        super().bulk_create(
+            using_transactions, dry_run, raise_errors, batch_size, result
+        )
+        if added:
+            self._send_games_changed(
+                using_transactions, dry_run, result, errors, added=added, removed=[]
+            )
 
-    def before_import_row(self, row, **kwargs):
-        home_team_name = row["home_team"]
-        away_team_name = row["away_team"]
-        Team.objects.get_or_create(name=home_team_name)
-        Team.objects.get_or_create(name=away_team_name)
+    def bulk_update(
+        self, using_transactions, dry_run, raise_errors, batch_size=None, result=None
+    ):
+        added = [GameResult.from_game(game) for game in self.update_instances]
+        removed = [
+            GameResult(*row)
+            for row in Game.objects.filter(
+                pk__in=[game.pk for game in self.update_instances]
+            ).values_list(*GameResult._fields)
+        ]
+        errors = len(result.base_errors) if result is not None else 0
+        super().bulk_update(
+            using_transactions, dry_run, raise_errors, batch_size, result
+        )
+        if added:
+            self._send_games_changed(
+                using_transactions,
+                dry_run,
+                result,
+                errors,
+                added=added,
+                removed=removed,
+            )
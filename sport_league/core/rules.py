@@ -0,0 +1,147 @@
+"""
+Declarative ranking rules.
+
+A ranking strategy is described by plain data, e.g. in the
+``RANKING_STRATEGIES`` setting::
+
+    "league": {
+        "label": "League",
+        "points": {"win": 3, "draw": 1, "loss": 0},
+        "tie_breakers": ["goal_difference", "goals_for", "head_to_head", "name"],
+    }
+
+``compile_rules`` turns the tie-breakers into a list of sorting stages once
+per strategy. Consecutive tie-breakers computed from the totals of a team are
+merged into a single tuple key; ``head_to_head`` splits the stages because it
+depends on the group of teams still level, and is evaluated as a mini-league
+between them. ``name`` always ends the list so that rankings are stable.
+"""
+from collections import namedtuple
+from itertools import groupby
+
+TeamTotals = namedtuple(
+    "TeamTotals",
+    ["played", "wins", "draws", "losses", "goals_for", "goals_against"],
+)
+EMPTY_TOTALS = TeamTotals(0, 0, 0, 0, 0, 0)
+
+RankingEntry = namedtuple("RankingEntry", ["team", "points", "totals"])
+
+HEAD_TO_HEAD = "head_to_head"
+
+# Sort keys of the tie-breakers computed from the totals of a team, smallest
+# first.
+TIE_BREAKERS = {
+    "goal_difference": lambda entry: (
+        entry.totals.goals_against - entry.totals.goals_for
+    ),
+    "goals_for": lambda entry: -entry.totals.goals_for,
+    "goals_against": lambda entry: entry.totals.goals_against,
+    "wins": lambda entry: -entry.totals.wins,
+    "name": lambda entry: entry.team.name,
+}
+TIE_BREAKER_NAMES = (*TIE_BREAKERS, HEAD_TO_HEAD)
+
+
+def _points_key(entry):
+    return -entry.points
+
+
+def _tuple_key(keys):
+    if len(keys) == 1:
+        return keys[0]
+    return lambda entry: tuple(key(entry) for key in keys)
+
+
+def _static_stage(key):
+    return lambda rules, entries, pairwise: key
+
+
+class CompiledRules:
+    """
+    The sorting stages of a strategy, shared by every ranking it computes.
+    """
+
+    def __init__(self, weights, stages, needs_head_to_head):
+        self.weights = weights
+        self.stages = stages
+        self.needs_head_to_head = needs_head_to_head
+
+    def head_to_head_key(self, entries, pairwise):
+        """
+        Ranks the mini-league of ``entries``: points, then goal difference,
+        then goals scored in the games they played against each other.
+        """
+        table = pairwise().mini_league(
+            [entry.team.pk for entry in entries], self.weights
+        )
+        keys = {
+            team_id: tuple(-value for value in row) for team_id, row in table.items()
+        }
+        return lambda entry: keys[entry.team.pk]
+
+    def rank(self, entries, pairwise):
+        """
+        Returns the ``RankingEntry`` list sorted by points, then tie-breakers.
+
+        The stages are applied in turn to every group of entries still level.
+        ``pairwise(team_ids)`` returns the ``core.vectorized.PairwiseResults``
+        of the games played between ``team_ids``; it is only called when a
+        head-to-head tie-breaker has teams to separate, once for all the
+        teams level at that stage.
+        """
+        groups = [list(entries)]
+        for stage in self.stages:
+            tied = [
+                entry.team.pk for group in groups if len(group) > 1 for entry in group
+            ]
+            if not tied:
+                break
+            results = []
+
+            def get_pairwise():
+                if not results:
+                    results.append(pairwise(tied))
+                return results[0]
+
+            ranked = []
+            for group in groups:
+                if len(group) < 2:
+                    ranked.append(group)
+                    continue
+                key = stage(self, group, get_pairwise)
+                group.sort(key=key)
+                ranked.extend(list(level) for _, level in groupby(group, key=key))
+            groups = ranked
+        return [entry for group in groups for entry in group]
+
+
+def compile_rules(weights, tie_breakers):
+    """
+    Compiles ``(win, draw, loss)`` weights and tie-breaker names.
+
+    Raises ``ValueError`` for an unknown tie-breaker.
+    """
+    tie_breakers = list(tie_breakers)
+    for name in tie_breakers:
+        if name not in TIE_BREAKER_NAMES:
+            raise ValueError(
+                f"Unknown tie-breaker {name!r}, expected one of "
+                f"{', '.join(TIE_BREAKER_NAMES)}."
+            )
+    if "name" not in tie_breakers:
+        tie_breakers.append("name")
+
+    stages = []
+    keys = [_points_key]
+    for name in tie_breakers:
+        if name == HEAD_TO_HEAD:
+            if keys:
+                stages.append(_static_stage(_tuple_key(keys)))
+                keys = []
+            stages.append(CompiledRules.head_to_head_key)
+        else:
+            keys.append(TIE_BREAKERS[name])
+    if keys:
+        stages.append(_static_stage(_tuple_key(keys)))
+    return CompiledRules(tuple(weights), stages, HEAD_TO_HEAD in tie_breakers)
@@ -1,6 +1,7 @@
+from django.urls import reverse
 from rest_framework import serializers
 
-from .models import Game, Team
+from .models import Game, ImportJob, Team, TeamRating
 
 
 class TeamSerializer(serializers.ModelSerializer):
@@ -17,7 +18,15 @@ class GameSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Game
-        fields = ["id", "home_team", "home_team_score", "away_team", "away_team_score"]
+        fields = [
+            "id",
+            "home_team",
+            "home_team_score",
+            "away_team",
+            "away_team_score",
+            "round",
+            "played_at",
+        ]
 
     def validate(self, attrs):
         if not self.instance:
@@ -45,3 +54,180 @@ class GameSerializer(serializers.ModelSerializer):
         # but if we want we need to know do we need to change the team name or just change the team itself
         instance = super(GameSerializer, self).update(instance, validated_data)
         return instance
+
+
+class GameRowSerializer:
+    """
+    Read-only equivalent of ``GameSerializer`` for rows fetched with ``rows()``.
+
+    The rows are ``values_list`` tuples holding the game fields and the joined
+    team names, and the representation is built directly from them instead of
+    going through the DRF fields of ``GameSerializer`` and two nested
+    ``TeamSerializer`` instances per game. The output is the same.
+    """
+
+    FIELDS = (
+        "id",
+        "home_team_id",
+        "home_team__name",
+        "home_team_score",
+        "away_team_id",
+        "away_team__name",
+        "away_team_score",
+        "round",
+        "played_at",
+    )
+    played_at_field = serializers.DateTimeField()
+
+    def __init__(self, instance, many=False):
+        self.instance = instance
+        self.many = many
+
+    @classmethod
+    def rows(cls, queryset):
+        return queryset.values_list(*cls.FIELDS, named=True)
+
+    @classmethod
+    def to_representation(cls, row):
+        (
+            pk,
+            home_id,
+            home_name,
+            home_score,
+            away_id,
+            away_name,
+            away_score,
+            round_number,
+            played_at,
+        ) = row
+        return {
+            "id": pk,
+            "home_team": {"id": home_id, "name": home_name},
+            "home_team_score": home_score,
+            "away_team": {"id": away_id, "name": away_name},
+            "away_team_score": away_score,
+            "round": round_number,
+            "played_at": (
+                cls.played_at_field.to_representation(played_at)
+                if played_at is not None
+                else None
+            ),
+        }
+
+    @property
+    def data(self):
+        if self.many:
+            return [self.to_representation(row) for row in self.instance]
+        return self.to_representation(self.instance)
+
+
+class RankingStrategySerializer(serializers.Serializer):
+    """
+    Describes a ``RankingStrategy``, given as a ``(name, strategy)`` pair.
+    """
+
+    def to_representation(self, instance):
+        name, strategy = instance
+        return {
+            "name": name,
+            "label": strategy.label or name,
+            "points": {
+                "win": strategy.win_points,
+                "draw": strategy.draw_points,
+                "loss": strategy.loss_points,
+            },
+            "tie_breakers": list(strategy.tie_breakers),
+        }
+
+
+def team_rating(team):
+    """
+    Returns the rating of a team loaded with ``select_related("rating")``,
+    rounded to one decimal, or None.
+    """
+    if not Team.rating.is_cached(team):
+        return None
+    try:
+        return round(team.rating.rating, 1)
+    except TeamRating.DoesNotExist:
+        return None
+
+
+class RankingEntrySerializer(serializers.Serializer):
+    """
+    One line of a ranking, a ``core.rules.RankingEntry``, with the current
+    Elo rating of the team when its ``rating`` was selected with it.
+    """
+
+    def to_representation(self, instance):
+        team, points, totals = instance
+        return {
+            "team": {"id": team.pk, "name": team.name},
+            "points": points,
+            **totals._asdict(),
+            "goal_difference": totals.goals_for - totals.goals_against,
+            "rating": team_rating(team),
+        }
+
+
+class GameOperationSerializer(serializers.Serializer):
+    """
+    One item of a batch sent to ``GameBatchAPIView``.
+
+    Validation is done without touching the database; the referenced games
+    and teams are looked up for the whole batch at once by the view.
+    """
+
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+    op = serializers.ChoiceField(choices=[CREATE, UPDATE, DELETE])
+    id = serializers.IntegerField(required=False)
+    home_team = TeamSerializer(required=False)
+    home_team_score = serializers.IntegerField(min_value=0, required=False)
+    away_team = TeamSerializer(required=False)
+    away_team_score = serializers.IntegerField(min_value=0, required=False)
+
+    def validate(self, attrs):
+        errors = {}
+        if attrs["op"] == self.CREATE:
+            required = ["home_team", "home_team_score", "away_team", "away_team_score"]
+        else:
+            required = ["id"]
+        for field in required:
+            if field not in attrs:
+                errors[field] = ["This field is required."]
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    rows_per_second = serializers.FloatField(read_only=True)
+    is_finished = serializers.BooleanField(read_only=True)
+    redirect_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            "id",
+            "status",
+            "rows_total",
+            "rows_processed",
+            "rows_invalid",
+            "rows_failed",
+            "rows_per_second",
+            "errors",
+            "message",
+            "is_finished",
+            "redirect_url",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+
+    def get_redirect_url(self, obj):
+        if obj.status == ImportJob.SUCCEEDED:
+            return reverse("game:ranking_table")
+        return None
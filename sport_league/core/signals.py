@@ -0,0 +1,108 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from . import cache, live, ratings, snapshots, standings
+from .models import Game, Team
+
+# Sent with ``added`` and ``removed`` lists of ``standings.GameResult`` whenever
+# game results change. Bulk write paths that bypass model signals must send it
+# themselves.
+games_changed = Signal()
+
+_batches = threading.local()
+
+
+@contextmanager
+def batch_games_changed():
+    """
+    Collects the changes of the games saved or deleted one by one within the
+    block, e.g. by ``QuerySet.delete()``, and sends them as a single
+    ``games_changed`` at the end.
+    """
+    if getattr(_batches, "current", None) is not None:
+        yield
+        return
+    _batches.current = batch = {"added": [], "removed": []}
+    try:
+        yield
+    finally:
+        _batches.current = None
+    if batch["added"] or batch["removed"]:
+        games_changed.send(sender=Game, **batch)
+
+
+def _send_games_changed(added, removed):
+    batch = getattr(_batches, "current", None)
+    if batch is None:
+        games_changed.send(sender=Game, added=added, removed=removed)
+    else:
+        batch["added"].extend(added)
+        batch["removed"].extend(removed)
+
+
+@receiver(pre_save, sender=Game)
+def remember_previous_result(sender, instance, **kwargs):
+    instance._previous_result = None
+    if instance.pk is not None:
+        previous = Game.objects.filter(pk=instance.pk).values_list(
+            *standings.GameResult._fields
+        )
+        instance._previous_result = next(
+            (standings.GameResult(*row) for row in previous), None
+        )
+
+
+@receiver(post_save, sender=Game)
+def game_saved(sender, instance, created, **kwargs):
+    result = standings.GameResult.from_game(instance)
+    previous = getattr(instance, "_previous_result", None)
+    if previous == result:
+        return
+    _send_games_changed([result], [previous] if previous else [])
+
+
+@receiver(post_delete, sender=Game)
+def game_deleted(sender, instance, **kwargs):
+    _send_games_changed([], [standings.GameResult.from_game(instance)])
+
+
+@receiver(post_save, sender=Team)
+def team_saved(sender, instance, created, **kwargs):
+    if created:
+        standings.ensure_standings([instance.pk])
+        ratings.ensure_ratings([instance.pk])
+    cache.bump_league_version()
+
+
+@receiver(post_delete, sender=Team)
+def team_deleted(sender, instance, **kwargs):
+    cache.bump_league_version()
+
+
+@receiver(games_changed)
+def update_standings(sender, added=(), removed=(), **kwargs):
+    standings.apply_changes(added=added, removed=removed)
+
+
+@receiver(games_changed)
+def update_snapshots(sender, added=(), removed=(), **kwargs):
+    snapshots.apply_changes(added=added, removed=removed)
+
+
+@receiver(games_changed)
+def update_ratings(sender, added=(), removed=(), **kwargs):
+    ratings.apply_changes(added=added, removed=removed)
+
+
+@receiver(games_changed)
+def invalidate_cache(sender, **kwargs):
+    cache.bump_league_version()
+
+
+@receiver(games_changed)
+def publish_live_standings(sender, **kwargs):
+    transaction.on_commit(live.publish_standings)
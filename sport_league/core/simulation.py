@@ -0,0 +1,301 @@
+"""
+Monte Carlo simulation of the rest of a season.
+
+Every team gets an attack and a defence strength from its results so far, and
+the goals of a remaining fixture are drawn from Poisson distributions whose
+means are the league averages at home and away scaled by those strengths. A
+batch of seasons is simulated at once: the scores of every fixture of every
+season of the batch are drawn in two NumPy calls, added to the current totals
+with matrix products and ranked with ``lexsort``, giving for every team the
+number of seasons it finished at each position.
+
+Batches are spread over a process pool. Each batch draws from its own seed,
+spawned from the simulation seed, so that the outcome only depends on the
+seed and not on the number of workers. Only NumPy code runs in the workers.
+
+The tie-breakers of the strategy computed from the totals are applied;
+``head_to_head`` is skipped, and teams still level are ordered by name.
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .models import Team
+from .rules import HEAD_TO_HEAD, TeamTotals
+from .vectorized import GameArrays, team_totals_arrays
+
+# League averages used before any game was played.
+DEFAULT_HOME_GOALS = 1.5
+DEFAULT_AWAY_GOALS = 1.2
+
+DEFAULT_BATCH_SIZE = 10_000
+
+_GOALS_FOR = TeamTotals._fields.index("goals_for")
+_GOALS_AGAINST = TeamTotals._fields.index("goals_against")
+_PLAYED = TeamTotals._fields.index("played")
+_WINS = TeamTotals._fields.index("wins")
+_DRAWS = TeamTotals._fields.index("draws")
+_LOSSES = TeamTotals._fields.index("losses")
+
+
+class StrengthModel(
+    namedtuple("StrengthModel", ["attack", "defence", "home_goals", "away_goals"])
+):
+    """
+    Attack and defence strengths of the teams, 1 for an average team.
+
+    A team scoring twice as many goals per game as the league average has an
+    attack of 2, one conceding half as many a defence of 0.5. The strengths
+    are shrunk towards 1 by counting ``prior_games`` average games for every
+    team, so that a team with few games does not get extreme values.
+    """
+
+    @classmethod
+    def from_totals(cls, totals, arrays, prior_games=5):
+        """
+        Fits the strengths from a ``team_totals_arrays`` totals array and the
+        ``GameArrays`` of the games played.
+        """
+        if len(arrays):
+            home_goals = float(arrays.home_scores.mean())
+            away_goals = float(arrays.away_scores.mean())
+        else:
+            home_goals, away_goals = DEFAULT_HOME_GOALS, DEFAULT_AWAY_GOALS
+        average = (home_goals + away_goals) / 2
+        played = totals[:, _PLAYED] + prior_games
+        attack = (totals[:, _GOALS_FOR] + prior_games * average) / played / average
+        defence = (totals[:, _GOALS_AGAINST] + prior_games * average) / played / average
+        return cls(attack, defence, home_goals, away_goals)
+
+    def expected_goals(self, home, away):
+        """
+        Returns the mean goals of the home and away teams, by team positions.
+        """
+        return (
+            self.home_goals * self.attack[home] * self.defence[away],
+            self.away_goals * self.attack[away] * self.defence[home],
+        )
+
+
+def remaining_fixtures(team_ids, arrays):
+    """
+    Returns the ``(home, away)`` team positions of a double round-robin season
+    that were not played yet, every team hosting every other team once.
+    """
+    size = len(team_ids)
+    played = np.zeros((size, size), dtype=bool)
+    home = np.searchsorted(team_ids, arrays.home_ids)
+    away = np.searchsorted(team_ids, arrays.away_ids)
+    played[home, away] = True
+    np.fill_diagonal(played, True)
+    return np.argwhere(~played)
+
+
+class SeasonModel:
+    """
+    Everything a worker needs to simulate seasons, as plain arrays.
+    """
+
+    def __init__(self, totals, fixtures, strengths, weights, tie_breakers):
+        size = len(totals)
+        self.size = size
+        self.points = totals[:, [_WINS, _DRAWS, _LOSSES]] @ np.asarray(weights)
+        self.goals_for = totals[:, _GOALS_FOR]
+        self.goals_against = totals[:, _GOALS_AGAINST]
+        self.wins = totals[:, _WINS]
+        self.weights = weights
+        self.tie_breakers = [name for name in tie_breakers if name != HEAD_TO_HEAD]
+        # One-hot (fixture x team) matrices of the home and away teams.
+        self.home = np.zeros((len(fixtures), size))
+        self.away = np.zeros((len(fixtures), size))
+        fixture_range = np.arange(len(fixtures))
+        self.home[fixture_range, fixtures[:, 0]] = 1
+        self.away[fixture_range, fixtures[:, 1]] = 1
+        self.home_means, self.away_means = strengths.expected_goals(
+            fixtures[:, 0], fixtures[:, 1]
+        )
+
+    def sort_keys(self, points, goals_for, goals_against, wins, name_order):
+        """
+        Returns the ``lexsort`` keys of the seasons, the primary one last.
+        """
+        keys = {
+            "goal_difference": goals_against - goals_for,
+            "goals_for": -goals_for,
+            "goals_against": goals_against,
+            "wins": -wins,
+            "name": name_order,
+        }
+        ordered = [-points] + [keys[name] for name in self.tie_breakers]
+        if "name" not in self.tie_breakers:
+            ordered.append(name_order)
+        return ordered[::-1]
+
+    def simulate(self, seasons, seed):
+        """
+        Returns the ``(team, position)`` counts of ``seasons`` simulated seasons.
+        """
+        rng = np.random.default_rng(seed)
+        shape = (seasons, len(self.home_means))
+        home_goals = rng.poisson(self.home_means, shape).astype(float)
+        away_goals = rng.poisson(self.away_means, shape).astype(float)
+        win, draw, loss = self.weights
+        home_won = home_goals > away_goals
+        away_won = home_goals < away_goals
+        drawn = ~(home_won | away_won)
+        home_points = home_won * win + drawn * draw + away_won * loss
+        away_points = away_won * win + drawn * draw + home_won * loss
+
+        points = self.points + home_points @ self.home + away_points @ self.away
+        goals_for = self.goals_for + home_goals @ self.home + away_goals @ self.away
+        goals_against = (
+            self.goals_against + away_goals @ self.home + home_goals @ self.away
+        )
+        wins = self.wins + home_won @ self.home + away_won @ self.away
+        name_order = np.broadcast_to(np.arange(self.size), points.shape)
+        order = np.lexsort(
+            self.sort_keys(points, goals_for, goals_against, wins, name_order),
+            axis=-1,
+        )
+        # order[s, p] is the team finishing at position p of season s.
+        counts = np.bincount(
+            (order * self.size + np.arange(self.size)).ravel(),
+            minlength=self.size * self.size,
+        )
+        return counts.reshape(self.size, self.size)
+
+
+def _simulate_batch(args):
+    model, seasons, seed = args
+    return model.simulate(seasons, seed)
+
+
+class SimulationResult:
+    """
+    The finishing positions of the teams over ``seasons`` simulated seasons.
+
+    ``counts[i, p]`` is the number of seasons ``teams[i]`` finished at
+    position ``p + 1``.
+    """
+
+    def __init__(self, teams, counts, seasons, fixtures):
+        self.teams = teams
+        self.counts = counts
+        self.seasons = seasons
+        self.fixtures = fixtures
+
+    @property
+    def probabilities(self):
+        return self.counts / self.seasons
+
+    def expected_positions(self):
+        positions = np.arange(1, len(self.teams) + 1)
+        return self.probabilities @ positions
+
+    def as_dict(self, relegation_places=0):
+        """
+        Returns the result as a JSON-serializable dict, teams by expected
+        position.
+        """
+        probabilities = self.probabilities
+        expected = self.expected_positions()
+        rows = []
+        for i, team in enumerate(self.teams):
+            rows.append(
+                {
+                    "team": {"id": team.pk, "name": team.name},
+                    "expected_position": round(float(expected[i]), 3),
+                    "title": float(probabilities[i, 0]),
+                    "relegation": (
+                        float(probabilities[i, -relegation_places:].sum())
+                        if relegation_places
+                        else 0.0
+                    ),
+                    "positions": probabilities[i].tolist(),
+                }
+            )
+        rows.sort(key=lambda row: row["expected_position"])
+        return {
+            "seasons": self.seasons,
+            "remaining_fixtures": self.fixtures,
+            "results": rows,
+        }
+
+
+def simulate_season(
+    strategy,
+    seasons=100_000,
+    fixtures=None,
+    workers=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    seed=0,
+    arrays=None,
+    teams=None,
+):
+    """
+    Simulates the rest of the season ``seasons`` times with ``strategy``.
+
+    ``fixtures`` are the ``(home_team_id, away_team_id)`` pairs left to play,
+    the missing games of a double round-robin by default. ``workers`` is the
+    size of the process pool, the number of CPUs by default; with 1 the
+    batches run in the current process.
+
+    ``arrays`` and ``teams`` replace the games and the teams of the database,
+    e.g. with those of a ``core.store.GameStore``.
+    """
+    if seasons < 1:
+        raise ValueError("Expected at least one season.")
+    if not strategy.has_weights:
+        raise ValueError(
+            f"{type(strategy).__name__} does not declare win/draw/loss points."
+        )
+    if teams is None:
+        teams = Team.objects.order_by("name")
+    else:
+        teams = sorted(teams, key=lambda team: team.name)
+    teams = list(teams)
+    if len(teams) < 2:
+        raise ValueError("A season needs at least two teams.")
+    if arrays is None:
+        arrays = GameArrays.from_queryset()
+    team_ids = np.array([team.pk for team in teams], dtype=np.int64)
+    sorted_ids = np.sort(team_ids)
+    # Positions in ``teams``, which are ordered by name for the name
+    # tie-breaker.
+    by_id = np.argsort(team_ids)
+    _, totals = team_totals_arrays(arrays, team_ids)
+
+    if fixtures is None:
+        positions = by_id[remaining_fixtures(sorted_ids, arrays)]
+    else:
+        index = {team_id: i for i, team_id in enumerate(team_ids.tolist())}
+        try:
+            positions = np.array(
+                [(index[home], index[away]) for home, away in fixtures],
+                dtype=np.int64,
+            ).reshape(-1, 2)
+        except KeyError as e:
+            raise ValueError(f"Unknown team {e.args[0]}.")
+
+    model = SeasonModel(
+        totals,
+        positions,
+        StrengthModel.from_totals(totals, arrays),
+        (strategy.win_points, strategy.draw_points, strategy.loss_points),
+        strategy.tie_breakers,
+    )
+    sizes = [batch_size] * (seasons // batch_size)
+    if seasons % batch_size:
+        sizes.append(seasons % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    batches = [(model, size, batch_seed) for size, batch_seed in zip(sizes, seeds)]
+    counts = np.zeros((len(teams), len(teams)), dtype=np.int64)
+    if workers == 1 or len(batches) == 1:
+        for batch_counts in map(_simulate_batch, batches):
+            counts += batch_counts
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for batch_counts in executor.map(_simulate_batch, batches):
+                counts += batch_counts
+    return SimulationResult(teams, counts, seasons, len(positions))
@@ -0,0 +1,205 @@
+"""
+Standings snapshots per round, for point-in-time tables.
+
+Every round with games has a ``StandingsSnapshot`` row holding the deltas of
+the teams that played in it, and every ``STANDINGS_KEYFRAME_INTERVAL`` rounds
+the row also stores the cumulative totals of all the teams. The table after
+round ``n`` is the nearest keyframe at or before ``n`` plus the deltas of the
+rounds since, read with a single query.
+
+Changing a game of round ``n`` rebuilds the rows from round ``n`` on, from the
+table of round ``n - 1`` and the games of the later rounds. The rebuild runs
+once for all the games a transaction changed, when it commits or when the
+snapshots are read before that. Games without a round are left out of the
+snapshots.
+"""
+import threading
+from collections import defaultdict
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .cache import bump_league_version
+from .models import Game, StandingsSnapshot, Team
+from .rules import TeamTotals
+from .standings import GameResult, team_deltas
+from .strategies import get_ranking_strategy
+
+# First round changed by the transactions not refreshed yet.
+_pending = threading.local()
+
+
+def is_keyframe(round_number):
+    return round_number % settings.STANDINGS_KEYFRAME_INTERVAL == 0
+
+
+def _to_rows(totals):
+    return [[team_id, *values] for team_id, values in sorted(totals.items())]
+
+
+def _add(totals, rows):
+    for team_id, *values in rows:
+        current = totals[team_id]
+        for i, value in enumerate(values):
+            current[i] += value
+
+
+def _take_pending():
+    from_round = getattr(_pending, "round", None)
+    _pending.round = None
+    return from_round
+
+
+def _refresh_pending():
+    from_round = _take_pending()
+    if from_round is not None:
+        refresh_snapshots(from_round)
+        bump_league_version()
+
+
+def totals_as_of(round_number):
+    """
+    Returns ``{team_id: TeamTotals}`` after ``round_number``, for the teams
+    that played by then.
+    """
+    _refresh_pending()
+    return _totals_as_of(round_number)
+
+
+def _totals_as_of(round_number):
+    keyframe = (
+        StandingsSnapshot.objects.filter(round__lte=round_number, totals__isnull=False)
+        .order_by("-round")
+        .values("round")[:1]
+    )
+    rows = StandingsSnapshot.objects.filter(
+        round__lte=round_number, round__gte=Coalesce(Subquery(keyframe), Value(0))
+    ).values_list("round", "deltas", "totals")
+    totals = defaultdict(lambda: [0] * len(TeamTotals._fields))
+    for _, deltas, cumulative in rows.order_by("round"):
+        if cumulative is not None:
+            totals.clear()
+            _add(totals, cumulative)
+        else:
+            _add(totals, deltas)
+    return {team_id: TeamTotals(*values) for team_id, values in totals.items()}
+
+
+def last_round():
+    _refresh_pending()
+    return StandingsSnapshot.objects.aggregate(last=Max("round"))["last"]
+
+
+def refresh_snapshots(from_round=0):
+    """
+    Rebuilds the snapshots of ``from_round`` and the following rounds.
+
+    Returns the number of rounds written.
+    """
+    pending = _take_pending()
+    if pending is not None:
+        from_round = min(from_round, pending)
+    with transaction.atomic():
+        StandingsSnapshot.objects.filter(round__gte=from_round).delete()
+        cumulative = defaultdict(lambda: [0] * len(TeamTotals._fields))
+        if from_round > 0:
+            _add(cumulative, _to_rows(_totals_as_of(from_round - 1)))
+        games = (
+            Game.objects.filter(round__gte=from_round)
+            .order_by("round")
+            .values_list(*GameResult._fields)
+            .iterator()
+        )
+        snapshots = []
+        results = (GameResult(*row) for row in games)
+        for round_number, rows in groupby(results, key=lambda result: result.round):
+            deltas = team_deltas(list(rows), [])
+            _add(cumulative, _to_rows(deltas))
+            snapshots.append(
+                StandingsSnapshot(
+                    round=round_number,
+                    deltas=_to_rows(deltas),
+                    totals=_to_rows(cumulative) if is_keyframe(round_number) else None,
+                )
+            )
+        StandingsSnapshot.objects.bulk_create(snapshots, batch_size=500)
+    return len(snapshots)
+
+
+def apply_changes(added=(), removed=()):
+    """
+    Refreshes the snapshots affected by added and removed game results when
+    the transaction commits.
+
+    Changes made in the same transaction, e.g. by an import or by deleting
+    the games of a team, are refreshed together, from the first round any of
+    them changed. Reading the snapshots refreshes them first.
+    """
+    rounds = [
+        result.round
+        for results in (added, removed)
+        for result in results
+        if result.round is not None
+    ]
+    if not rounds:
+        return
+    pending = getattr(_pending, "round", None)
+    _pending.round = min(rounds) if pending is None else min(pending, *rounds)
+    # Every change registers the callback, so that a rolled back transaction
+    # cannot leave its round pending forever; the first callback to run after
+    # a commit does the refresh.
+    transaction.on_commit(_refresh_pending)
+
+
+def assign_rounds(games_per_round=None):
+    """
+    Gives a round to the games without one, after the last known round.
+
+    Games with a ``played_at`` date get one round per date. The other ones
+    are grouped in id order, ``games_per_round`` at a time, half the number of
+    teams by default. The snapshots of the new rounds are written as well.
+    Returns the number of rounds assigned.
+    """
+    if games_per_round is None:
+        games_per_round = max(1, Team.objects.count() // 2)
+    unassigned = Game.objects.filter(round__isnull=True)
+    next_round = (Game.objects.aggregate(last=Max("round"))["last"] or 0) + 1
+    first_round = next_round
+    with transaction.atomic():
+        dates = unassigned.filter(played_at__isnull=False).dates("played_at", "day")
+        for date in dates:
+            unassigned.filter(played_at__date=date).update(round=next_round)
+            next_round += 1
+        pks = list(
+            unassigned.filter(played_at__isnull=True)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        for start in range(0, len(pks), games_per_round):
+            chunk = pks[start : start + games_per_round]
+            unassigned.filter(pk__gte=chunk[0], pk__lte=chunk[-1]).update(
+                round=next_round
+            )
+            next_round += 1
+        if next_round > first_round:
+            refresh_snapshots(first_round)
+            bump_league_version()
+    return next_round - first_round
+
+
+def get_ranking_as_of(strategy_name, round_number):
+    """
+    Returns the ``RankingEntry`` list of a strategy after ``round_number``.
+
+    Head-to-head tie-breakers only count the games played by then.
+    """
+    strategy = get_ranking_strategy(strategy_name)
+    totals = totals_as_of(round_number)
+    teams = Team.objects.select_related("rating").in_bulk(list(totals))
+    return strategy.rank(
+        ((teams[team_id], team_totals) for team_id, team_totals in totals.items()),
+        games=Game.objects.filter(round__lte=round_number),
+    )
@@ -0,0 +1,208 @@
+from collections import defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import Standing, Team
+from .strategies import (
+    DEFAULT_RANKING_STRATEGY,
+    EMPTY_TOTALS,
+    RANKING_STRATEGIES,
+    TeamTotals,
+    aggregate_team_totals,
+    get_ranking_strategy,
+)
+
+
+class GameResult(
+    namedtuple(
+        "GameResult",
+        [
+            "home_team_id",
+            "home_team_score",
+            "away_team_id",
+            "away_team_score",
+            "round",
+            "pk",
+        ],
+        defaults=[None, None],
+    )
+):
+    """
+    The part of a game that matters for the standings and their snapshots,
+    with the id of the game once it is saved.
+    """
+
+    @classmethod
+    def from_game(cls, game):
+        return cls(
+            game.home_team_id,
+            game.home_team_score,
+            game.away_team_id,
+            game.away_team_score,
+            game.round,
+            game.pk,
+        )
+
+
+def maintained_strategies():
+    """
+    Returns ``{name: strategy}`` for every strategy kept in the standings table.
+    """
+    strategies = {name: cls() for name, cls in RANKING_STRATEGIES.items()}
+    return {name: s for name, s in strategies.items() if s.has_weights}
+
+
+def team_deltas(added, removed):
+    """
+    Returns ``{team_id: TeamTotals}`` of what ``added`` and ``removed`` game
+    results change in the totals of every team.
+    """
+    deltas = defaultdict(lambda: [0] * len(TeamTotals._fields))
+    for results, sign in ((added, 1), (removed, -1)):
+        for result in results:
+            sides = (
+                (result.home_team_id, result.home_team_score, result.away_team_score),
+                (result.away_team_id, result.away_team_score, result.home_team_score),
+            )
+            for team_id, scored, conceded in sides:
+                delta = deltas[team_id]
+                delta[0] += sign
+                delta[1] += sign * (scored > conceded)
+                delta[2] += sign * (scored == conceded)
+                delta[3] += sign * (scored < conceded)
+                delta[4] += sign * scored
+                delta[5] += sign * conceded
+    return {
+        team_id: TeamTotals(*delta) for team_id, delta in deltas.items() if any(delta)
+    }
+
+
+def ensure_standings(team_ids):
+    """
+    Creates the missing standings rows of the given teams.
+    """
+    strategies = maintained_strategies()
+    existing = set(
+        Standing.objects.filter(team_id__in=team_ids).values_list("team_id", "strategy")
+    )
+    Standing.objects.bulk_create(
+        [
+            Standing(team_id=team_id, strategy=name)
+            for team_id in team_ids
+            for name in strategies
+            if (team_id, name) not in existing
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def apply_changes(added=(), removed=()):
+    """
+    Applies the effect of added and removed game results to the standings.
+
+    Every affected team is updated with a single ``UPDATE`` covering all of
+    its strategies, whatever the number of games involved.
+    """
+    strategies = maintained_strategies()
+    with transaction.atomic():
+        for team_id, delta in team_deltas(added, removed).items():
+            points = Case(
+                *[
+                    When(strategy=name, then=Value(strategy.points_for(delta)))
+                    for name, strategy in strategies.items()
+                ],
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+            Standing.objects.filter(team_id=team_id).update(
+                points=F("points") + points,
+                played=F("played") + delta.played,
+                wins=F("wins") + delta.wins,
+                draws=F("draws") + delta.draws,
+                losses=F("losses") + delta.losses,
+                goals_for=F("goals_for") + delta.goals_for,
+                goals_against=F("goals_against") + delta.goals_against,
+            )
+
+
+def compute_standings():
+    """
+    Computes every standings row from scratch, without saving them.
+    """
+    strategies = maintained_strategies()
+    totals = aggregate_team_totals()
+    rows = []
+    for team_id in Team.objects.values_list("pk", flat=True):
+        team_totals = totals.get(team_id, EMPTY_TOTALS)
+        for name, strategy in strategies.items():
+            rows.append(
+                Standing(
+                    team_id=team_id,
+                    strategy=name,
+                    points=strategy.points_for(team_totals),
+                    **team_totals._asdict(),
+                )
+            )
+    return rows
+
+
+def rebuild_standings():
+    """
+    Replaces the standings table with freshly computed rows.
+    """
+    rows = compute_standings()
+    with transaction.atomic():
+        Standing.objects.all().delete()
+        Standing.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def verify_standings():
+    """
+    Returns the list of ``(team_id, strategy, expected, stored)`` mismatches
+    between the standings table and a full recomputation.
+    """
+    fields = ["points", *TeamTotals._fields]
+    stored = {
+        (row[0], row[1]): tuple(row[2:])
+        for row in Standing.objects.values_list("team_id", "strategy", *fields)
+    }
+    mismatches = []
+    for row in compute_standings():
+        key = (row.team_id, row.strategy)
+        expected = tuple(getattr(row, field) for field in fields)
+        values = stored.pop(key, None)
+        if values != expected:
+            mismatches.append((*key, expected, values))
+    for key, values in stored.items():
+        mismatches.append((*key, None, values))
+    return mismatches
+
+
+def get_ranking(strategy_name):
+    """
+    Returns the ``RankingEntry`` list of a strategy, best team first.
+
+    Strategies declared in settings have no rows of their own: they are
+    ranked from the totals stored for the default strategy.
+    """
+    strategy = get_ranking_strategy(strategy_name)
+    if strategy_name not in RANKING_STRATEGIES:
+        strategy_name = DEFAULT_RANKING_STRATEGY
+    queryset = (
+        Standing.objects.filter(strategy=strategy_name)
+        .select_related("team__rating")
+        .order_by("-points", "team__name")
+    )
+    return strategy.rank(
+        (standing.team, TeamTotals(*(getattr(standing, f) for f in TeamTotals._fields)))
+        for standing in queryset
+    )
+
+
+def get_standings(strategy_name):
+    """
+    Returns the ``(team, points)`` table of a strategy, best team first.
+    """
+    return [(entry.team, entry.points) for entry in get_ranking(strategy_name)]
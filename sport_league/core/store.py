@@ -0,0 +1,146 @@
+"""
+Compact read-only snapshot of the games, for analytics processes.
+
+The ORM costs hundreds of bytes per game while the ranking, simulation and
+rating code only needs four integers. ``write_game_store`` streams the games
+into a file of fixed-width ``GAME_STORE_DTYPE`` records, 12 bytes a game, in
+id order, followed by the table of the team names::
+
+    b"SLGAMES\\0"                 8 bytes magic
+    uint32 version, uint32 size  of a record
+    uint64 games, uint64 offset  of the team table
+    records                      from byte 32
+    team table                   JSON ``[[id, name], ...]``
+
+``GameStore`` maps the file with ``mmap``. Its ``arrays`` are ``GameArrays``
+viewing the mapped records without copying them, so that processes opening
+the same file share its pages, and start without querying the database.
+"""
+import json
+import os
+import struct
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .models import Game, Team
+from .vectorized import GameArrays
+
+GAME_STORE_MAGIC = b"SLGAMES\0"
+GAME_STORE_VERSION = 1
+GAME_STORE_DTYPE = np.dtype(
+    [
+        ("home_id", "<i4"),
+        ("away_id", "<i4"),
+        ("home_score", "<u2"),
+        ("away_score", "<u2"),
+    ]
+)
+_PRELUDE = struct.Struct("<8sIIQQ")
+
+
+def _records(rows):
+    records = np.array(rows, dtype=np.int64).reshape(-1, 4)
+    limits = (
+        np.iinfo(GAME_STORE_DTYPE["home_id"]).max,
+        np.iinfo(GAME_STORE_DTYPE["home_score"]).max,
+    )
+    if len(records) and (
+        records[:, :2].max() > limits[0] or records[:, 2:].max() > limits[1]
+    ):
+        raise ValueError("A team id or a score is too large for the game store.")
+    packed = np.empty(len(records), dtype=GAME_STORE_DTYPE)
+    for i, name in enumerate(GAME_STORE_DTYPE.names):
+        packed[name] = records[:, i]
+    return packed
+
+
+def write_game_store(path=None, chunk_size=10000):
+    """
+    Snapshots the games and the team names into the store at ``path``,
+    ``GAME_STORE_PATH`` by default, and returns the number of games.
+
+    The file is written next to ``path`` and moved over it at the end, so that
+    processes mapping the previous snapshot keep reading it.
+    """
+    path = path or settings.GAME_STORE_PATH
+    rows = Game.objects.order_by("pk").values_list(
+        "home_team_id", "away_team_id", "home_team_score", "away_team_score"
+    )
+    temporary = f"{path}.tmp"
+    games = 0
+    with transaction.atomic(), open(temporary, "wb") as f:
+        f.write(b"\0" * _PRELUDE.size)
+        chunk = []
+        for row in rows.iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                _records(chunk).tofile(f)
+                games += len(chunk)
+                chunk = []
+        _records(chunk).tofile(f)
+        games += len(chunk)
+        teams_offset = f.tell()
+        f.write(json.dumps(list(Team.objects.values_list("pk", "name"))).encode())
+        f.seek(0)
+        f.write(
+            _PRELUDE.pack(
+                GAME_STORE_MAGIC,
+                GAME_STORE_VERSION,
+                GAME_STORE_DTYPE.itemsize,
+                games,
+                teams_offset,
+            )
+        )
+    os.replace(temporary, path)
+    return games
+
+
+class GameStore:
+    """
+    A game store mapped in memory.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.GAME_STORE_PATH
+        with open(self.path, "rb") as f:
+            magic, version, itemsize, games, teams_offset = _PRELUDE.unpack(
+                f.read(_PRELUDE.size)
+            )
+            if magic != GAME_STORE_MAGIC:
+                raise ValueError(f"{self.path} is not a game store.")
+            if version != GAME_STORE_VERSION or itemsize != GAME_STORE_DTYPE.itemsize:
+                raise ValueError(f"Unsupported game store version {version}.")
+            f.seek(teams_offset)
+            self.team_names = dict(json.loads(f.read()))
+        if games:
+            self.records = np.memmap(
+                self.path,
+                dtype=GAME_STORE_DTYPE,
+                mode="r",
+                offset=_PRELUDE.size,
+                shape=(games,),
+            )
+        else:
+            self.records = np.empty(0, dtype=GAME_STORE_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def arrays(self):
+        """
+        ``GameArrays`` viewing the mapped records.
+        """
+        return GameArrays(*(self.records[name] for name in GAME_STORE_DTYPE.names))
+
+    @property
+    def team_ids(self):
+        return np.array(sorted(self.team_names), dtype=np.int64)
+
+    def teams(self):
+        """
+        Returns unsaved ``Team`` instances of the stored teams, by id.
+        """
+        return [Team(pk=pk, name=self.team_names[pk]) for pk in sorted(self.team_names)]
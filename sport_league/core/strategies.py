@@ -1,29 +1,213 @@
+from functools import cached_property, lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db.models import Count, F, Q, Sum
+from django.dispatch import receiver
+
+from .models import Game
+from .rules import EMPTY_TOTALS, RankingEntry, TeamTotals, compile_rules
+from .vectorized import PairwiseResults
+
+
+def _side_totals(team_field, score_field, opponent_score_field):
+    """
+    Per-team results for the games a team played on one side of the pitch.
+    """
+    return Game.objects.values(team=F(team_field)).annotate(
+        played=Count("pk"),
+        wins=Count("pk", filter=Q(**{f"{score_field}__gt": F(opponent_score_field)})),
+        draws=Count("pk", filter=Q(**{score_field: F(opponent_score_field)})),
+        losses=Count("pk", filter=Q(**{f"{score_field}__lt": F(opponent_score_field)})),
+        scored=Sum(score_field),
+        conceded=Sum(opponent_score_field),
+    )
+
+
+def aggregate_team_totals():
+    """
+    Returns a ``{team_id: TeamTotals}`` dict for every team that played a game.
+
+    The home and away aggregations are sent as a single ``UNION ALL`` query so
+    the whole table is built in one round trip, whatever the number of teams.
+    """
+    home = _side_totals("home_team", "home_team_score", "away_team_score")
+    away = _side_totals("away_team", "away_team_score", "home_team_score")
+    totals = {}
+    for row in home.union(away, all=True):
+        current = totals.get(row["team"], EMPTY_TOTALS)
+        totals[row["team"]] = TeamTotals(
+            current.played + row["played"],
+            current.wins + row["wins"],
+            current.draws + row["draws"],
+            current.losses + row["losses"],
+            current.goals_for + (row["scored"] or 0),
+            current.goals_against + (row["conceded"] or 0),
+        )
+    return totals
+
+
 class RankingStrategy:
+    """
+    Base class for ranking strategies.
+
+    Subclasses declare their point values with ``win_points``, ``draw_points``
+    and ``loss_points`` and the ordered ``tie_breakers`` of ``core.rules``;
+    the rankings are then computed from a single aggregation over all games.
+    Subclasses overriding ``calculate_points`` fall back to evaluating every
+    game of every team in Python, ties being broken by name.
+    """
+
+    label = None
+    win_points = None
+    draw_points = None
+    loss_points = 0
+    tie_breakers = ("name",)
+
+    @classmethod
+    def from_spec(cls, name, spec):
+        """
+        Returns a strategy class built from a ``RANKING_STRATEGIES`` entry.
+        """
+        points = spec.get("points", {})
+        attrs = {
+            "label": spec.get("label", name),
+            "win_points": points.get("win", cls.win_points),
+            "draw_points": points.get("draw", cls.draw_points),
+            "loss_points": points.get("loss", cls.loss_points),
+            "tie_breakers": tuple(spec.get("tie_breakers", cls.tie_breakers)),
+        }
+        return type(f"{name.title().replace('_', '')}RankingStrategy", (cls,), attrs)
+
+    @property
+    def has_weights(self):
+        return (
+            type(self).calculate_points is RankingStrategy.calculate_points
+            and self.win_points is not None
+            and self.draw_points is not None
+        )
+
     def calculate_points(self, game, team):
-        raise NotImplementedError
+        if not self.has_weights:
+            raise NotImplementedError
+        if game.is_draw():
+            return self.draw_points
+        if game.is_winner(team):
+            return self.win_points
+        return self.loss_points
+
+    @cached_property
+    def rules(self):
+        return compile_rules(
+            (self.win_points, self.draw_points, self.loss_points), self.tie_breakers
+        )
+
+    def points_for(self, totals):
+        return (
+            totals.wins * self.win_points
+            + totals.draws * self.draw_points
+            + totals.losses * self.loss_points
+        )
 
     def calculate_team_points(self, team):
         return sum([self.calculate_points(game, team) for game in team.games])
 
-    def calculate_rankings(self, teams):
-        standings = [(team, self.calculate_team_points(team)) for team in teams]
-        standings.sort(key=lambda x: (-x[1], x[0].name))
-        return standings
+    def calculate_rankings(self, teams, totals=None, arrays=None):
+        """
+        Returns ``[(team, points)]`` sorted by points then tie-breakers.
+
+        ``totals`` may be given as a ``{team_id: TeamTotals}`` dict computed by
+        another backend, and the head-to-head results read from the
+        ``GameArrays`` of the games, see ``core.vectorized``.
+        """
+        if not self.has_weights:
+            standings = [(team, self.calculate_team_points(team)) for team in teams]
+            standings.sort(key=lambda x: (-x[1], x[0].name))
+            return standings
+        if totals is None:
+            totals = aggregate_team_totals()
+        entries = self.rank(
+            ((team, totals.get(team.pk, EMPTY_TOTALS)) for team in teams),
+            arrays=arrays,
+        )
+        return [(entry.team, entry.points) for entry in entries]
+
+    def rank(self, team_totals, games=None, arrays=None):
+        """
+        Ranks ``(team, TeamTotals)`` pairs into a list of ``RankingEntry``.
+
+        The head-to-head results, when a tie-breaker needs them, are read
+        from ``arrays`` or from the ``games`` queryset, all the games by
+        default, with a single query over the games between the tied teams.
+        """
+
+        def pairwise(team_ids):
+            if arrays is not None:
+                return PairwiseResults.from_arrays(arrays, team_ids)
+            return PairwiseResults.from_queryset(games, team_ids=team_ids)
+
+        return self.rules.rank(
+            (
+                RankingEntry(team, self.points_for(totals), totals)
+                for team, totals in team_totals
+            ),
+            pairwise,
+        )
 
 
 class BasicRankingStrategy(RankingStrategy):
-    def calculate_points(self, game, team):
-        if game.is_draw():
-            return 1
-        if game.is_winner(team):
-            return 3
-        return 0
+    label = "Basic (3/1/0)"
+    win_points = 3
+    draw_points = 1
+    loss_points = 0
 
 
 class AlternateRankingStrategy(RankingStrategy):
-    def calculate_points(self, game, team):
-        if game.is_draw():
-            return 1
-        if game.is_winner(team):
-            return 2
-        return 0
+    label = "Alternate (2/1/0)"
+    win_points = 2
+    draw_points = 1
+    loss_points = 0
+
+
+# Built-in strategies, whose points are stored in the standings table.
+RANKING_STRATEGIES = {
+    "basic": BasicRankingStrategy,
+    "alternate": AlternateRankingStrategy,
+}
+DEFAULT_RANKING_STRATEGY = "basic"
+
+
+@lru_cache(maxsize=None)
+def ranking_strategies():
+    """
+    Returns ``{name: strategy}`` for the built-in strategies and the ones
+    declared in the ``RANKING_STRATEGIES`` setting, compiled once.
+    """
+    strategies = {name: cls() for name, cls in RANKING_STRATEGIES.items()}
+    for name, spec in getattr(settings, "RANKING_STRATEGIES", {}).items():
+        strategy = RankingStrategy.from_spec(name, spec)()
+        if not strategy.has_weights:
+            raise ImproperlyConfigured(
+                f"Ranking strategy {name!r} needs win and draw points."
+            )
+        try:
+            strategy.rules
+        except ValueError as e:
+            raise ImproperlyConfigured(f"Ranking strategy {name!r}: {e}")
+        strategies[name] = strategy
+    return strategies
+
+
+@receiver(setting_changed)
+def _reset_ranking_strategies(setting, **kwargs):
+    if setting == "RANKING_STRATEGIES":
+        ranking_strategies.cache_clear()
+
+
+def get_ranking_strategy(name):
+    """
+    Returns the strategy registered under ``name``, or the default one.
+    """
+    strategies = ranking_strategies()
+    return strategies.get(name, strategies[DEFAULT_RANKING_STRATEGY])
@@ -0,0 +1,92 @@
+"""
+Streaming JSON responses over large querysets.
+
+Rows are fetched with ``QuerySet.iterator(chunk_size=...)`` and written as
+soon as a chunk is serialized, so neither the queryset nor the response body
+is ever held in memory as a whole.
+"""
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+def _iter_chunks(queryset, serialize, chunk_size):
+    chunk = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(serialize(obj))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_ndjson(queryset, serialize, chunk_size):
+    encoder = JSONEncoder()
+    for chunk in _iter_chunks(queryset, serialize, chunk_size):
+        yield "".join(encoder.encode(item) + "\n" for item in chunk)
+
+
+def iter_json_array(queryset, serialize, chunk_size):
+    encoder = JSONEncoder()
+    separator = "["
+    for chunk in _iter_chunks(queryset, serialize, chunk_size):
+        yield separator + ",".join(encoder.encode(item) for item in chunk)
+        separator = ","
+    yield "[]" if separator == "[" else "]"
+
+
+class NDJSONRenderer(JSONRenderer):
+    """
+    Renders a list as one JSON document per line and anything else, errors
+    included, as a single line, for the views streaming NDJSON to accept
+    ``Accept: application/x-ndjson``.
+    """
+
+    media_type = NDJSON_CONTENT_TYPE
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b"".join(
+            super(NDJSONRenderer, self).render(item, None, renderer_context) + b"\n"
+            for item in (data if isinstance(data, list) else [data])
+        )
+
+
+def wants_ndjson(request):
+    return request.query_params.get(
+        "stream", ""
+    ).lower() == "ndjson" or NDJSON_CONTENT_TYPE in request.META.get("HTTP_ACCEPT", "")
+
+
+def streaming_response(request, queryset, serialize, chunk_size=None):
+    """
+    Streams ``serialize(obj)`` for every object of ``queryset`` as NDJSON with
+    ``?stream=ndjson`` or ``Accept: application/x-ndjson``, as a JSON array
+    otherwise.
+    """
+    chunk_size = chunk_size or settings.API_STREAM_CHUNK_SIZE
+    if wants_ndjson(request):
+        content = iter_ndjson(queryset, serialize, chunk_size)
+        content_type = NDJSON_CONTENT_TYPE
+    else:
+        content = iter_json_array(queryset, serialize, chunk_size)
+        content_type = "application/json"
+    response = StreamingHttpResponse(content, content_type=content_type)
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def is_streaming_request(request):
+    return request.query_params.get("stream", "").lower() in (
+        "1",
+        "true",
+        "json",
+        "ndjson",
+    )
@@ -0,0 +1,64 @@
+"""
+Reproducible synthetic leagues for benchmarks and load tests.
+
+The same ``teams``, ``games`` and ``seed`` always produce the same teams,
+games and scores.
+"""
+import csv
+import io
+import random
+
+from .bulk import DEFAULT_BATCH_SIZE, create_games, resolve_team_ids
+from .importers import GAME_IMPORT_HEADERS
+from .standings import GameResult
+
+# Relative frequency of 0, 1, 2... goals scored by a team in a game.
+GOAL_WEIGHTS = (25, 35, 22, 11, 5, 2)
+
+
+class SyntheticLeague:
+    def __init__(self, teams=20, games=1000, seed=0, prefix="Team"):
+        if teams < 2:
+            raise ValueError("A league needs at least two teams.")
+        self.teams = teams
+        self.games = games
+        self.seed = seed
+        self.team_names = [f"{prefix} {i:04d}" for i in range(1, teams + 1)]
+
+    def rows(self):
+        """
+        Yields ``(home_team, home_team_score, away_team, away_team_score)``
+        tuples of team names and scores.
+        """
+        rng = random.Random(self.seed)
+        goals = range(len(GOAL_WEIGHTS))
+        for _ in range(self.games):
+            home, away = rng.sample(self.team_names, 2)
+            home_score, away_score = rng.choices(goals, GOAL_WEIGHTS, k=2)
+            yield home, home_score, away, away_score
+
+    def csv(self, header=False):
+        """
+        Returns the games as CSV bytes in the format accepted by ``upload_game``.
+        """
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator="\n")
+        if header:
+            writer.writerow(GAME_IMPORT_HEADERS)
+        writer.writerows(self.rows())
+        return output.getvalue().encode()
+
+    def create(self, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Inserts the teams and games with the bulk helpers, returning the
+        ``{name: team_id}`` dict of the teams.
+        """
+        team_ids = resolve_team_ids(self.team_names, batch_size=batch_size)
+        create_games(
+            (
+                GameResult(team_ids[home], home_score, team_ids[away], away_score)
+                for home, home_score, away, away_score in self.rows()
+            ),
+            batch_size=batch_size,
+        )
+        return team_ids
@@ -0,0 +1,137 @@
+from core.bulk import create_games
+from core.models import Game, Team, TeamRating
+from core.pagination import EstimatedCountPaginator
+from core.ratings import verify_ratings
+from core.standings import GameResult, verify_standings
+from django.contrib.admin import helpers
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+class AdminTestCase(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_superuser("admin@example.com", "pw")
+        self.client.force_login(user)
+        self.teams = [Team.objects.create(name=f"Team {i}") for i in range(4)]
+
+    def create_games(self, count):
+        return create_games(
+            [
+                GameResult(self.teams[i % 4].pk, i % 3, self.teams[(i + 1) % 4].pk, 1)
+                for i in range(count)
+            ]
+        )
+
+    def changelist_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_game_changelist_queries_do_not_grow(self):
+        url = reverse("admin:core_game_changelist")
+        self.create_games(2)
+        queries = self.changelist_queries(url)
+        self.create_games(20)
+        self.assertEqual(self.changelist_queries(url), queries)
+
+    def test_search(self):
+        self.create_games(4)
+        response = self.client.get(
+            reverse("admin:core_game_changelist"), {"q": "Team 3"}
+        )
+        self.assertEqual(response.context["cl"].result_count, 2)
+        response = self.client.get(
+            reverse("admin:core_team_changelist"), {"q": "team 1"}
+        )
+        self.assertEqual(response.context["cl"].result_count, 1)
+
+    def test_team_autocomplete(self):
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "term": "Team 2",
+                "app_label": "core",
+                "model_name": "game",
+                "field_name": "home_team",
+            },
+        )
+        self.assertEqual(
+            [result["text"] for result in response.json()["results"]], ["Team 2"]
+        )
+
+    def test_delete_selected_games(self):
+        games = self.create_games(6)
+        response = self.client.post(
+            reverse("admin:core_game_changelist"),
+            {
+                "action": "delete_selected",
+                "post": "yes",
+                helpers.ACTION_CHECKBOX_NAME: [game.pk for game in games[:4]],
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Game.objects.count(), 2)
+        self.assertEqual(verify_standings(), [])
+        self.assertEqual(verify_ratings(), [])
+
+    def test_delete_team(self):
+        self.create_games(6)
+        team = self.teams[0]
+        url = reverse("admin:core_team_delete", args=[team.pk])
+        # The confirmation page lists the cascaded games.
+        self.assertContains(self.client.get(url), "Game: ", count=3)
+        response = self.client.post(
+            reverse("admin:core_team_delete", args=[team.pk]), {"post": "yes"}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Game.objects.filter(home_team=team).exists())
+        self.assertFalse(Team.objects.filter(pk=team.pk).exists())
+        self.assertEqual(verify_standings(), [])
+        self.assertEqual(verify_ratings(), [])
+
+    def test_rebuild(self):
+        self.create_games(3)
+        TeamRating.objects.update(rating=0)
+        url = reverse("admin:core_game_rebuild")
+        response = self.client.get(reverse("admin:core_game_changelist"))
+        self.assertContains(response, f'action="{url}"')
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertNotEqual(verify_ratings(), [])
+        response = self.client.post(url)
+        self.assertRedirects(response, reverse("admin:core_game_changelist"))
+        self.assertEqual(verify_ratings(), [])
+
+    def test_rebuild_needs_change_permission(self):
+        user = get_user_model().objects.create_user(
+            "staff@example.com", "pw", is_staff=True
+        )
+        user.user_permissions.add(Permission.objects.get(codename="view_game"))
+        self.client.force_login(user)
+        response = self.client.get(reverse("admin:core_game_changelist"))
+        self.assertNotContains(response, reverse("admin:core_game_rebuild"))
+        response = self.client.post(reverse("admin:core_game_rebuild"))
+        self.assertEqual(response.status_code, 403)
+
+
+class EstimatedCountPaginatorTestCase(TestCase):
+    def setUp(self):
+        Team.objects.bulk_create([Team(name=f"Team {i}") for i in range(5)])
+        Team.objects.filter(name="Team 0").delete()
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=0)
+    def test_estimate(self):
+        queryset = Team.objects.order_by("pk")
+        largest = queryset.last().pk
+        self.assertEqual(EstimatedCountPaginator(queryset, 2).count, largest)
+        # Filtered querysets are counted.
+        filtered = queryset.filter(name__startswith="Team")
+        self.assertEqual(EstimatedCountPaginator(filtered, 2).count, 4)
+
+    def test_small_tables_are_counted(self):
+        queryset = Team.objects.order_by("pk")
+        self.assertEqual(EstimatedCountPaginator(queryset, 2).count, 4)
@@ -0,0 +1,162 @@
+import json
+
+from asgiref.sync import sync_to_async
+from core.async_views import StreamingASGIHandler
+from core.instrumentation import record_query
+from core.loadtest import run_load_test
+from core.models import Game, Team
+from core.tests.utils import QueryBudgetMixin
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+
+User = get_user_model()
+
+
+@override_settings(ASYNC_DB_THREAD_SENSITIVE=True)
+class AsyncReadViewsTestCase(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("testuser", "testuser@example.com")
+        self.async_client.force_login(self.user)
+        self.team1 = Team.objects.create(name="Team 1")
+        self.team2 = Team.objects.create(name="Team 2")
+        self.game = Game.objects.create(
+            home_team=self.team1,
+            home_team_score=2,
+            away_team=self.team2,
+            away_team_score=1,
+        )
+
+    async def test_ranking(self):
+        response = await self.async_client.get(reverse("game:async-ranking_table"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["standings"][0][0].name, "Team 1")
+        self.assertIn("render;dur=", response["Server-Timing"])
+        self.assertQueryBudget(response)
+
+    async def test_ranking_requires_login(self):
+        response = await AsyncClient().get(reverse("game:async-ranking_table"))
+        self.assertEqual(response.status_code, 302)
+
+    async def test_game_list(self):
+        response = await self.async_client.get(reverse("game:async-game-list"))
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.content)["results"]
+        self.assertEqual([game["id"] for game in results], [self.game.pk])
+        self.assertQueryBudget(response)
+
+    async def test_game_list_stream(self):
+        response = await self.async_client.get(
+            reverse("game:async-game-list") + "?stream=1"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = await sync_to_async(b"".join)(response.streaming_content)
+        self.assertEqual([game["id"] for game in json.loads(content)], [self.game.pk])
+
+    @override_settings(API_STREAM_CHUNK_SIZE=1)
+    async def test_handler_streams_parts(self):
+        await sync_to_async(Game.objects.create)(
+            home_team=self.team2,
+            home_team_score=0,
+            away_team=self.team1,
+            away_team_score=0,
+        )
+        cookie = self.async_client.cookies[settings.SESSION_COOKIE_NAME]
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": reverse("game:async-game-list"),
+            "query_string": b"stream=ndjson",
+            "headers": [
+                (b"cookie", f"{cookie.key}={cookie.value}".encode()),
+                (b"host", b"testserver"),
+            ],
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request"}
+
+        async def send(message):
+            messages.append(message)
+
+        await StreamingASGIHandler()(scope, receive, send)
+        self.assertEqual(messages[0]["status"], 200)
+        headers = dict(messages[0]["headers"])
+        self.assertTrue(headers[b"Content-Type"].startswith(b"application/x-ndjson"))
+        bodies = [message["body"] for message in messages[1:-1]]
+        # One part per game, sent as it is produced.
+        self.assertEqual(len(bodies), 2)
+        self.assertEqual(json.loads(bodies[0])["id"], self.game.pk)
+        self.assertFalse(messages[-1].get("more_body", False))
+
+    async def test_game_detail(self):
+        response = await self.async_client.get(
+            reverse("game:async-game-detail", args=[self.game.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["home_team_score"], 2)
+        self.assertQueryBudget(response)
+
+        response = await self.async_client.get(
+            reverse("game:async-game-detail", args=[0])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_team_games_and_standings(self):
+        response = await self.async_client.get(
+            reverse("game:async-team-games", args=[self.team2.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["results"][0]["result"], "L")
+        response = await self.async_client.get(reverse("game:async-standings"))
+        self.assertEqual(
+            json.loads(response.content)["results"][0]["team"]["name"], "Team 1"
+        )
+
+    async def test_writes_are_refused(self):
+        response = await self.async_client.delete(
+            reverse("game:async-game-detail", args=[self.game.pk])
+        )
+        self.assertEqual(response.status_code, 405)
+
+
+@override_settings(ASYNC_DB_THREAD_SENSITIVE=True)
+class LoadTestTestCase(TestCase):
+    def setUp(self):
+        self.team1 = Team.objects.create(name="Team 1")
+        self.team2 = Team.objects.create(name="Team 2")
+        Game.objects.create(
+            home_team=self.team1,
+            home_team_score=2,
+            away_team=self.team2,
+            away_team_score=1,
+        )
+
+    def test_run_load_test(self):
+        report = run_load_test(
+            ["game-detail", "standings"], clients=3, requests=2, latency=0.001
+        )
+        self.assertEqual(
+            [(result["endpoint"], result["mode"]) for result in report["results"]],
+            [
+                ("game-detail", "sync"),
+                ("game-detail", "async"),
+                ("standings", "sync"),
+                ("standings", "async"),
+            ],
+        )
+        for result in report["results"]:
+            self.assertEqual(result["errors"], 0)
+            self.assertEqual(result["stats"]["rounds"], 6)
+        self.assertEqual(report["params"]["clients"], 3)
+        # The simulated latency is gone.
+        self.assertEqual(connection.execute_wrappers, [record_query])
+
+    def test_endpoint_needs_data(self):
+        Game.objects.all().delete()
+        with self.assertRaises(ValueError):
+            run_load_test(["game-detail"], clients=1, requests=1)
@@ -0,0 +1,63 @@
+import json
+from io import StringIO
+
+from core.benchmarks import SCENARIOS
+from core.models import Game, Team
+from core.synthetic import SyntheticLeague
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+
+class SyntheticLeagueTestCase(TestCase):
+    def test_rows_are_reproducible(self):
+        league = SyntheticLeague(teams=5, games=50, seed=3)
+        rows = list(league.rows())
+        self.assertEqual(len(rows), 50)
+        self.assertEqual(rows, list(SyntheticLeague(5, 50, seed=3).rows()))
+        self.assertNotEqual(rows, list(SyntheticLeague(5, 50, seed=4).rows()))
+        for home, home_score, away, away_score in rows:
+            self.assertNotEqual(home, away)
+            self.assertIn(home, league.team_names)
+            self.assertGreaterEqual(home_score, 0)
+
+    def test_csv(self):
+        league = SyntheticLeague(teams=3, games=4)
+        lines = league.csv(header=True).decode().splitlines()
+        self.assertEqual(
+            lines[0], "home_team,home_team_score,away_team,away_team_score"
+        )
+        self.assertEqual(len(lines), 5)
+
+    def test_create(self):
+        team_ids = SyntheticLeague(teams=4, games=30).create()
+        self.assertEqual(len(team_ids), 4)
+        self.assertEqual(Team.objects.count(), 4)
+        self.assertEqual(Game.objects.count(), 30)
+
+
+class BenchCommandTestCase(TestCase):
+    def test_all_scenarios(self):
+        out = StringIO()
+        call_command("bench", teams=4, games=20, import_rows=10, rounds=2, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(
+            [benchmark["name"] for benchmark in report["benchmarks"]],
+            list(SCENARIOS),
+        )
+        for benchmark in report["benchmarks"]:
+            self.assertEqual(benchmark["stats"]["rounds"], 2)
+            self.assertGreater(benchmark["stats"]["mean"], 0)
+        self.assertEqual(report["machine_info"]["database"], "sqlite")
+        self.assertEqual(Game.objects.count(), 0)
+        self.assertEqual(Team.objects.count(), 0)
+
+    def test_unknown_scenario(self):
+        with self.assertRaisesMessage(CommandError, "Unknown scenarios nope"):
+            call_command("bench", "nope", stdout=StringIO())
+
+    def test_selected_scenario(self):
+        out = StringIO()
+        name = next(iter(SCENARIOS))
+        call_command("bench", name, teams=4, games=20, rounds=1, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual([b["name"] for b in report["benchmarks"]], [name])
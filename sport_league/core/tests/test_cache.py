@@ -0,0 +1,110 @@
+from core.cache import get_cache, league_version
+from core.models import Game, Team
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+User = get_user_model()
+
+
+class LeagueVersionTestCase(TestCase):
+    def setUp(self):
+        get_cache().clear()
+
+    def test_bumped_on_writes(self):
+        version = league_version()
+        team1 = Team.objects.create(name="Team 1")
+        team2 = Team.objects.create(name="Team 2")
+        self.assertGreater(league_version(), version)
+
+        version = league_version()
+        game = Game.objects.create(
+            home_team=team1, home_team_score=1, away_team=team2, away_team_score=0
+        )
+        self.assertGreater(league_version(), version)
+
+        version = league_version()
+        game.delete()
+        self.assertGreater(league_version(), version)
+
+
+class RankingCacheTestCase(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        user = User.objects.create_user("testuser", "testuser@example.com")
+        self.client.force_login(user)
+        self.team1 = Team.objects.create(name="Team 1")
+        self.team2 = Team.objects.create(name="Team 2")
+        Game.objects.create(
+            home_team=self.team1,
+            home_team_score=1,
+            away_team=self.team2,
+            away_team_score=0,
+        )
+        self.url = reverse("game:ranking_table")
+
+    def test_ranking_cached_until_games_change(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(2):  # session and user
+            response = self.client.get(self.url)
+        self.assertEqual(response.context["standings"][0], (self.team1, 3))
+
+        Game.objects.create(
+            home_team=self.team2,
+            home_team_score=3,
+            away_team=self.team1,
+            away_team_score=0,
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.context["standings"][1], (self.team2, 3))
+        # The game selects are filled from the paginated API.
+        self.assertNotIn("games", response.context)
+
+    def test_partial_cached_per_strategy(self):
+        ajax = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+        basic = self.client.post(self.url, {"ranking_strategy": "basic"}, **ajax)
+        alternate = self.client.post(
+            self.url, {"ranking_strategy": "alternate"}, **ajax
+        )
+        self.assertContains(basic, "<td>3</td>")
+        self.assertContains(alternate, "<td>2</td>")
+        self.assertNotContains(alternate, "Add Game")
+
+
+class GameListETagTestCase(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client.force_authenticate(
+            user=User.objects.create_user("testuser", "testuser@example.com")
+        )
+        self.game = Game.objects.create(
+            home_team=Team.objects.create(name="Team 1"),
+            home_team_score=1,
+            away_team=Team.objects.create(name="Team 2"),
+            away_team_score=0,
+        )
+
+    def test_not_modified(self):
+        for url in (
+            reverse("game:game-list"),
+            reverse("game:game-detail", args=[self.game.pk]),
+        ):
+            response = self.client.get(url)
+            etag = response["ETag"]
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+            self.game.home_team_score += 1
+            self.game.save()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_cached(self):
+        url = reverse("game:game-list")
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data["results"][0]["id"], self.game.pk)
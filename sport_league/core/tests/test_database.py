@@ -0,0 +1,47 @@
+from unittest import mock
+
+from core.database import apply_sqlite_pragmas, check_connections
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+
+class SQLitePragmasTestCase(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        # 1 is NORMAL.
+        self.assertEqual(self.pragma("synchronous"), 1)
+        self.assertEqual(self.pragma("cache_size"), -64 * 1024)
+        self.assertEqual(self.pragma("busy_timeout"), 5000)
+
+    @override_settings(SQLITE_PRAGMAS={"cache_size": -1024})
+    def test_pragmas_setting(self):
+        apply_sqlite_pragmas(sender=None, connection=connection)
+        self.assertEqual(self.pragma("cache_size"), -1024)
+
+
+class CheckConnectionsTestCase(SimpleTestCase):
+    def get_connection(self, usable):
+        return mock.Mock(in_atomic_block=False, **{"is_usable.return_value": usable})
+
+    @override_settings(DB_HEALTH_CHECKS=True)
+    def test_unusable_connections_are_closed(self):
+        usable, broken = self.get_connection(True), self.get_connection(False)
+        closed = mock.Mock(connection=None)
+        with mock.patch("core.database.connections") as connections:
+            connections.all.return_value = [usable, broken, closed]
+            check_connections(sender=None)
+        usable.close.assert_not_called()
+        broken.close.assert_called_once_with()
+        closed.is_usable.assert_not_called()
+
+    @override_settings(DB_HEALTH_CHECKS=False)
+    def test_disabled(self):
+        broken = self.get_connection(False)
+        with mock.patch("core.database.connections") as connections:
+            connections.all.return_value = [broken]
+            check_connections(sender=None)
+        broken.close.assert_not_called()
@@ -0,0 +1,156 @@
+import csv
+import io
+import math
+import os
+import tempfile
+from datetime import datetime, timezone
+
+import tablib
+from core.exports import iter_games_columnar, iter_games_csv, read_columnar
+from core.models import Game, Team
+from core.resources import GameResource
+from core.tests.utils import QueryBudgetMixin
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+
+class ExportTestCase(TestCase):
+    def setUp(self):
+        self.team1 = Team.objects.create(name="Team 1")
+        self.team2 = Team.objects.create(name="Team, 2")
+        self.played_at = datetime(2024, 5, 1, 18, 30, tzinfo=timezone.utc)
+        Game.objects.create(
+            home_team=self.team1,
+            home_team_score=2,
+            away_team=self.team2,
+            away_team_score=1,
+            round=1,
+            played_at=self.played_at,
+        )
+        Game.objects.create(
+            home_team=self.team2,
+            home_team_score=0,
+            away_team=self.team1,
+            away_team_score=0,
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "export")
+
+    def test_games_csv_in_chunks(self):
+        chunks = list(iter_games_csv(chunk_size=1))
+        # The header, then one chunk per game.
+        self.assertEqual(len(chunks), 3)
+        rows = list(csv.reader(io.StringIO("".join(chunks))))
+        self.assertEqual(rows[1][1:6], ["Team 1", "2", "Team, 2", "1", "1"])
+        self.assertEqual(rows[1][6], "2024-05-01 18:30:00")
+        self.assertEqual(rows[2][5:], ["", ""])
+
+    def test_games_columnar(self):
+        call_command("export", "games", format="columnar", output=self.path)
+        columns, dictionaries = read_columnar(self.path)
+        teams = [team["name"] for team in dictionaries["teams"]]
+        self.assertEqual(
+            [teams[code] for code in columns["home_team"]], ["Team 1", "Team, 2"]
+        )
+        self.assertEqual(columns["home_team_score"].tolist(), [2, 0])
+        self.assertEqual(columns["round"].tolist(), [1, 0])
+        self.assertEqual(
+            columns["played_at"][0], int(self.played_at.timestamp()) * 1_000_000
+        )
+        self.assertEqual(columns["played_at"][1], -(2**63))
+        for array in columns.values():
+            self.assertEqual(array.ctypes.data % 8, 0)
+
+    def test_games_columnar_in_chunks(self):
+        chunks = iter_games_columnar(chunk_size=1)
+        next(chunks)
+        # The first chunk of the first column is read without the other games.
+        with self.assertNumQueries(1):
+            self.assertEqual(len(next(chunks)), 8)
+        with open(self.path, "wb") as f:
+            f.writelines(iter_games_columnar(chunk_size=1))
+        columns, _ = read_columnar(self.path)
+        self.assertEqual(columns["home_team_score"].tolist(), [2, 0])
+
+    def test_games_changed_during_columnar(self):
+        chunks = iter_games_columnar()
+        next(chunks)
+        next(chunks)
+        Game.objects.filter(home_team=self.team2).delete()
+        with self.assertRaisesMessage(RuntimeError, "changed during the export"):
+            list(chunks)
+
+    def test_empty_columnar(self):
+        Game.objects.all().delete()
+        call_command("export", "games", format="columnar", output=self.path)
+        columns, _ = read_columnar(self.path)
+        self.assertEqual(len(columns["id"]), 0)
+
+    def test_standings(self):
+        call_command("export", "standings", output=self.path)
+        with open(self.path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(rows[0]["team"], "Team 1")
+        self.assertEqual((rows[0]["points"], rows[0]["goal_difference"]), ("4", "1"))
+
+        call_command("export", "standings", format="columnar", output=self.path)
+        columns, dictionaries = read_columnar(self.path)
+        self.assertEqual(columns["points"].tolist(), [4, 1])
+        self.assertEqual(dictionaries["teams"][columns["team"][0]]["name"], "Team 1")
+        self.assertFalse(math.isnan(columns["rating"][0]))
+
+    def test_csv_round_trip(self):
+        exported = "".join(iter_games_csv())
+        dataset = tablib.Dataset().load(exported, format="csv")
+        Game.objects.all().delete()
+        result = GameResource().import_data(dataset)
+        self.assertFalse(result.has_errors())
+        self.assertEqual("".join(iter_games_csv()), exported)
+        game = Game.objects.get(round=1)
+        self.assertEqual(game.played_at, self.played_at)
+        self.assertEqual(game.away_team, self.team2)
+
+
+class ExportAPIViewTestCase(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("testuser", "test@example.com")
+        self.client.force_authenticate(user=user)
+        team1 = Team.objects.create(name="Team 1")
+        team2 = Team.objects.create(name="Team 2")
+        Game.objects.create(
+            home_team=team1, home_team_score=1, away_team=team2, away_team_score=0
+        )
+
+    def test_games(self):
+        response = self.client.get(reverse("game:export-games", args=["csv"]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="games.csv"', response["Content-Disposition"])
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertQueryBudget(response)
+
+        response = self.client.get(reverse("game:export-games", args=["columnar"]))
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"SLCOLUMN"))
+
+    def test_standings(self):
+        response = self.client.get(
+            reverse("game:export-standings", args=["csv"]), {"strategy": "alternate"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[1].split(",")[:3], ["1", "Team 1", "2"])
+        self.assertQueryBudget(response)
+
+    def test_invalid(self):
+        response = self.client.get(reverse("game:export-games", args=["xml"]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(
+            reverse("game:export-standings", args=["csv"]), {"strategy": "unknown"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
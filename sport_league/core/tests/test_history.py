@@ -0,0 +1,106 @@
+from core.history import summarize, team_history
+from core.models import Game, Team
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+User = get_user_model()
+
+
+class SummarizeTestCase(TestCase):
+    def test_summarize(self):
+        # Most recent first
+        summary = summarize(["W", "W", "D", "L", "W", "W", "W", "D"])
+        self.assertEqual(summary["form"], "WWDLW")
+        self.assertEqual(summary["streak"], {"result": "W", "length": 2})
+        self.assertEqual(summary["longest_win_streak"], 3)
+        self.assertEqual(summary["longest_unbeaten_streak"], 4)
+        self.assertEqual(
+            (summary["wins"], summary["draws"], summary["losses"]), (5, 2, 1)
+        )
+
+    def test_no_games(self):
+        summary = summarize([])
+        self.assertEqual(summary["streak"], {"result": None, "length": 0})
+        self.assertEqual(summary["form"], "")
+
+
+class TeamGamesAPIViewTestCase(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(
+            user=User.objects.create_user("testuser", "testuser@example.com")
+        )
+        self.team1 = Team.objects.create(name="Team 1")
+        self.team2 = Team.objects.create(name="Team 2")
+        self.team3 = Team.objects.create(name="Team 3")
+        self.games = [
+            Game.objects.create(
+                home_team=home,
+                home_team_score=home_score,
+                away_team=away,
+                away_team_score=away_score,
+            )
+            for home, home_score, away, away_score in [
+                (self.team1, 2, self.team2, 0),
+                (self.team3, 1, self.team1, 1),
+                (self.team2, 3, self.team1, 1),
+                (self.team2, 0, self.team3, 0),
+                (self.team1, 4, self.team3, 0),
+            ]
+        ]
+        self.url = reverse("game:team-games", args=[self.team1.pk])
+
+    def test_history(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(
+            [game["id"] for game in results],
+            [self.games[i].pk for i in (4, 2, 1, 0)],
+        )
+        self.assertEqual(
+            results[1],
+            {
+                "id": self.games[2].pk,
+                "venue": "away",
+                "opponent": {"id": self.team2.pk, "name": "Team 2"},
+                "goals_for": 1,
+                "goals_against": 3,
+                "result": "L",
+            },
+        )
+        summary = response.data["summary"]
+        self.assertEqual(summary["form"], "WLDW")
+        self.assertEqual((summary["goals_for"], summary["goals_against"]), (8, 4))
+
+    def test_pages(self):
+        response = self.client.get(self.url, {"page_size": 3})
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertIn("summary", response.data)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [game["id"] for game in response.data["results"]], [self.games[0].pk]
+        )
+        self.assertIsNone(response.data["next"])
+        self.assertNotIn("summary", response.data)
+
+    def test_head_to_head(self):
+        response = self.client.get(self.url, {"opponent": self.team2.pk})
+        self.assertEqual(response.data["opponent"]["name"], "Team 2")
+        self.assertEqual(
+            [game["result"] for game in response.data["results"]], ["L", "W"]
+        )
+        self.assertEqual(response.data["summary"]["wins"], 1)
+
+    def test_one_query_per_page(self):
+        with self.assertNumQueries(1):
+            rows = list(team_history(self.team1.pk)[:2])
+        self.assertEqual(len(rows), 2)
+
+    def test_invalid_parameters(self):
+        response = self.client.get(self.url, {"cursor": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse("game:team-games", args=[0]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,104 @@
+from core.importers import BulkGameImporter, iter_csv_rows
+from core.models import Game, Standing, StandingsSnapshot, Team
+from core.standings import verify_standings
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+
+class BulkGameImporterTestCase(TestCase):
+    def setUp(self):
+        Team.objects.create(name="Team A")
+
+    def test_import(self):
+        rows = [
+            ["Team A", "2", "Team B", "1"],
+            [],
+            ["Team C", "3", "Team A", "3"],
+        ]
+        result = BulkGameImporter().run(rows)
+        self.assertEqual(result[:4], (2, 2, [], 0))
+        self.assertEqual(Game.objects.count(), 2)
+        self.assertEqual(Team.objects.count(), 3)
+        self.assertEqual(
+            Standing.objects.get(team__name="Team A", strategy="basic").points, 4
+        )
+        self.assertEqual(verify_standings(), [])
+
+    def test_import_rounds(self):
+        rows = [
+            ["Team A", "2", "Team B", "1", "1"],
+            ["Team B", "0", "Team A", "0", ""],
+            ["Team A", "1", "Team B", "1", "0"],
+        ]
+        result = BulkGameImporter().run(rows)
+        self.assertEqual(result.invalid, 1)
+        self.assertIn("round must be at least 1", result.errors[0].message)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = BulkGameImporter().run(rows[:2])
+        self.assertEqual(result.created, 2)
+        self.assertEqual(
+            sorted(Game.objects.values_list("round", flat=True), key=str), [1, None]
+        )
+        self.assertEqual(
+            list(StandingsSnapshot.objects.values_list("round", flat=True)), [1]
+        )
+
+    def test_queries_do_not_depend_on_row_count(self):
+        def count_queries(rows):
+            with CaptureQueriesContext(connection) as queries:
+                BulkGameImporter().run(rows)
+            return len(queries)
+
+        few = [["Team A", "1", "Team B", "0"]] * 2
+        many = [["Team A", str(i % 4), "Team B", "1"] for i in range(300)]
+        self.assertEqual(count_queries(few), count_queries(many))
+
+    def test_row_errors(self):
+        rows = [
+            ["Team A", "2", "Team B"],
+            ["Team A", "two", "Team B", "1"],
+            ["", "1", "Team B", "-1"],
+            ["Team A", "1", "Team B", "1"],
+        ]
+        result = BulkGameImporter().run(rows)
+        self.assertTrue(result.has_errors)
+        self.assertEqual([error.line for error in result.errors], [1, 2, 3])
+        self.assertIn("Expected 4 columns", result.errors[0].message)
+        self.assertIn("home_team_score must be an integer", result.errors[1].message)
+        self.assertEqual(result.invalid, 3)
+        self.assertEqual(Game.objects.count(), 0)
+        self.assertEqual(Team.objects.count(), 1)
+
+    def test_errors_after_written_batches_roll_back(self):
+        rows = [["Team A", "1", "Team B", "0"]] * 5 + [["Team A", "x", "Team C", "0"]]
+        progress = []
+        result = BulkGameImporter(batch_size=2, max_errors=0).run(
+            rows, progress=lambda *args: progress.append(args)
+        )
+        self.assertEqual((result.rows, result.created, result.invalid), (6, 0, 1))
+        self.assertEqual(result.errors, [])
+        self.assertEqual(progress[0], (2, 2, 0))
+        self.assertEqual(Game.objects.count(), 0)
+        self.assertFalse(Team.objects.filter(name="Team B").exists())
+
+    def test_batches(self):
+        rows = [[f"Team {i % 3}", "1", "Team A", "0"] for i in range(7)]
+        result = BulkGameImporter(batch_size=3).run(rows)
+        self.assertEqual((result.rows, result.created), (7, 7))
+        self.assertEqual(verify_standings(), [])
+
+
+class IterCsvRowsTestCase(TestCase):
+    def test_rows_split_across_chunks(self):
+        data = 'Équipe A,1,Team B,0\r\n"Team, C",2,Team D,2\nTeam E,0,Team F,1'.encode()
+        chunks = [data[i : i + 3] for i in range(0, len(data), 3)]
+        self.assertEqual(
+            list(iter_csv_rows(chunks)),
+            [
+                ["Équipe A", "1", "Team B", "0"],
+                ["Team, C", "2", "Team D", "2"],
+                ["Team E", "0", "Team F", "1"],
+            ],
+        )
@@ -0,0 +1,71 @@
+from core.instrumentation import QueryBudgetExceeded, get_query_budget
+from core.models import Game, Team
+from core.tests.utils import QueryBudgetMixin
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+User = get_user_model()
+
+
+class PerformanceMiddlewareTestCase(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("testuser", "testuser@example.com")
+        self.client.force_authenticate(user=self.user)
+        home = Team.objects.create(name="Barcelona")
+        away = Team.objects.create(name="Real Madrid")
+        self.game = Game.objects.create(
+            home_team=home, home_team_score=2, away_team=away, away_team_score=1
+        )
+        self.url = reverse("game:game-list")
+
+    def test_server_timing_header(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        timing = response["Server-Timing"]
+        self.assertIn("db;dur=", timing)
+        self.assertIn("serialize;dur=", timing)
+        self.assertIn("total;dur=", timing)
+        self.assertQueryBudget(response)
+
+    def test_template_rendering_is_timed(self):
+        response = self.client.get(reverse("game:login"))
+        self.assertIn("render;dur=", response["Server-Timing"])
+
+    def test_metrics_are_logged(self):
+        with self.assertLogs("core.performance", level="INFO") as logs:
+            self.client.get(self.url)
+        self.assertIn("view=game:game-list method=GET status=200", logs.output[0])
+
+    @override_settings(QUERY_BUDGETS={"game:game-list": 0})
+    def test_enforced_budget_raises(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(self.url)
+
+    @override_settings(
+        QUERY_BUDGETS={"game:game-list": {"GET": 0}}, QUERY_BUDGETS_ENFORCED=False
+    )
+    def test_exceeded_budget_logs_warning(self):
+        with self.assertLogs("core.performance", level="WARNING") as logs:
+            self.client.get(self.url)
+        self.assertIn("its budget is 0", logs.output[-1])
+        # POST has no budget in this configuration.
+        self.assertIsNone(get_query_budget("game:game-list", "POST"))
+
+    def test_streamed_queries_are_counted(self):
+        response = self.client.get(self.url, {"stream": "1"})
+        metrics = response.wsgi_request.metrics
+        view_queries = metrics.queries
+        with self.assertLogs("core.performance", level="INFO") as logs:
+            b"".join(response.streaming_content)
+        self.assertEqual(metrics.queries, view_queries + 1)
+        self.assertIn(f"queries={metrics.queries} ", logs.output[0])
+
+    def test_streamed_queries_are_budgeted(self):
+        response = self.client.get(self.url, {"stream": "1"})
+        budget = response.wsgi_request.metrics.queries
+        with override_settings(QUERY_BUDGETS={"game:game-list": budget}):
+            response = self.client.get(self.url, {"stream": "1"})
+            with self.assertRaises(QueryBudgetExceeded):
+                b"".join(response.streaming_content)
@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from core.bulk import create_games
+from core.jobs import claim_next_job, process_next_job, run_job
+from core.models import Game, ImportJob
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+User = get_user_model()
+
+
+class ImportJobTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, GAME_IMPORT_BACKGROUND_THRESHOLD=0
+        )
+        self.settings_override.enable()
+        self.user = User.objects.create_user("testuser", "testuser@example.com")
+        self.user.set_password("Momohanaj2mf!")
+        self.user.save()
+        self.client.login(username="testuser", password="Momohanaj2mf!")
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def upload(self, data):
+        file = SimpleUploadedFile("games.csv", data, content_type="text/csv")
+        return self.client.post(reverse("game:upload_game"), {"csv_file": file})
+
+    def test_upload_creates_pending_job(self):
+        response = self.upload(b"Team A,2,Team B,1\n")
+        job = ImportJob.objects.get()
+        self.assertRedirects(response, reverse("game:import_job", args=[job.pk]))
+        self.assertEqual(job.status, ImportJob.PENDING)
+        self.assertEqual(job.user, self.user)
+        self.assertEqual(Game.objects.count(), 0)
+
+    def test_job_succeeds(self):
+        self.upload(b"Team A,2,Team B,1\nTeam C,3,Team D,1\n")
+        job = process_next_job()
+        self.assertEqual(job.status, ImportJob.SUCCEEDED)
+        self.assertEqual((job.rows_total, job.rows_processed), (2, 2))
+        self.assertEqual(Game.objects.count(), 2)
+        self.assertIsNone(process_next_job())
+
+        response = self.client.get(reverse("game:import-job-detail", args=[job.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], ImportJob.SUCCEEDED)
+        self.assertEqual(response.data["redirect_url"], reverse("game:ranking_table"))
+
+    def test_file_deleted_when_finished(self):
+        self.upload(b"Team A,2,Team B,1\n")
+        path = os.path.join(self.media_root, ImportJob.objects.get().file.name)
+        self.assertTrue(os.path.exists(path))
+        process_next_job()
+        self.assertFalse(os.path.exists(path))
+
+    def test_stale_job_resumed(self):
+        self.upload(b"Team A,2,Team B,1\nTeam C,3,Team D,1\n\nTeam E,0,Team F,0\n")
+        ImportJob.objects.update(
+            status=ImportJob.RUNNING,
+            attempts=1,
+            rows_total=3,
+            rows_processed=1,
+            heartbeat_at=timezone.now() - timedelta(hours=1),
+        )
+        job = process_next_job()
+        self.assertEqual(job.status, ImportJob.SUCCEEDED)
+        self.assertEqual((job.attempts, job.rows_processed), (2, 3))
+        self.assertEqual(
+            set(Game.objects.values_list("home_team__name", flat=True)),
+            {"Team C", "Team E"},
+        )
+
+    def test_running_job_not_claimed(self):
+        self.upload(b"Team A,2,Team B,1\n")
+        ImportJob.objects.update(
+            status=ImportJob.RUNNING, attempts=1, heartbeat_at=timezone.now()
+        )
+        self.assertIsNone(process_next_job())
+
+    def test_reclaimed_job_stops(self):
+        self.upload(b"Team A,2,Team B,1\n")
+        job = claim_next_job()
+        ImportJob.objects.update(attempts=2)
+        run_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.RUNNING)
+        self.assertEqual(Game.objects.count(), 0)
+
+    @override_settings(GAME_IMPORT_BATCH_SIZE=1)
+    def test_partial_failure_counts(self):
+        self.upload(b"Team A,2,Team B,1\nTeam C,3,Team D,1\nTeam E,0,Team F,0\n")
+        calls = []
+
+        def fail_second_batch(results, batch_size):
+            calls.append(batch_size)
+            if len(calls) > 1:
+                raise RuntimeError("Disk full.")
+            return create_games(results, batch_size=batch_size)
+
+        with mock.patch("core.importers.create_games", fail_second_batch):
+            job = process_next_job()
+        self.assertEqual(job.status, ImportJob.FAILED)
+        self.assertEqual((job.rows_processed, job.rows_failed), (1, 2))
+        self.assertIn("1 rows were imported before the error", job.message)
+        self.assertEqual(Game.objects.count(), 1)
+
+    def test_job_fails_on_invalid_rows(self):
+        self.upload(b"Team A,2,Team B\nTeam C,3,Team D,1\n")
+        job = process_next_job()
+        self.assertEqual(job.status, ImportJob.FAILED)
+        self.assertEqual(job.rows_invalid, 1)
+        self.assertEqual(job.errors[0]["line"], 1)
+        self.assertEqual(Game.objects.count(), 0)
+
+    def test_worker_command(self):
+        self.upload(b"Team A,2,Team B,1\n")
+        self.upload(b"Team A,0,Team B,1\n")
+        call_command("run_import_worker", threads=1, once=True, stdout=StringIO())
+        self.assertFalse(ImportJob.objects.exclude(status=ImportJob.SUCCEEDED).exists())
+        self.assertEqual(Game.objects.count(), 2)
+
+    def test_job_of_another_user(self):
+        self.upload(b"Team A,2,Team B,1\n")
+        job = ImportJob.objects.get()
+        other = User.objects.create_user("other", "other@example.com")
+        self.client.force_login(other)
+        response = self.client.get(reverse("game:import-job-detail", args=[job.pk]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,195 @@
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync
+from core.live import (
+    RESET,
+    LiveStandingsMiddleware,
+    StandingsBroadcaster,
+    Subscription,
+    broadcaster,
+    diff_rows,
+)
+from core.models import Game, Team
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+
+def row(team_id, points):
+    return {
+        "position": 1,
+        "team": {"id": team_id, "name": str(team_id)},
+        "points": points,
+    }
+
+
+class DiffRowsTestCase(TestCase):
+    def test_diff(self):
+        previous = [row(1, 3), row(2, 0), row(3, 1)]
+        rows = [row(1, 3), row(2, 3), row(4, 0)]
+        self.assertEqual(diff_rows(previous, rows), ([row(2, 3), row(4, 0)], [3]))
+
+
+class SubscriptionTestCase(TestCase):
+    @override_settings(LIVE_STANDINGS_QUEUE_SIZE=2)
+    def test_slow_subscriber_is_reset(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        subscription = Subscription("basic", loop)
+        for event in range(3):
+            subscription.put(event)
+        loop.run_until_complete(asyncio.sleep(0))
+        self.assertEqual(subscription.queue.qsize(), 1)
+        self.assertIs(subscription.queue.get_nowait(), RESET)
+
+
+class StandingsBroadcasterTestCase(TestCase):
+    def setUp(self):
+        self.team1 = Team.objects.create(name="Team 1")
+        self.team2 = Team.objects.create(name="Team 2")
+        self.broadcaster = StandingsBroadcaster()
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def events(self, subscription):
+        self.loop.run_until_complete(asyncio.sleep(0))
+        events = []
+        while not subscription.queue.empty():
+            events.append(subscription.queue.get_nowait())
+        return events
+
+    def test_only_changes_are_pushed(self):
+        basic = self.broadcaster.subscribe("basic", self.loop)
+        other = self.broadcaster.subscribe("basic", self.loop)
+        alternate = self.broadcaster.subscribe("alternate", self.loop)
+        self.assertEqual(len(self.broadcaster.table("basic").rows), 2)
+        self.broadcaster.table("alternate")
+
+        Game.objects.create(
+            home_team=self.team1,
+            home_team_score=1,
+            away_team=self.team2,
+            away_team_score=0,
+        )
+        # The table of each strategy is computed once for all subscribers.
+        with self.assertNumQueries(2):
+            self.broadcaster.refresh()
+        [event] = self.events(basic)
+        self.assertEqual(
+            [(row["team"]["name"], row["points"]) for row in event["changed"]],
+            [("Team 1", 3), ("Team 2", 0)],
+        )
+        self.assertEqual(event["removed"], [])
+        self.assertEqual(self.events(other), [event])
+        self.assertEqual(self.events(alternate)[0]["changed"][0]["points"], 2)
+
+        Team.objects.create(name="Team 3")
+        self.broadcaster.refresh()
+        [event] = self.events(basic)
+        self.assertEqual([row["team"]["name"] for row in event["changed"]], ["Team 3"])
+
+        # Writes which leave the table as it was push nothing.
+        Team.objects.get(name="Team 3").save()
+        self.broadcaster.refresh()
+        self.assertEqual(self.events(basic), [])
+
+    def test_no_subscribers(self):
+        with self.assertNumQueries(0):
+            self.broadcaster.refresh()
+
+    def test_unsubscribe_drops_the_table(self):
+        subscription = self.broadcaster.subscribe("basic", self.loop)
+        self.broadcaster.table("basic")
+        self.broadcaster.unsubscribe(subscription)
+        self.assertEqual(self.broadcaster._tables, {})
+
+    def test_published_on_commit(self):
+        subscription = broadcaster.subscribe("basic", self.loop)
+        self.addCleanup(broadcaster.unsubscribe, subscription)
+        broadcaster.table("basic")
+        with self.captureOnCommitCallbacks(execute=True):
+            Game.objects.create(
+                home_team=self.team1,
+                home_team_score=0,
+                away_team=self.team2,
+                away_team_score=2,
+            )
+        [event] = self.events(subscription)
+        self.assertEqual(event["changed"][0]["team"]["name"], "Team 2")
+
+
+class StandingsEventsTestCase(TestCase):
+    def setUp(self):
+        Team.objects.create(name="Team 1")
+        user = get_user_model().objects.create_user("testuser", "test@example.com")
+        self.client.force_login(user)
+        self.cookie = (
+            f"{settings.SESSION_COOKIE_NAME}="
+            f"{self.client.cookies[settings.SESSION_COOKIE_NAME].value}"
+        )
+
+    def request(self, query="", cookie=None):
+        """
+        Returns the messages sent until the first event, then disconnects.
+        """
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": settings.LIVE_STANDINGS_PATH,
+            "query_string": query.encode(),
+            "headers": [(b"cookie", cookie.encode())] if cookie else [],
+        }
+        messages = []
+
+        async def run():
+            sent = asyncio.Event()
+
+            async def receive():
+                await sent.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                messages.append(message)
+                if message["type"] == "http.response.body":
+                    sent.set()
+
+            async def app(scope, receive, send):
+                raise AssertionError("Not routed to the live standings.")
+
+            await LiveStandingsMiddleware(app)(scope, receive, send)
+
+        async_to_sync(run)()
+        return messages
+
+    def test_stream(self):
+        start, body = self.request("strategy=alternate", self.cookie)
+        self.assertEqual(start["status"], 200)
+        self.assertIn((b"content-type", b"text/event-stream"), start["headers"])
+        name, data = body["body"].decode().splitlines()[:2]
+        self.assertEqual(name, "event: standings")
+        rows = json.loads(data.removeprefix("data: "))["rows"]
+        self.assertEqual([row["team"]["name"] for row in rows], ["Team 1"])
+        self.assertEqual(broadcaster._tables, {})
+
+    def test_requires_login(self):
+        start, body = self.request()
+        self.assertEqual(start["status"], 403)
+
+    def test_unknown_strategy(self):
+        start, body = self.request("strategy=unknown", self.cookie)
+        self.assertEqual(start["status"], 400)
+
+    def test_other_paths(self):
+        async def app(scope, receive, send):
+            await send({"path": scope["path"]})
+
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async_to_sync(LiveStandingsMiddleware(app))(
+            {"type": "http", "path": "/ranking-table"}, None, send
+        )
+        self.assertEqual(messages, [{"path": "/ranking-table"}])
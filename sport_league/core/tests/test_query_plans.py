@@ -0,0 +1,122 @@
+import random
+import unittest
+
+from core.admin import GameAdmin
+from core.models import Game, Standing, Team
+from core.standings import get_standings
+from core.strategies import _side_totals
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.db.models import F, Q
+from django.test import TestCase
+
+GAMES = 100_000
+TEAMS = 40
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite's")
+class QueryPlanTestCase(TestCase):
+    """
+    Checks that the hot queries are answered from indexes, not full table
+    scans, on a table of 100k games.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        Team.objects.bulk_create([Team(name=f"Team {i}") for i in range(TEAMS)])
+        team_ids = list(Team.objects.values_list("pk", flat=True))
+        Game.objects.bulk_create(
+            (
+                Game(
+                    home_team_id=home,
+                    home_team_score=rng.randint(0, 5),
+                    away_team_id=away,
+                    away_team_score=rng.randint(0, 5),
+                )
+                for home, away in (rng.sample(team_ids, 2) for _ in range(GAMES))
+            ),
+            batch_size=5000,
+        )
+        Standing.objects.bulk_create(
+            Standing(team_id=team_id, strategy="basic") for team_id in team_ids
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        cls.team_ids = team_ids
+
+    def plan(self, queryset):
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, index):
+        plan = self.plan(queryset)
+        self.assertRegex(plan, rf"(SEARCH|SCAN) \S+ USING (COVERING )?INDEX {index}\b")
+        return plan
+
+    def test_standings_aggregation(self):
+        for queryset, index in (
+            (
+                _side_totals("home_team", "home_team_score", "away_team_score"),
+                "game_home_results_idx",
+            ),
+            (
+                _side_totals("away_team", "away_team_score", "home_team_score"),
+                "game_away_results_idx",
+            ),
+        ):
+            plan = self.plan(queryset)
+            self.assertIn(f"USING COVERING INDEX {index}", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_team_history(self):
+        team_id = self.team_ids[0]
+        for field, index in (
+            ("home_team", "game_home_history_idx"),
+            ("away_team", "game_away_history_idx"),
+        ):
+            queryset = Game.objects.filter(**{field: team_id}).order_by("-id")
+            plan = self.assertUsesIndex(queryset, index)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_head_to_head(self):
+        home, away = self.team_ids[:2]
+        queryset = Game.objects.filter(home_team=home, away_team=away)
+        self.assertUsesIndex(queryset, "game_pairing_idx")
+
+    def test_team_games(self):
+        team = Team.objects.get(pk=self.team_ids[0])
+        plan = self.plan(team.games)
+        self.assertIn("MULTI-INDEX OR", plan)
+        self.assertNotRegex(plan, r"SCAN \S+core_game\b(?! USING)")
+
+    def test_cursor_page(self):
+        queryset = Game.objects.filter(id__gt=GAMES // 2).order_by("id")[:100]
+        plan = self.plan(queryset)
+        self.assertRegex(plan, r"SEARCH \S+ USING INTEGER PRIMARY KEY")
+
+    def test_standings_read(self):
+        queryset = (
+            Standing.objects.filter(strategy="basic")
+            .select_related("team")
+            .order_by("-points", "team__name")
+        )
+        self.assertUsesIndex(queryset, "standing_points_idx")
+        self.assertEqual(len(get_standings("basic")), TEAMS)
+
+    def test_admin_search(self):
+        with self.assertNumQueries(0):
+            queryset, _ = GameAdmin(Game, site).get_search_results(
+                None, Game.objects.all(), "team 39"
+            )
+        # The teams are matched once by uncorrelated subqueries, and the page
+        # of the change list is read in primary key order, without sorting.
+        plan = self.plan(queryset.order_by("-id")[:100])
+        self.assertEqual(plan.count("LIST SUBQUERY"), 2)
+        self.assertNotIn("CORRELATED", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+        self.assertEqual(
+            queryset.count(),
+            Game.objects.filter(
+                Q(home_team__name="Team 39") | Q(away_team__name="Team 39")
+            ).count(),
+        )
@@ -0,0 +1,182 @@
+import random
+from io import StringIO
+
+from core.bulk import create_games, delete_games, update_game_scores
+from core.models import Game, RatingCheckpoint, Team, TeamRating
+from core.ratings import apply_changes, compute_ratings, expected_result, verify_ratings
+from core.standings import GameResult
+from core.tests.utils import play
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+
+class ComputeRatingsTestCase(TestCase):
+    def test_expected_result(self):
+        self.assertEqual(expected_result(1500, 1500), 0.5)
+        self.assertAlmostEqual(
+            expected_result(1600, 1400) + expected_result(1400, 1600), 1
+        )
+        self.assertGreater(expected_result(1600, 1400), 0.75)
+
+    @override_settings(RATING_INITIAL=1500, RATING_K_FACTOR=20, RATING_HOME_ADVANTAGE=0)
+    def test_compute_ratings(self):
+        ratings, games = compute_ratings([1, 2, 3], [(1, 2, 1, 0)])
+        self.assertEqual(list(ratings), [1510, 1490, 1500])
+        # A draw against a stronger team is worth rating points.
+        ratings, games = compute_ratings([1, 2, 3], [(1, 2, 1, 0), (3, 1, 2, 2)])
+        self.assertGreater(ratings[2], 1500)
+        self.assertLess(ratings[0], 1510)
+        self.assertAlmostEqual(sum(ratings), 4500)
+        self.assertEqual(list(games), [2, 1, 1])
+
+
+class RatingsTestCase(TestCase):
+    def setUp(self):
+        self.team1 = Team.objects.create(name="Team 1")
+        self.team2 = Team.objects.create(name="Team 2")
+        self.team3 = Team.objects.create(name="Team 3")
+
+    def rating(self, team):
+        return TeamRating.objects.get(team=team)
+
+    def test_created_with_team(self):
+        rating = self.rating(self.team1)
+        self.assertEqual(rating.rating, settings.RATING_INITIAL)
+        self.assertEqual(rating.games, 0)
+
+    def test_game_created(self):
+        play(self.team1, 3, self.team2, 0)
+        self.assertGreater(self.rating(self.team1).rating, settings.RATING_INITIAL)
+        self.assertLess(self.rating(self.team2).rating, settings.RATING_INITIAL)
+        self.assertEqual(self.rating(self.team3).rating, settings.RATING_INITIAL)
+        play(self.team2, 1, self.team3, 1)
+        self.assertEqual(self.rating(self.team2).games, 2)
+        self.assertEqual(verify_ratings(), [])
+
+    def test_game_updated_and_deleted(self):
+        game = play(self.team1, 3, self.team2, 0)
+        play(self.team2, 2, self.team3, 1)
+        game.home_team_score = 0
+        game.save()
+        self.assertLess(self.rating(self.team1).rating, settings.RATING_INITIAL)
+        self.assertEqual(verify_ratings(), [])
+        game.delete()
+        self.assertEqual(self.rating(self.team1).rating, settings.RATING_INITIAL)
+        self.assertEqual(self.rating(self.team1).games, 0)
+        self.assertEqual(verify_ratings(), [])
+
+    def test_round_change_keeps_ratings(self):
+        game = play(self.team1, 3, self.team2, 0)
+        game.round = 1
+        with self.assertNumQueries(0):
+            apply_changes(
+                added=[GameResult.from_game(game)],
+                removed=[GameResult.from_game(game)._replace(round=None)],
+            )
+
+    def test_bulk_paths(self):
+        games = create_games(
+            [
+                GameResult(self.team1.pk, 1, self.team2.pk, 0),
+                GameResult(self.team3.pk, 0, self.team1.pk, 2),
+            ]
+        )
+        self.assertEqual(verify_ratings(), [])
+        games[0].home_team_score = 0
+        update_game_scores(games[:1])
+        self.assertEqual(verify_ratings(), [])
+        delete_games(Game.objects.filter(pk=games[1].pk))
+        self.assertEqual(verify_ratings(), [])
+
+    @override_settings(RATING_CHECKPOINT_INTERVAL=10)
+    def test_replayed_from_checkpoint(self):
+        teams = [self.team1, self.team2, self.team3]
+        rng = random.Random(7)
+        for _ in range(30):
+            home, away = rng.sample(teams, 2)
+            play(home, rng.randint(0, 4), away, rng.randint(0, 4))
+        games = list(Game.objects.order_by("pk"))
+        self.assertFalse(RatingCheckpoint.objects.exists())
+        # Without checkpoints, all the games are replayed.
+        games[0].home_team_score += 1
+        games[0].save()
+        self.assertEqual(verify_ratings(tolerance=0), [])
+        checkpoints = RatingCheckpoint.objects.order_by("game_id")
+        self.assertEqual(
+            list(checkpoints.values_list("game_id", flat=True)),
+            [games[9].pk, games[19].pk, games[29].pk],
+        )
+
+        last = games[-1]
+        removed = GameResult.from_game(last)
+        # Swapped and one more goal for the away team: the result changes.
+        last.home_team_score, last.away_team_score = (
+            last.away_team_score,
+            last.home_team_score + 1,
+        )
+        Game.objects.filter(pk=last.pk).update(
+            home_team_score=last.home_team_score, away_team_score=last.away_team_score
+        )
+        # The checkpoint before the game, the later ones deleted, the ten games
+        # since, a new checkpoint, the ratings read and two of them updated,
+        # within a savepoint.
+        with self.assertNumQueries(8):
+            apply_changes(added=[GameResult.from_game(last)], removed=[removed])
+        self.assertEqual(verify_ratings(tolerance=0), [])
+        for game in rng.sample(games, 5):
+            game.away_team_score += 2
+            game.save()
+            self.assertEqual(verify_ratings(tolerance=0), [])
+        delete_games(Game.objects.filter(pk__in=[games[3].pk, games[25].pk]))
+        self.assertEqual(verify_ratings(tolerance=0), [])
+        self.assertEqual(checkpoints.count(), 2)
+
+    def test_team_deleted(self):
+        play(self.team1, 3, self.team2, 0)
+        play(self.team2, 1, self.team3, 1)
+        play(self.team3, 0, self.team1, 2)
+        self.team1.delete()
+        self.assertEqual(
+            set(TeamRating.objects.values_list("team_id", flat=True)),
+            {self.team2.pk, self.team3.pk},
+        )
+        self.assertEqual(verify_ratings(), [])
+        self.assertEqual(self.rating(self.team2).games, 1)
+
+    def test_rebuild_and_verify_commands(self):
+        play(self.team1, 3, self.team2, 0)
+        TeamRating.objects.filter(team=self.team1).update(rating=0)
+        with self.assertRaises(CommandError):
+            call_command(
+                "rebuild_ratings", verify=True, stdout=StringIO(), stderr=StringIO()
+            )
+        call_command("rebuild_ratings", stdout=StringIO())
+        self.assertEqual(verify_ratings(), [])
+        self.assertGreater(self.rating(self.team1).rating, settings.RATING_INITIAL)
+
+
+class RatingsInStandingsTestCase(APITestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("testuser", "test@example.com")
+        self.client.force_authenticate(user=user)
+        self.client.force_login(user)
+        self.team1 = Team.objects.create(name="Team 1")
+        self.team2 = Team.objects.create(name="Team 2")
+        play(self.team1, 2, self.team2, 0, round=1)
+
+    def test_standings_api(self):
+        response = self.client.get(reverse("game:standings"))
+        results = response.data["results"]
+        self.assertEqual(results[0]["rating"], round(self.team1.rating.rating, 1))
+        self.assertLess(results[1]["rating"], settings.RATING_INITIAL)
+        response = self.client.get(reverse("game:standings"), {"as_of": 1})
+        self.assertEqual(response.data["results"][0]["rating"], results[0]["rating"])
+
+    def test_ranking_view(self):
+        response = self.client.get(reverse("game:ranking_table"))
+        self.assertContains(response, '<th scope="col">Rating</th>', html=False)
+        self.assertContains(response, f"<td>{self.team1.rating.rating:.0f}</td>")
@@ -0,0 +1,153 @@
+from core.models import Game, Team
+from core.rules import RankingEntry, compile_rules
+from core.standings import get_ranking
+from core.strategies import (
+    BasicRankingStrategy,
+    RankingStrategy,
+    aggregate_team_totals,
+    get_ranking_strategy,
+    ranking_strategies,
+)
+from core.vectorized import PairwiseResults
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+LEAGUE = {
+    "points": {"win": 3, "draw": 1, "loss": 0},
+    "tie_breakers": ["goal_difference", "goals_for", "head_to_head", "wins"],
+}
+
+
+class RulesTestCase(TestCase):
+    def setUp(self):
+        self.teams = {
+            name: Team.objects.create(name=name)
+            for name in ["Alpha", "Bravo", "Charlie", "Delta"]
+        }
+
+    def play(self, home, home_score, away, away_score):
+        Game.objects.create(
+            home_team=self.teams[home],
+            home_team_score=home_score,
+            away_team=self.teams[away],
+            away_team_score=away_score,
+        )
+
+    def names(self, strategy):
+        return [
+            team.name
+            for team, points in strategy.calculate_rankings(Team.objects.all())
+        ]
+
+    def test_goal_difference_before_name(self):
+        self.play("Alpha", 1, "Bravo", 0)
+        self.play("Charlie", 4, "Delta", 0)
+        strategy = RankingStrategy.from_spec("league", LEAGUE)()
+        self.assertEqual(self.names(strategy), ["Charlie", "Alpha", "Bravo", "Delta"])
+        # The built-in strategies still break ties by name only.
+        self.assertEqual(
+            self.names(BasicRankingStrategy()), ["Alpha", "Charlie", "Bravo", "Delta"]
+        )
+
+    def test_head_to_head(self):
+        self.play("Charlie", 1, "Bravo", 0)
+        self.play("Bravo", 5, "Delta", 0)
+        head_to_head = RankingStrategy.from_spec(
+            "h2h", {**LEAGUE, "tie_breakers": ["head_to_head"]}
+        )()
+        self.assertEqual(
+            self.names(head_to_head), ["Charlie", "Bravo", "Alpha", "Delta"]
+        )
+        league = RankingStrategy.from_spec("league", LEAGUE)()
+        self.assertEqual(self.names(league), ["Bravo", "Charlie", "Alpha", "Delta"])
+
+    def test_head_to_head_mini_league(self):
+        # Alpha, Bravo and Charlie beat each other in a cycle, so their
+        # mini-league is decided by the goal difference of those games.
+        self.play("Charlie", 1, "Bravo", 0)
+        self.play("Bravo", 2, "Alpha", 0)
+        self.play("Alpha", 1, "Charlie", 0)
+        self.play("Delta", 0, "Alpha", 1)
+        self.play("Delta", 0, "Charlie", 1)
+        self.play("Bravo", 1, "Delta", 0)
+        strategy = RankingStrategy.from_spec(
+            "h2h", {**LEAGUE, "tie_breakers": ["head_to_head"]}
+        )()
+        standings = strategy.calculate_rankings(Team.objects.all())
+        self.assertEqual(
+            [(team.name, points) for team, points in standings],
+            [("Bravo", 6), ("Charlie", 6), ("Alpha", 6), ("Delta", 0)],
+        )
+
+    def test_head_to_head_reads_games_once(self):
+        self.play("Alpha", 1, "Bravo", 1)
+        strategy = RankingStrategy.from_spec(
+            "h2h", {**LEAGUE, "tie_breakers": ["head_to_head"]}
+        )()
+        teams = list(Team.objects.all())
+        # Totals, then the pairwise results shared by the Alpha/Bravo and the
+        # Charlie/Delta mini-leagues.
+        with self.assertNumQueries(2):
+            strategy.calculate_rankings(teams)
+        # No tie to break, no pairwise results.
+        self.play("Charlie", 1, "Delta", 0)
+        self.play("Alpha", 2, "Charlie", 0)
+        with self.assertNumQueries(1):
+            strategy.calculate_rankings(teams)
+
+    def test_head_to_head_reads_games_of_tied_teams(self):
+        self.play("Alpha", 1, "Bravo", 1)
+        self.play("Charlie", 2, "Delta", 0)
+        strategy = RankingStrategy.from_spec(
+            "h2h", {**LEAGUE, "tie_breakers": ["head_to_head"]}
+        )()
+        totals = aggregate_team_totals()
+        entries = [
+            RankingEntry(team, strategy.points_for(totals[team.pk]), totals[team.pk])
+            for team in Team.objects.all()
+        ]
+        calls = []
+
+        def pairwise(team_ids):
+            calls.append(sorted(team_ids))
+            return PairwiseResults.from_queryset(team_ids=team_ids)
+
+        ranked = strategy.rules.rank(entries, pairwise)
+        self.assertEqual(
+            [entry.team.name for entry in ranked],
+            ["Charlie", "Alpha", "Bravo", "Delta"],
+        )
+        self.assertEqual(
+            calls, [sorted([self.teams["Alpha"].pk, self.teams["Bravo"].pk])]
+        )
+
+    def test_compile_rules_merges_static_tie_breakers(self):
+        rules = compile_rules((3, 1, 0), ["goal_difference", "goals_for"])
+        self.assertEqual(len(rules.stages), 1)
+        self.assertFalse(rules.needs_head_to_head)
+        rules = compile_rules((3, 1, 0), LEAGUE["tie_breakers"])
+        self.assertEqual(len(rules.stages), 3)
+        self.assertTrue(rules.needs_head_to_head)
+
+    def test_unknown_tie_breaker(self):
+        with self.assertRaises(ValueError):
+            compile_rules((3, 1, 0), ["coin_toss"])
+
+    @override_settings(RANKING_STRATEGIES={"custom": LEAGUE})
+    def test_strategy_from_settings(self):
+        self.play("Alpha", 0, "Bravo", 3)
+        self.assertIn("custom", ranking_strategies())
+        self.assertNotIn("league", ranking_strategies())
+        strategy = get_ranking_strategy("custom")
+        self.assertEqual(strategy.label, "custom")
+        ranking = get_ranking("custom")
+        self.assertEqual(
+            [(entry.team.name, entry.points) for entry in ranking],
+            [("Bravo", 3), ("Charlie", 0), ("Delta", 0), ("Alpha", 0)],
+        )
+        self.assertEqual(ranking[0].totals.goals_for, 3)
+
+    @override_settings(RANKING_STRATEGIES={"broken": {"points": {"win": 3}}})
+    def test_invalid_strategy_in_settings(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ranking_strategies()
@@ -1,5 +1,5 @@
-from core.models import Team
-from core.serializers import TeamSerializer
+from core.models import Game, Team
+from core.serializers import GameRowSerializer, GameSerializer, TeamSerializer
 from django.test import TestCase
 
 
@@ -25,3 +25,31 @@ class TeamSerializerTestCase(TestCase):
         self.assertEqual(
             str(serializer.errors["name"][0]), "This field may not be blank."
         )
+
+
+class GameRowSerializerTestCase(TestCase):
+    def setUp(self):
+        team1 = Team.objects.create(name="Team 1")
+        team2 = Team.objects.create(name="Team 2")
+        Game.objects.create(
+            home_team=team1, home_team_score=2, away_team=team2, away_team_score=1
+        )
+        Game.objects.create(
+            home_team=team2, home_team_score=0, away_team=team1, away_team_score=0
+        )
+
+    def test_same_representation_as_game_serializer(self):
+        games = Game.objects.order_by("pk")
+        serializer = GameRowSerializer(GameRowSerializer.rows(games), many=True)
+        self.assertEqual(serializer.data, GameSerializer(games, many=True).data)
+
+    def test_single_row(self):
+        game = Game.objects.order_by("pk").first()
+        row = GameRowSerializer.rows(Game.objects.filter(pk=game.pk)).get()
+        self.assertEqual(GameRowSerializer(row).data, GameSerializer(game).data)
+
+    def test_one_query(self):
+        with self.assertNumQueries(1):
+            GameRowSerializer(
+                GameRowSerializer.rows(Game.objects.all()), many=True
+            ).data
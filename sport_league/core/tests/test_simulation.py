@@ -0,0 +1,195 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+from core.cache import get_cache
+from core.models import Game, Team
+from core.simulation import remaining_fixtures, simulate_season
+from core.standings import get_ranking
+from core.strategies import BasicRankingStrategy, RankingStrategy
+from core.tests.utils import QueryBudgetMixin, play
+from core.vectorized import GameArrays
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+
+class SimulateSeasonTestCase(TestCase):
+    def setUp(self):
+        self.teams = [Team.objects.create(name=f"Team {i}") for i in range(4)]
+        strong, *others = self.teams
+        for other in others:
+            play(strong, 5, other, 0)
+            play(other, 0, strong, 4)
+        play(self.teams[1], 1, self.teams[2], 1)
+
+    def test_remaining_fixtures(self):
+        team_ids = np.array(sorted(team.pk for team in self.teams))
+        fixtures = remaining_fixtures(team_ids, GameArrays.from_queryset())
+        # 12 games in a double round-robin of 4 teams, 7 played.
+        self.assertEqual(len(fixtures), 5)
+        self.assertNotIn([1, 2], fixtures.tolist())
+
+    def test_distributions(self):
+        result = simulate_season(BasicRankingStrategy(), 2000, workers=1)
+        probabilities = result.probabilities
+        np.testing.assert_allclose(probabilities.sum(axis=0), 1)
+        np.testing.assert_allclose(probabilities.sum(axis=1), 1)
+        self.assertEqual(result.fixtures, 5)
+        # The strong team already won the league.
+        self.assertEqual(probabilities[0, 0], 1)
+        data = result.as_dict(relegation_places=1)
+        self.assertEqual(data["results"][0]["team"]["name"], "Team 0")
+        self.assertEqual(data["results"][0]["title"], 1)
+        self.assertEqual(data["results"][0]["relegation"], 0)
+
+    def test_reproducible_whatever_the_workers(self):
+        strategy = BasicRankingStrategy()
+        counts = simulate_season(strategy, 1000, workers=1, batch_size=300).counts
+        np.testing.assert_array_equal(
+            simulate_season(strategy, 1000, workers=2, batch_size=300).counts, counts
+        )
+        self.assertFalse(
+            np.array_equal(
+                simulate_season(strategy, 1000, workers=1, seed=1).counts, counts
+            )
+        )
+
+    def test_finished_season_matches_the_ranking(self):
+        result = simulate_season(BasicRankingStrategy(), 10, fixtures=[])
+        ranking = [entry.team for entry in get_ranking("basic")]
+        order = [result.teams[i] for i in result.counts.argmax(axis=0)]
+        self.assertEqual(order, ranking)
+
+    def test_explicit_fixtures(self):
+        last = self.teams[-1]
+        result = simulate_season(
+            BasicRankingStrategy(), 100, fixtures=[(last.pk, self.teams[1].pk)]
+        )
+        self.assertEqual(result.fixtures, 1)
+        with self.assertRaises(ValueError):
+            simulate_season(BasicRankingStrategy(), 10, fixtures=[(last.pk, 0)])
+
+    def test_strategy_without_weights(self):
+        class CustomStrategy(RankingStrategy):
+            def calculate_points(self, game, team):
+                return 1
+
+        with self.assertRaises(ValueError):
+            simulate_season(CustomStrategy(), 10)
+
+
+class SimulationAPIViewTestCase(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("testuser", "test@example.com")
+        self.client.force_authenticate(user=user)
+        home = Team.objects.create(name="Team 1")
+        away = Team.objects.create(name="Team 2")
+        play(home, 2, away, 1)
+        self.teams = [home, away]
+        self.url = reverse("game:simulation")
+        # The throttle counts the requests in the default cache.
+        get_cache().clear()
+
+    def test_simulation(self):
+        response = self.client.get(self.url, {"simulations": 500, "seed": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["seasons"], 500)
+        self.assertEqual(response.data["remaining_fixtures"], 1)
+        self.assertEqual(
+            [row["team"]["name"] for row in response.data["results"]],
+            ["Team 1", "Team 2"],
+        )
+        self.assertEqual(len(response.data["results"][0]["positions"]), 2)
+        self.assertQueryBudget(response)
+
+    def test_invalid_parameters(self):
+        for params in [
+            {"simulations": 0},
+            {"simulations": "a"},
+            {"simulations": 10**9},
+            {"seed": -1},
+            {"strategy": "unknown"},
+            {"fixtures": ""},
+            {"fixtures": "1-2"},
+            {"fixtures": "1:2:3"},
+            {"fixtures": "0:1"},
+        ]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_fixtures(self):
+        home, away = self.teams
+        response = self.client.get(
+            self.url, {"simulations": 100, "fixtures": f"{away.pk}:{home.pk}," * 3}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["remaining_fixtures"], 3)
+        response = self.client.get(self.url, {"simulations": 100})
+        self.assertEqual(response.data["remaining_fixtures"], 1)
+        with self.settings(API_MAX_SIMULATION_FIXTURES=2):
+            response = self.client.get(
+                self.url, {"fixtures": f"{away.pk}:{home.pk}," * 3}
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_simulated_in_process(self):
+        with mock.patch(
+            "core.views.simulate_season", wraps=simulate_season
+        ) as simulate:
+            response = self.client.get(self.url, {"simulations": 100})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(simulate.call_args.kwargs["workers"], 1)
+
+    @override_settings(API_SIMULATION_RATE="2/min")
+    def test_throttled(self):
+        for seed in range(2):
+            response = self.client.get(self.url, {"simulations": 10, "seed": seed})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.url, {"simulations": 10, "seed": 2})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_requires_login(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class SimulateSeasonCommandTestCase(TestCase):
+    def test_command(self):
+        home = Team.objects.create(name="Team 1")
+        Team.objects.create(name="Team 2")
+        Team.objects.create(name="Team 3")
+        play(home, 3, Team.objects.get(name="Team 2"), 0)
+        out = StringIO()
+        call_command("simulate_season", simulations=200, workers=1, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["strategy"], "basic")
+        self.assertEqual(report["seasons"], 200)
+        self.assertEqual(len(report["results"]), 3)
+
+    def test_fixtures_file(self):
+        home = Team.objects.create(name="Team 1")
+        away = Team.objects.create(name="Team 2")
+        play(home, 3, away, 0)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "fixtures.csv")
+        with open(path, "w") as f:
+            f.write("Team 2,Team 1\n\nTeam 1,Team 2\nTeam 2,Team 1\n")
+        out = StringIO()
+        call_command(
+            "simulate_season", simulations=10, workers=1, fixtures=path, stdout=out
+        )
+        self.assertEqual(json.loads(out.getvalue())["remaining_fixtures"], 3)
+
+        with open(path, "w") as f:
+            f.write("Team 1,Team 3\n")
+        with self.assertRaisesMessage(CommandError, "unknown team 'Team 3'"):
+            call_command("simulate_season", simulations=10, workers=1, fixtures=path)
@@ -0,0 +1,139 @@
+from datetime import datetime, timezone
+from io import StringIO
+from unittest import mock
+
+from core.models import Game, StandingsSnapshot, Team
+from core.snapshots import (
+    assign_rounds,
+    get_ranking_as_of,
+    refresh_snapshots,
+    totals_as_of,
+)
+from core.standings import GameResult, team_deltas
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+
+@override_settings(STANDINGS_KEYFRAME_INTERVAL=3)
+class SnapshotsTestCase(TestCase):
+    def setUp(self):
+        self.teams = [Team.objects.create(name=f"Team {i}") for i in range(4)]
+
+    def play(self, round_number, home, home_score, away, away_score):
+        return Game.objects.create(
+            home_team=self.teams[home],
+            home_team_score=home_score,
+            away_team=self.teams[away],
+            away_team_score=away_score,
+            round=round_number,
+        )
+
+    def play_season(self, rounds=7):
+        # The snapshots are refreshed when the games are committed.
+        with self.captureOnCommitCallbacks(execute=True):
+            for round_number in range(1, rounds + 1):
+                self.play(round_number, 0, round_number % 3, 1, 1)
+                self.play(round_number, 2, 2, 3, round_number % 2)
+
+    def recompute(self, round_number):
+        games = Game.objects.filter(round__lte=round_number)
+        return team_deltas(
+            [GameResult(*row) for row in games.values_list(*GameResult._fields)], []
+        )
+
+    def test_totals_match_a_recomputation(self):
+        self.play_season()
+        for round_number in range(1, 8):
+            self.assertEqual(totals_as_of(round_number), self.recompute(round_number))
+
+    def test_keyframes(self):
+        self.play_season()
+        self.assertEqual(
+            list(
+                StandingsSnapshot.objects.filter(totals__isnull=False).values_list(
+                    "round", flat=True
+                )
+            ),
+            [3, 6],
+        )
+        self.assertTrue(StandingsSnapshot.objects.get(round=6).is_keyframe)
+        # Keyframe 6 and the deltas of round 7.
+        with self.assertNumQueries(1):
+            totals_as_of(7)
+
+    def test_changes_refresh_the_later_rounds(self):
+        self.play_season()
+        game = Game.objects.get(round=2, home_team=self.teams[0])
+        game.home_team_score = 5
+        game.save()
+        self.assertEqual(totals_as_of(7), self.recompute(7))
+        game.delete()
+        self.assertEqual(totals_as_of(7), self.recompute(7))
+        self.play(4, 1, 0, 3, 2)
+        self.assertEqual(totals_as_of(4), self.recompute(4))
+        self.assertEqual(totals_as_of(7), self.recompute(7))
+
+    def test_games_without_round_are_left_out(self):
+        self.play(1, 0, 1, 1, 0)
+        self.play(None, 2, 1, 3, 0)
+        self.assertEqual(set(totals_as_of(1)), {self.teams[0].pk, self.teams[1].pk})
+
+    def test_ranking_as_of(self):
+        self.play(1, 0, 0, 1, 1)
+        self.play(2, 0, 3, 1, 0)
+        ranking = get_ranking_as_of("basic", 1)
+        self.assertEqual([entry.team for entry in ranking], self.teams[1::-1])
+        self.assertEqual(get_ranking_as_of("basic", 2)[0].team, self.teams[0])
+
+    def test_assign_rounds(self):
+        Game.objects.create(
+            home_team=self.teams[0],
+            home_team_score=1,
+            away_team=self.teams[1],
+            away_team_score=0,
+            played_at=datetime(2023, 5, 2, 18, tzinfo=timezone.utc),
+        )
+        self.play(None, 2, 1, 3, 1)
+        self.play(None, 0, 1, 2, 1)
+        self.play(None, 1, 1, 3, 1)
+        self.assertEqual(assign_rounds(), 3)
+        self.assertEqual(
+            list(Game.objects.order_by("pk").values_list("round", flat=True)),
+            [1, 2, 2, 3],
+        )
+        self.assertEqual(totals_as_of(3), self.recompute(3))
+        self.assertEqual(assign_rounds(), 0)
+
+    def test_backfill_command(self):
+        self.play_season(4)
+        StandingsSnapshot.objects.all().delete()
+        Game.objects.filter(round=4).update(round=None)
+        out = StringIO()
+        call_command("backfill_snapshots", "--assign-rounds", stdout=out)
+        self.assertIn("Assigned 1 rounds.", out.getvalue())
+        self.assertIn("Wrote 4 round snapshots.", out.getvalue())
+        self.assertEqual(totals_as_of(4), self.recompute(4))
+
+    def test_changes_refreshed_once_per_transaction(self):
+        self.play_season()
+        with mock.patch(
+            "core.snapshots.refresh_snapshots", wraps=refresh_snapshots
+        ) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.play(5, 1, 0, 2, 0)
+                self.play(3, 3, 1, 0, 0)
+                self.teams[2].delete()
+        refresh.assert_called_once_with(1)
+        for round_number in range(1, 8):
+            self.assertEqual(totals_as_of(round_number), self.recompute(round_number))
+
+    def test_pending_changes_refreshed_before_reads(self):
+        self.play_season()
+        self.play(2, 1, 4, 0, 0)
+        self.assertEqual(totals_as_of(7), self.recompute(7))
+
+    def test_refresh_snapshots(self):
+        self.play_season(4)
+        StandingsSnapshot.objects.filter(round__gte=2).delete()
+        self.assertEqual(refresh_snapshots(2), 3)
+        self.assertEqual(totals_as_of(4), self.recompute(4))
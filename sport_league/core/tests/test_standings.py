@@ -0,0 +1,150 @@
+from io import StringIO
+
+import tablib
+from core.bulk import delete_teams
+from core.models import Game, Standing, Team
+from core.resources import GameResource
+from core.signals import games_changed
+from core.standings import get_standings, rebuild_standings, verify_standings
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+
+class StandingsTestCase(TestCase):
+    def setUp(self):
+        self.team1 = Team.objects.create(name="Team 1")
+        self.team2 = Team.objects.create(name="Team 2")
+
+    def get_standing(self, team, strategy="basic"):
+        return Standing.objects.get(team=team, strategy=strategy)
+
+    def test_rows_created_with_team(self):
+        self.assertEqual(
+            set(self.team1.standings.values_list("strategy", flat=True)),
+            {"basic", "alternate"},
+        )
+
+    def test_game_created(self):
+        Game.objects.create(
+            home_team=self.team1,
+            home_team_score=2,
+            away_team=self.team2,
+            away_team_score=1,
+        )
+        standing = self.get_standing(self.team1)
+        self.assertEqual(standing.points, 3)
+        self.assertEqual(
+            (standing.played, standing.wins, standing.goals_for), (1, 1, 2)
+        )
+        self.assertEqual(self.get_standing(self.team1, "alternate").points, 2)
+        self.assertEqual(self.get_standing(self.team2).losses, 1)
+        self.assertEqual(verify_standings(), [])
+
+    def test_game_updated_and_deleted(self):
+        game = Game.objects.create(
+            home_team=self.team1,
+            home_team_score=2,
+            away_team=self.team2,
+            away_team_score=1,
+        )
+        game.home_team_score = 1
+        game.save()
+        self.assertEqual(self.get_standing(self.team1).points, 1)
+        self.assertEqual(self.get_standing(self.team2).draws, 1)
+        self.assertEqual(verify_standings(), [])
+
+        game.delete()
+        standing = self.get_standing(self.team2)
+        self.assertEqual((standing.points, standing.played), (0, 0))
+        self.assertEqual(verify_standings(), [])
+
+    def test_team_deleted(self):
+        team3 = Team.objects.create(name="Team 3")
+        for home, away in [(self.team1, self.team2), (self.team2, self.team1)]:
+            Game.objects.create(
+                home_team=home, home_team_score=2, away_team=away, away_team_score=1
+            )
+        Game.objects.create(
+            home_team=self.team2, home_team_score=0, away_team=team3, away_team_score=0
+        )
+        changes = []
+
+        def receiver(sender, removed, **kwargs):
+            changes.append(removed)
+
+        games_changed.connect(receiver)
+        self.addCleanup(games_changed.disconnect, receiver)
+        delete_teams(Team.objects.filter(pk=self.team1.pk))
+        # The games are cascaded in one batch.
+        self.assertEqual([len(removed) for removed in changes], [2])
+        self.assertEqual(Game.objects.count(), 1)
+        standing = self.get_standing(self.team2)
+        self.assertEqual((standing.played, standing.points), (1, 1))
+        self.assertEqual(verify_standings(), [])
+
+    def test_resource_bulk_import(self):
+        dataset = tablib.Dataset(
+            ["", "Team 1", 0, "Team 3", 3],
+            ["", "Team 2", 1, "Team 3", 1],
+            headers=[
+                "id",
+                "home_team",
+                "home_team_score",
+                "away_team",
+                "away_team_score",
+            ],
+        )
+        result = GameResource().import_data(dataset, dry_run=False)
+        self.assertFalse(result.has_errors())
+        team3 = Team.objects.get(name="Team 3")
+        self.assertEqual(self.get_standing(team3).points, 4)
+        self.assertEqual(verify_standings(), [])
+
+    def test_resource_dry_run_without_transactions(self):
+        dataset = tablib.Dataset(
+            ["", "Team 1", 0, "Team 3", 3],
+            headers=[
+                "id",
+                "home_team",
+                "home_team_score",
+                "away_team",
+                "away_team_score",
+            ],
+        )
+        result = GameResource().import_data(
+            dataset, dry_run=True, use_transactions=False
+        )
+        self.assertFalse(result.has_errors())
+        self.assertEqual(result.totals["new"], 1)
+        self.assertFalse(Team.objects.filter(name="Team 3").exists())
+        self.assertEqual(Game.objects.count(), 0)
+
+    def test_get_standings_order(self):
+        Game.objects.create(
+            home_team=self.team1,
+            home_team_score=0,
+            away_team=self.team2,
+            away_team_score=1,
+        )
+        Team.objects.create(name="Team 0")
+        standings = get_standings("basic")
+        self.assertEqual(
+            [(team.name, points) for team, points in standings],
+            [("Team 2", 3), ("Team 0", 0), ("Team 1", 0)],
+        )
+
+    def test_rebuild_and_verify(self):
+        Game.objects.create(
+            home_team=self.team1,
+            home_team_score=1,
+            away_team=self.team2,
+            away_team_score=1,
+        )
+        Standing.objects.filter(team=self.team1).update(points=10)
+        self.assertEqual(len(verify_standings()), 2)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_standings", verify=True, stderr=StringIO())
+
+        self.assertEqual(rebuild_standings(), 4)
+        self.assertEqual(verify_standings(), [])
+        self.assertEqual(self.get_standing(self.team1).points, 1)
@@ -0,0 +1,97 @@
+import json
+import os
+import random
+import tempfile
+from io import StringIO
+
+import numpy as np
+from core.bulk import create_games, delete_games
+from core.models import Game, Team
+from core.ratings import compute_team_ratings
+from core.simulation import simulate_season
+from core.standings import GameResult
+from core.store import GAME_STORE_DTYPE, GameStore, write_game_store
+from core.strategies import get_ranking_strategy
+from core.vectorized import GameArrays, calculate_rankings
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class GameStoreTestCase(TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        teams = [Team.objects.create(name=f"Team {i}") for i in range(6)]
+        create_games(
+            [
+                GameResult(home.pk, rng.randint(0, 4), away.pk, rng.randint(0, 4))
+                for home, away in (rng.sample(teams, 2) for _ in range(50))
+            ]
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "games.store")
+
+    def test_round_trip(self):
+        self.assertEqual(write_game_store(self.path, chunk_size=16), 50)
+        self.assertEqual(
+            os.path.getsize(self.path) - len(json.dumps([[1, "Team 0"]] * 6)),
+            32 + 50 * GAME_STORE_DTYPE.itemsize,
+        )
+        store = GameStore(self.path)
+        self.assertEqual(len(store), 50)
+        self.assertIsInstance(store.records, np.memmap)
+        expected = GameArrays.from_queryset(Game.objects.order_by("pk"))
+        for column, values in zip(store.arrays, expected):
+            self.assertTrue(np.shares_memory(column, store.records))
+            np.testing.assert_array_equal(column, values)
+        self.assertEqual(
+            [(team.pk, team.name) for team in store.teams()],
+            list(Team.objects.order_by("pk").values_list("pk", "name")),
+        )
+
+    def test_analytics_without_database(self):
+        write_game_store(self.path)
+        strategy = get_ranking_strategy("league")
+        expected_rankings = calculate_rankings(strategy, Team.objects.all())
+        expected_ratings = compute_team_ratings()
+        expected_counts = simulate_season(strategy, 500, workers=1).counts
+
+        with self.assertNumQueries(0):
+            store = GameStore(self.path)
+            rankings = calculate_rankings(strategy, store.teams(), store.arrays)
+            ratings = compute_team_ratings(store.arrays, store.team_ids)
+            counts = simulate_season(
+                strategy, 500, workers=1, arrays=store.arrays, teams=store.teams()
+            ).counts
+        self.assertEqual(
+            [(team.pk, points) for team, points in rankings],
+            [(team.pk, points) for team, points in expected_rankings],
+        )
+        self.assertEqual(
+            [(row.team_id, row.rating, row.games) for row in ratings],
+            [(row.team_id, row.rating, row.games) for row in expected_ratings],
+        )
+        np.testing.assert_array_equal(counts, expected_counts)
+
+    def test_empty(self):
+        delete_games(Game.objects.all())
+        write_game_store(self.path)
+        store = GameStore(self.path)
+        self.assertEqual(len(store.arrays), 0)
+        self.assertEqual(len(store.teams()), 6)
+
+    def test_invalid_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            GameStore(self.path)
+
+    def test_commands(self):
+        out = StringIO()
+        call_command("snapshot_games", output=self.path, stdout=out)
+        self.assertIn("Wrote 50 games", out.getvalue())
+        out = StringIO()
+        call_command(
+            "simulate_season", simulations=100, workers=1, store=self.path, stdout=out
+        )
+        self.assertEqual(len(json.loads(out.getvalue())["results"]), 6)
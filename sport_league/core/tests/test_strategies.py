@@ -0,0 +1,74 @@
+from core.models import Game, Team
+from core.strategies import (
+    AlternateRankingStrategy,
+    BasicRankingStrategy,
+    RankingStrategy,
+    aggregate_team_totals,
+)
+from django.test import TestCase
+
+
+class LegacyRankingStrategy(RankingStrategy):
+    def calculate_points(self, game, team):
+        return 5 if game.is_winner(team) else 0
+
+
+class RankingStrategyTestCase(TestCase):
+    def setUp(self):
+        self.barcelona = Team.objects.create(name="Barcelona")
+        self.madrid = Team.objects.create(name="Real Madrid")
+        self.sevilla = Team.objects.create(name="Sevilla")
+        self.valencia = Team.objects.create(name="Valencia")
+        Game.objects.create(
+            home_team=self.barcelona,
+            home_team_score=2,
+            away_team=self.madrid,
+            away_team_score=1,
+        )
+        Game.objects.create(
+            home_team=self.madrid,
+            home_team_score=1,
+            away_team=self.sevilla,
+            away_team_score=1,
+        )
+        Game.objects.create(
+            home_team=self.sevilla,
+            home_team_score=0,
+            away_team=self.barcelona,
+            away_team_score=3,
+        )
+
+    def test_aggregate_team_totals(self):
+        totals = aggregate_team_totals()
+        self.assertEqual(totals[self.barcelona.pk], (2, 2, 0, 0, 5, 1))
+        self.assertEqual(totals[self.madrid.pk], (2, 0, 1, 1, 2, 3))
+        self.assertEqual(totals[self.sevilla.pk], (2, 0, 1, 1, 1, 4))
+        self.assertNotIn(self.valencia.pk, totals)
+
+    def test_basic_ranking_strategy(self):
+        standings = BasicRankingStrategy().calculate_rankings(Team.objects.all())
+        self.assertEqual(
+            [(team.name, points) for team, points in standings],
+            [("Barcelona", 6), ("Real Madrid", 1), ("Sevilla", 1), ("Valencia", 0)],
+        )
+
+    def test_alternate_ranking_strategy(self):
+        standings = AlternateRankingStrategy().calculate_rankings(Team.objects.all())
+        self.assertEqual(
+            [(team.name, points) for team, points in standings],
+            [("Barcelona", 4), ("Real Madrid", 1), ("Sevilla", 1), ("Valencia", 0)],
+        )
+
+    def test_rankings_match_per_game_points(self):
+        strategy = BasicRankingStrategy()
+        for team, points in strategy.calculate_rankings(Team.objects.all()):
+            self.assertEqual(points, strategy.calculate_team_points(team))
+
+    def test_rankings_use_constant_number_of_queries(self):
+        teams = list(Team.objects.all())
+        with self.assertNumQueries(1):
+            BasicRankingStrategy().calculate_rankings(teams)
+
+    def test_legacy_strategy_without_weights(self):
+        standings = LegacyRankingStrategy().calculate_rankings(Team.objects.all())
+        self.assertEqual(standings[0], (self.barcelona, 10))
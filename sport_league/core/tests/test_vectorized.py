@@ -0,0 +1,148 @@
+import random
+
+from core.models import Game, Team
+from core.strategies import (
+    AlternateRankingStrategy,
+    BasicRankingStrategy,
+    RankingStrategy,
+    aggregate_team_totals,
+)
+from core.vectorized import GameArrays, PairwiseResults
+from core.vectorized import aggregate_team_totals as vectorized_team_totals
+from core.vectorized import calculate_rankings, team_points, team_totals_arrays
+from django.test import TestCase
+
+
+class VectorizedRankingTestCase(TestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        teams = [Team(name=f"Team {i:02d}") for i in range(12)]
+        Team.objects.bulk_create(teams)
+        teams = list(Team.objects.all())
+        Game.objects.bulk_create(
+            [
+                Game(
+                    home_team=home,
+                    home_team_score=rng.randint(0, 4),
+                    away_team=away,
+                    away_team_score=rng.randint(0, 4),
+                )
+                for home, away in (rng.sample(teams, 2) for _ in range(200))
+            ]
+        )
+        Team.objects.create(name="Team without games")
+
+    def test_team_totals_match_database_aggregation(self):
+        self.assertEqual(vectorized_team_totals(), aggregate_team_totals())
+
+    def test_rankings_match_current_strategies(self):
+        teams = Team.objects.all()
+        for strategy in (BasicRankingStrategy(), AlternateRankingStrategy()):
+            self.assertEqual(
+                calculate_rankings(strategy, teams), strategy.calculate_rankings(teams)
+            )
+
+    def test_what_if_results(self):
+        arrays = GameArrays.from_queryset()
+        home, away = Team.objects.order_by("pk")[:2]
+        extra = GameArrays.from_rows([(home.pk, away.pk, 5, 0)] * 3)
+        combined = arrays.concatenate(extra)
+        self.assertEqual(len(combined), len(arrays) + 3)
+
+        team_ids, totals = team_totals_arrays(combined)
+        _, base_totals = team_totals_arrays(arrays)
+        points = team_points(BasicRankingStrategy(), totals)
+        base_points = team_points(BasicRankingStrategy(), base_totals)
+        index = list(team_ids).index(home.pk)
+        self.assertEqual(points[index] - base_points[index], 9)
+
+    def test_strategy_without_weights(self):
+        with self.assertRaises(ValueError):
+            calculate_rankings(RankingStrategy(), Team.objects.all())
+
+
+class PairwiseResultsTestCase(TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        Team.objects.bulk_create([Team(name=f"Team {i:02d}") for i in range(6)])
+        self.teams = list(Team.objects.all())
+        Game.objects.bulk_create(
+            [
+                Game(
+                    home_team=home,
+                    home_team_score=rng.randint(0, 3),
+                    away_team=away,
+                    away_team_score=rng.randint(0, 3),
+                )
+                for home, away in (rng.sample(self.teams, 2) for _ in range(80))
+            ]
+        )
+
+    def test_records_match_games(self):
+        pairwise = PairwiseResults.from_queryset()
+        team, opponent = self.teams[:2]
+        games = [
+            (game.home_team_score, game.away_team_score)
+            if game.home_team_id == team.pk
+            else (game.away_team_score, game.home_team_score)
+            for game in Game.objects.filter(
+                home_team__in=[team, opponent], away_team__in=[team, opponent]
+            )
+        ]
+        record = pairwise.record(team.pk, opponent.pk)
+        self.assertEqual(record.played, len(games))
+        self.assertEqual(record.wins, sum(1 for f, a in games if f > a))
+        self.assertEqual(record.draws, sum(1 for f, a in games if f == a))
+        self.assertEqual(record.losses, sum(1 for f, a in games if f < a))
+        self.assertEqual(record.goals_for, sum(f for f, a in games))
+        self.assertEqual(record.goals_against, sum(a for f, a in games))
+        reverse = pairwise.record(opponent.pk, team.pk)
+        self.assertEqual(
+            (reverse.wins, reverse.losses, reverse.goals_for),
+            (record.losses, record.wins, record.goals_against),
+        )
+
+    def test_mini_league_of_all_teams_matches_totals(self):
+        pairwise = PairwiseResults.from_queryset()
+        totals = aggregate_team_totals()
+        strategy = BasicRankingStrategy()
+        table = pairwise.mini_league([team.pk for team in self.teams], (3, 1, 0))
+        for team in self.teams:
+            team_totals = totals[team.pk]
+            self.assertEqual(table[team.pk].points, strategy.points_for(team_totals))
+            self.assertEqual(
+                table[team.pk].goal_difference,
+                team_totals.goals_for - team_totals.goals_against,
+            )
+
+    def test_unknown_teams(self):
+        pairwise = PairwiseResults.from_arrays(GameArrays.from_rows([(1, 2, 1, 0)]))
+        self.assertEqual(pairwise.record(1, 3).played, 0)
+        self.assertEqual(pairwise.mini_league([1, 3], (3, 1, 0))[1].points, 0)
+        self.assertEqual(pairwise.mini_league([1, 2], (3, 1, 0))[1].points, 3)
+
+    def test_restricted_to_teams(self):
+        arrays = GameArrays.from_rows([(1, 2, 1, 0), (2, 3, 2, 2), (3, 1, 0, 4)])
+        pairwise = PairwiseResults.from_arrays(arrays, team_ids=[3, 1])
+        self.assertEqual(pairwise.team_ids.tolist(), [1, 3])
+        self.assertEqual(pairwise.wins.shape, (2, 2))
+        self.assertEqual(pairwise.record(1, 3).wins, 1)
+        self.assertEqual(pairwise.record(1, 2).played, 0)
+        team_ids = [team.pk for team in self.teams[:3]]
+        self.assertEqual(
+            PairwiseResults.from_queryset(team_ids=team_ids).mini_league(
+                team_ids, (3, 1, 0)
+            ),
+            PairwiseResults.from_queryset().mini_league(team_ids, (3, 1, 0)),
+        )
+
+    def test_vectorized_rankings_use_arrays_for_head_to_head(self):
+        strategy = RankingStrategy.from_spec(
+            "h2h",
+            {"points": {"win": 3, "draw": 1}, "tie_breakers": ["head_to_head"]},
+        )()
+        teams = list(Team.objects.all())
+        arrays = GameArrays.from_queryset()
+        with self.assertNumQueries(0):
+            standings = calculate_rankings(strategy, teams, arrays)
+        self.assertEqual(standings, strategy.calculate_rankings(teams))
@@ -1,8 +1,14 @@
+import json
+
 from core.models import Game, Team
 from core.serializers import GameSerializer
+from core.standings import verify_standings
+from core.tests.utils import QueryBudgetMixin
 from django.contrib.auth import authenticate, get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -60,7 +66,7 @@ class LoginViewTestCase(TestCase):
         self.assertContains(response, "Please enter a correct email and password.")
 
 
-class UploadGameViewTestCase(TestCase):
+class UploadGameViewTestCase(QueryBudgetMixin, TestCase):
     def setUp(self):
         self.client = Client()
         self.url = reverse("game:upload_game")
@@ -97,7 +103,7 @@ class UploadGameViewTestCase(TestCase):
         self.assertEqual(Game.objects.count(), 0)
 
 
-class TestRankingView(TestCase):
+class TestRankingView(QueryBudgetMixin, TestCase):
     def setUp(self):
         self.client = Client()
         user = User.objects.create_user("testuser", "testuser@example.com")
@@ -141,10 +147,27 @@ class TestRankingView(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.context["standings"]), 2)
         self.assertEqual(response.context["standings"][0][0].name, "Barcelona")
-        self.assertEqual(response.context["standings"][0][1], 3)
+        self.assertEqual(response.context["standings"][0][1], 2)
 
+    def test_ranking_as_of(self):
+        url = reverse("game:ranking_table")
+        self.client.login(username="testuser", password="Momohanaj2mf!")
+        game = Game.objects.get(home_team__name="Barcelona")
+        game.round = 1
+        with self.captureOnCommitCallbacks(execute=True):
+            game.save()
+        response = self.client.get(url, {"as_of": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.context["as_of"], 1)
+        self.assertEqual(response.context["last_round"], 1)
+        self.assertEqual(response.context["standings"][0][0].name, "Barcelona")
+        self.assertContains(response, "as_of=1")
 
-class GameListCreateAPIViewTestCase(APITestCase):
+        response = self.client.get(url, {"as_of": "x"})
+        self.assertIsNone(response.context["as_of"])
+
+
+class GameListCreateAPIViewTestCase(QueryBudgetMixin, APITestCase):
     def setUp(self):
         self.user = User.objects.create_user("testuser", "testuser@example.com")
         self.user.set_password("Momohanaj2mf!")
@@ -182,9 +205,68 @@ class GameListCreateAPIViewTestCase(APITestCase):
         response = self.client.get(url)
         games = Game.objects.all()
         serializer = GameSerializer(games, many=True)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
+        self.assertIsNone(response.data["next"])
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_get_games_by_cursor(self):
+        for score in range(4):
+            Game.objects.create(
+                home_team=self.team1,
+                away_team=self.team2,
+                home_team_score=score,
+                away_team_score=0,
+            )
+        url = reverse("game:game-list")
+        response = self.client.get(url, {"page_size": 2})
+        ids = [game["id"] for game in response.data["results"]]
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            ids += [game["id"] for game in response.data["results"]]
+        self.assertEqual(
+            ids, list(Game.objects.order_by("id").values_list("id", flat=True))
+        )
+
+    def test_stream_games(self):
+        Game.objects.create(
+            home_team=self.team2,
+            away_team=self.team1,
+            home_team_score=0,
+            away_team_score=0,
+        )
+        url = reverse("game:game-list")
+        serializer = GameSerializer(Game.objects.order_by("id"), many=True)
+
+        response = self.client.get(url, {"stream": "1"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            json.loads(b"".join(response.streaming_content)), serializer.data
+        )
+
+        response = self.client.get(url, {"stream": "ndjson"})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], serializer.data)
+
+        response = self.client.get(
+            url, {"stream": "1"}, HTTP_ACCEPT="application/x-ndjson"
+        )
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(response["Vary"], "Accept")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), len(serializer.data))
+
+        # A page is a single line.
+        response = self.client.get(url, HTTP_ACCEPT="application/x-ndjson")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.content.splitlines()), 1)
+
+    def test_stream_no_games(self):
+        Game.objects.all().delete()
+        response = self.client.get(reverse("game:game-list"), {"stream": "1"})
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), [])
+
     def test_create_valid_game(self):
         url = reverse("game:game-list")
         response = self.client.post(url, self.valid_payload, format="json")
@@ -203,7 +285,7 @@ class GameListCreateAPIViewTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
-class GameRetrieveUpdateDestroyAPIViewTestCase(APITestCase):
+class GameRetrieveUpdateDestroyAPIViewTestCase(QueryBudgetMixin, APITestCase):
     def setUp(self):
         self.user = User.objects.create_user("testuser", "testuser@example.com")
         self.user.set_password("Momohanaj2mf!")
@@ -259,3 +341,217 @@ class GameRetrieveUpdateDestroyAPIViewTestCase(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Game.objects.filter(pk=self.game.pk).exists())
+
+
+class GameBatchAPIViewTestCase(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("testuser", "testuser@example.com")
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("game:game-batch")
+        self.team1 = Team.objects.create(name="Team 1")
+        self.team2 = Team.objects.create(name="Team 2")
+        self.game1 = Game.objects.create(
+            home_team=self.team1,
+            home_team_score=1,
+            away_team=self.team2,
+            away_team_score=0,
+        )
+        self.game2 = Game.objects.create(
+            home_team=self.team2,
+            home_team_score=2,
+            away_team=self.team1,
+            away_team_score=2,
+        )
+
+    def test_apply_operations(self):
+        payload = [
+            {
+                "op": "create",
+                "home_team": {"name": "Team 3"},
+                "home_team_score": 3,
+                "away_team": {"name": "Team 1"},
+                "away_team_score": 0,
+            },
+            {"op": "update", "id": self.game1.pk, "away_team_score": 4},
+            {"op": "delete", "id": self.game2.pk},
+        ]
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual([result["status"] for result in results], [201, 200, 204])
+        created = Game.objects.get(pk=results[0]["data"]["id"])
+        self.assertEqual(created.home_team.name, "Team 3")
+        self.assertEqual(results[0]["data"]["away_team"]["name"], "Team 1")
+        self.assertEqual(results[1]["data"]["away_team_score"], 4)
+        self.game1.refresh_from_db()
+        self.assertEqual(self.game1.away_team_score, 4)
+        self.assertFalse(Game.objects.filter(pk=self.game2.pk).exists())
+        self.assertEqual(verify_standings(), [])
+
+    def test_invalid_operations_write_nothing(self):
+        payload = [
+            {"op": "update", "id": self.game1.pk, "home_team_score": 5},
+            {"op": "create", "home_team": {"name": "Team 3"}},
+            {"op": "delete", "id": 0},
+            {"op": "rename", "id": self.game1.pk},
+        ]
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        results = response.data["results"]
+        self.assertEqual([result["status"] for result in results], [424, 400, 400, 400])
+        self.assertIn("away_team", results[1]["errors"])
+        self.assertIn("id", results[2]["errors"])
+        self.assertIn("op", results[3]["errors"])
+        self.game1.refresh_from_db()
+        self.assertEqual(self.game1.home_team_score, 1)
+        self.assertFalse(Team.objects.filter(name="Team 3").exists())
+
+    def test_queries_do_not_depend_on_batch_size(self):
+        def count_queries(size):
+            payload = [
+                {
+                    "op": "create",
+                    "home_team": {"name": "Team 1"},
+                    "home_team_score": i,
+                    "away_team": {"name": "Team 2"},
+                    "away_team_score": 0,
+                }
+                for i in range(size)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, payload, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        self.assertEqual(count_queries(2), count_queries(50))
+
+
+class StandingsAPIViewTestCase(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("testuser", "testuser@example.com")
+        self.client.force_authenticate(user=self.user)
+        self.team1 = Team.objects.create(name="Team 1")
+        self.team2 = Team.objects.create(name="Team 2")
+        self.team3 = Team.objects.create(name="Team 3")
+        Game.objects.create(
+            home_team=self.team1,
+            home_team_score=1,
+            away_team=self.team3,
+            away_team_score=0,
+        )
+        Game.objects.create(
+            home_team=self.team2,
+            home_team_score=4,
+            away_team=self.team3,
+            away_team_score=0,
+        )
+        self.url = reverse("game:standings")
+
+    def test_default_strategy(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["strategy"]["name"], "basic")
+        self.assertEqual(
+            [(row["team"]["name"], row["points"]) for row in response.data["results"]],
+            [("Team 1", 3), ("Team 2", 3), ("Team 3", 0)],
+        )
+        self.assertQueryBudget(response)
+
+    def test_strategy_with_tie_breakers(self):
+        response = self.client.get(self.url, {"strategy": "league"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(
+            [row["team"]["name"] for row in results], ["Team 2", "Team 1", "Team 3"]
+        )
+        self.assertEqual(results[0]["position"], 1)
+        self.assertEqual(results[0]["goal_difference"], 4)
+        self.assertEqual(results[2]["played"], 2)
+
+    def test_as_of(self):
+        Game.objects.filter(away_team=self.team3).update(round=None)
+        with self.captureOnCommitCallbacks(execute=True):
+            for round_number, game in enumerate(Game.objects.order_by("pk"), 1):
+                game.round = round_number
+                game.save()
+        response = self.client.get(self.url, {"as_of": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["as_of"], response.data["last_round"]), (1, 2))
+        self.assertEqual(
+            [(row["team"]["name"], row["points"]) for row in response.data["results"]],
+            [("Team 1", 3), ("Team 3", 0)],
+        )
+        self.assertQueryBudget(response)
+
+        response = self.client.get(self.url, {"as_of": "first"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("as_of", response.data)
+
+    def test_unknown_strategy(self):
+        response = self.client.get(self.url, {"strategy": "unknown"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("strategy", response.data)
+
+    def test_strategy_list(self):
+        response = self.client.get(reverse("game:strategy-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        strategies = {strategy["name"]: strategy for strategy in response.data}
+        self.assertEqual(set(strategies), {"basic", "alternate", "league"})
+        self.assertEqual(strategies["alternate"]["points"]["win"], 2)
+        self.assertIn("head_to_head", strategies["league"]["tie_breakers"])
+
+
+class HeadToHeadAPIViewTestCase(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("testuser", "testuser@example.com")
+        self.client.force_authenticate(user=self.user)
+        self.team1 = Team.objects.create(name="Team 1")
+        self.team2 = Team.objects.create(name="Team 2")
+        self.team3 = Team.objects.create(name="Team 3")
+        for home, home_score, away, away_score in [
+            (self.team1, 2, self.team2, 0),
+            (self.team2, 1, self.team1, 1),
+            (self.team2, 3, self.team3, 0),
+            (self.team3, 5, self.team1, 0),
+        ]:
+            Game.objects.create(
+                home_team=home,
+                home_team_score=home_score,
+                away_team=away,
+                away_team_score=away_score,
+            )
+        self.url = reverse("game:head-to-head")
+
+    def test_two_teams(self):
+        response = self.client.get(
+            self.url, {"teams": f"{self.team2.pk},{self.team1.pk}"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        table = response.data["table"]
+        self.assertEqual([row["team"]["name"] for row in table], ["Team 1", "Team 2"])
+        self.assertEqual((table[0]["points"], table[0]["goal_difference"]), (4, 2))
+        record = response.data["records"][0]
+        self.assertEqual(
+            (record["team"], record["opponent"]), (self.team2.pk, self.team1.pk)
+        )
+        self.assertEqual(
+            (record["played"], record["wins"], record["draws"], record["losses"]),
+            (2, 0, 1, 1),
+        )
+        self.assertQueryBudget(response)
+
+    def test_three_teams_with_strategy(self):
+        teams = ",".join(str(team.pk) for team in (self.team1, self.team2, self.team3))
+        response = self.client.get(self.url, {"teams": teams, "strategy": "alternate"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row["team"]["name"], row["points"]) for row in response.data["table"]],
+            [("Team 2", 3), ("Team 1", 3), ("Team 3", 2)],
+        )
+        self.assertEqual(len(response.data["records"]), 6)
+
+    def test_invalid_teams(self):
+        for teams in ["", str(self.team1.pk), "1,a", f"{self.team1.pk},0"]:
+            response = self.client.get(self.url, {"teams": teams})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("teams", response.data)
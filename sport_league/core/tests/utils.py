@@ -0,0 +1,46 @@
+from core.instrumentation import get_query_budget, get_view_name
+from core.models import Game
+from django.test import override_settings
+
+
+class QueryBudgetMixin:
+    """
+    Makes every request of the test fail when its view runs more queries
+    than its ``QUERY_BUDGETS`` entry.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls._query_budgets = override_settings(QUERY_BUDGETS_ENFORCED=True)
+        cls._query_budgets.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._query_budgets.disable()
+
+    def assertQueryBudget(self, response, budget=None):
+        request = getattr(response, "wsgi_request", None) or response.asgi_request
+        view_name = get_view_name(request)
+        if budget is None:
+            budget = get_query_budget(view_name, request.method)
+        self.assertLessEqual(
+            request.metrics.queries,
+            budget,
+            f"{view_name} ran {request.metrics.queries} queries, "
+            f"its budget is {budget}.",
+        )
+
+
+def play(home, home_score, away, away_score, **kwargs):
+    """
+    Saves a game between two teams, sending the model signals.
+    """
+    return Game.objects.create(
+        home_team=home,
+        home_team_score=home_score,
+        away_team=away,
+        away_team_score=away_score,
+        **kwargs,
+    )
@@ -1,12 +1,22 @@
 from django.urls import path
 
+from . import async_views
 from .views import (
+    ExportAPIView,
+    GameBatchAPIView,
     GameListCreateAPIView,
     GameRetrieveUpdateDestroyAPIView,
+    HeadToHeadAPIView,
+    ImportJobRetrieveAPIView,
     LoginView,
     LogoutView,
+    RankingStrategyListAPIView,
     RegisterView,
+    SimulationAPIView,
+    StandingsAPIView,
+    TeamGamesAPIView,
     home,
+    import_job,
     ranking,
     upload_game,
 )
@@ -18,11 +28,47 @@ urlpatterns = [
     path("accounts/login/", LoginView.as_view(), name="login"),
     path("accounts/logout", LogoutView.as_view(), name="logout"),
     path("upload-game", upload_game, name="upload_game"),
+    path("import-jobs/<int:pk>", import_job, name="import_job"),
     path("ranking-table", ranking, name="ranking_table"),
     path("api/games/", GameListCreateAPIView.as_view(), name="game-list"),
+    path("api/games/batch/", GameBatchAPIView.as_view(), name="game-batch"),
     path(
         "api/games/<int:pk>/",
         GameRetrieveUpdateDestroyAPIView.as_view(),
         name="game-detail",
     ),
+    path("api/teams/<int:pk>/games/", TeamGamesAPIView.as_view(), name="team-games"),
+    path("api/standings/", StandingsAPIView.as_view(), name="standings"),
+    path("api/head-to-head/", HeadToHeadAPIView.as_view(), name="head-to-head"),
+    path("api/simulation/", SimulationAPIView.as_view(), name="simulation"),
+    path(
+        "api/export/games.<str:file_format>",
+        ExportAPIView.as_view(dataset="games"),
+        name="export-games",
+    ),
+    path(
+        "api/export/standings.<str:file_format>",
+        ExportAPIView.as_view(dataset="standings"),
+        name="export-standings",
+    ),
+    path("api/strategies/", RankingStrategyListAPIView.as_view(), name="strategy-list"),
+    path(
+        "api/import-jobs/<int:pk>/",
+        ImportJobRetrieveAPIView.as_view(),
+        name="import-job-detail",
+    ),
+    # Async versions of the read endpoints, see core.async_views
+    path("async/ranking-table", async_views.ranking, name="async-ranking_table"),
+    path("async/api/games/", async_views.game_list, name="async-game-list"),
+    path(
+        "async/api/games/<int:pk>/",
+        async_views.game_detail,
+        name="async-game-detail",
+    ),
+    path(
+        "async/api/teams/<int:pk>/games/",
+        async_views.team_games,
+        name="async-team-games",
+    ),
+    path("async/api/standings/", async_views.standings, name="async-standings"),
 ]
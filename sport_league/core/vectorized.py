@@ -0,0 +1,265 @@
+"""
+NumPy ranking backend.
+
+Games are loaded as flat integer arrays and the results of every team are
+computed with vectorized comparisons and ``bincount`` scatter-adds, which is
+what offline analyses over hundreds of thousands of games need. The
+team x team results used by head-to-head tie-breakers are built the same way.
+"""
+from collections import namedtuple
+from itertools import chain
+
+import numpy as np
+
+from .models import Game
+from .rules import EMPTY_TOTALS, TeamTotals
+
+GAME_ARRAY_FIELDS = (
+    "home_team_id",
+    "away_team_id",
+    "home_team_score",
+    "away_team_score",
+)
+
+MiniLeagueRow = namedtuple("MiniLeagueRow", ["points", "goal_difference", "goals_for"])
+
+
+class GameArrays(
+    namedtuple("GameArrays", ["home_ids", "away_ids", "home_scores", "away_scores"])
+):
+    """
+    Column arrays of game results, one entry per game.
+    """
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Builds the arrays from ``(home_id, away_id, home_score, away_score)``
+        tuples, e.g. hypothetical results for a what-if simulation.
+        """
+        flat = np.fromiter(chain.from_iterable(rows), dtype=np.int64)
+        columns = flat.reshape(-1, len(GAME_ARRAY_FIELDS)).T
+        return cls(*(np.ascontiguousarray(column) for column in columns))
+
+    @classmethod
+    def from_queryset(cls, queryset=None, chunk_size=10000):
+        if queryset is None:
+            queryset = Game.objects.all()
+        rows = queryset.values_list(*GAME_ARRAY_FIELDS).iterator(chunk_size=chunk_size)
+        return cls.from_rows(rows)
+
+    def __len__(self):
+        return len(self.home_ids)
+
+    def rows(self, chunk_size=10000):
+        """
+        Yields the games as ``(home_id, away_id, home_score, away_score)``
+        tuples of ints, converting ``chunk_size`` games at a time.
+        """
+        for start in range(0, len(self), chunk_size):
+            yield from zip(
+                *(column[start : start + chunk_size].tolist() for column in self)
+            )
+
+    def concatenate(self, other):
+        return GameArrays(
+            *(np.concatenate([mine, theirs]) for mine, theirs in zip(self, other))
+        )
+
+
+class PairwiseResults:
+    """
+    Pairwise (team x team) results, for head-to-head tie-breakers and reports.
+
+    Dense matrices indexed by team position hold the number of games a team
+    won against and drew with every other team, and the goals it scored
+    against it. They are filled in a single pass over the games with
+    scatter-adds, after which the record between two teams is a constant time
+    lookup and the mini-league of ``k`` teams a ``k x k`` slice. They take
+    ``3 * 4 * n * n`` bytes for ``n`` teams, so tie-breakers only build them
+    for the teams they have to separate.
+    """
+
+    def __init__(self, team_ids, wins, draws, goals):
+        self.team_ids = team_ids
+        self.index = {team_id: i for i, team_id in enumerate(team_ids.tolist())}
+        # wins[i, j]: games team i won against team j, draws[i, j] is
+        # symmetric and goals[i, j] counts the goals team i scored against j.
+        self.wins = wins
+        self.draws = draws
+        self.goals = goals
+
+    @classmethod
+    def from_arrays(cls, arrays, team_ids=None):
+        """
+        Builds the matrices from ``GameArrays``, counting only the games
+        played between ``team_ids`` when given.
+        """
+        if team_ids is None:
+            team_ids = np.unique(np.concatenate([arrays.home_ids, arrays.away_ids]))
+        else:
+            team_ids = np.unique(np.asarray(team_ids, dtype=np.int64))
+            among = np.isin(arrays.home_ids, team_ids) & np.isin(
+                arrays.away_ids, team_ids
+            )
+            arrays = GameArrays(*(column[among] for column in arrays))
+        size = len(team_ids)
+        home = np.searchsorted(team_ids, arrays.home_ids)
+        away = np.searchsorted(team_ids, arrays.away_ids)
+        home_won = arrays.home_scores > arrays.away_scores
+        away_won = arrays.home_scores < arrays.away_scores
+        drawn = ~(home_won | away_won)
+
+        wins = np.zeros((size, size), dtype=np.int32)
+        draws = np.zeros((size, size), dtype=np.int32)
+        goals = np.zeros((size, size), dtype=np.int32)
+        np.add.at(wins, (home[home_won], away[home_won]), 1)
+        np.add.at(wins, (away[away_won], home[away_won]), 1)
+        np.add.at(draws, (home[drawn], away[drawn]), 1)
+        np.add.at(draws, (away[drawn], home[drawn]), 1)
+        np.add.at(goals, (home, away), arrays.home_scores)
+        np.add.at(goals, (away, home), arrays.away_scores)
+        return cls(team_ids, wins, draws, goals)
+
+    @classmethod
+    def from_queryset(cls, queryset=None, chunk_size=10000, team_ids=None):
+        """
+        Builds the matrices with one query over ``queryset``, all games by
+        default, or the games of ``queryset`` played between ``team_ids``.
+        """
+        if queryset is None:
+            queryset = Game.objects.all()
+        if team_ids is not None:
+            team_ids = list(team_ids)
+            queryset = queryset.filter(home_team__in=team_ids, away_team__in=team_ids)
+        return cls.from_arrays(GameArrays.from_queryset(queryset, chunk_size), team_ids)
+
+    def record(self, team_id, opponent_id):
+        """
+        Returns the ``TeamTotals`` of ``team_id`` against ``opponent_id``.
+        """
+        i = self.index.get(team_id)
+        j = self.index.get(opponent_id)
+        if i is None or j is None:
+            return EMPTY_TOTALS
+        wins, draws, losses = (
+            int(self.wins[i, j]),
+            int(self.draws[i, j]),
+            int(self.wins[j, i]),
+        )
+        return TeamTotals(
+            wins + draws + losses,
+            wins,
+            draws,
+            losses,
+            int(self.goals[i, j]),
+            int(self.goals[j, i]),
+        )
+
+    def mini_league(self, team_ids, weights):
+        """
+        Returns ``{team_id: MiniLeagueRow}`` counting only the games played
+        between ``team_ids``, with ``(win, draw, loss)`` point ``weights``.
+        """
+        team_ids = list(team_ids)
+        known = [team_id for team_id in team_ids if team_id in self.index]
+        rows = dict.fromkeys(team_ids, MiniLeagueRow(0, 0, 0))
+        if len(known) < 2:
+            return rows
+        positions = np.array([self.index[team_id] for team_id in known])
+        group = np.ix_(positions, positions)
+        wins = self.wins[group].sum(axis=1)
+        draws = self.draws[group].sum(axis=1)
+        losses = self.wins[group].sum(axis=0)
+        scored = self.goals[group].sum(axis=1)
+        conceded = self.goals[group].sum(axis=0)
+        win, draw, loss = weights
+        points = wins * win + draws * draw + losses * loss
+        for team_id, row in zip(
+            known, zip(points.tolist(), (scored - conceded).tolist(), scored.tolist())
+        ):
+            rows[team_id] = MiniLeagueRow(*row)
+        return rows
+
+
+def team_totals_arrays(arrays, team_ids=None):
+    """
+    Returns ``(team_ids, totals)`` where ``totals`` is a ``(len(team_ids), 6)``
+    array whose columns follow ``TeamTotals``.
+
+    ``team_ids`` defaults to the sorted ids of the teams that played a game.
+    """
+    if team_ids is None:
+        team_ids = np.unique(np.concatenate([arrays.home_ids, arrays.away_ids]))
+    team_ids = np.asarray(team_ids, dtype=np.int64)
+    size = len(team_ids)
+    order = np.argsort(team_ids)
+    home = order[np.searchsorted(team_ids, arrays.home_ids, sorter=order)]
+    away = order[np.searchsorted(team_ids, arrays.away_ids, sorter=order)]
+
+    home_won = arrays.home_scores > arrays.away_scores
+    drawn = arrays.home_scores == arrays.away_scores
+    away_won = arrays.home_scores < arrays.away_scores
+
+    def count(indexes, mask=None):
+        if mask is not None:
+            indexes = indexes[mask]
+        return np.bincount(indexes, minlength=size)
+
+    def total(indexes, weights):
+        return np.bincount(indexes, weights=weights, minlength=size).astype(np.int64)
+
+    totals = np.column_stack(
+        [
+            count(home) + count(away),
+            count(home, home_won) + count(away, away_won),
+            count(home, drawn) + count(away, drawn),
+            count(home, away_won) + count(away, home_won),
+            total(home, arrays.home_scores) + total(away, arrays.away_scores),
+            total(home, arrays.away_scores) + total(away, arrays.home_scores),
+        ]
+    )
+    return team_ids, totals
+
+
+def team_points(strategy, totals):
+    """
+    Applies the win/draw/loss weights of ``strategy`` to a totals array.
+    """
+    weights = np.array(
+        [strategy.win_points, strategy.draw_points, strategy.loss_points],
+        dtype=np.int64,
+    )
+    return totals[:, 1:4] @ weights
+
+
+def aggregate_team_totals(arrays=None):
+    """
+    Same as ``core.strategies.aggregate_team_totals``, computed from arrays.
+    """
+    if arrays is None:
+        arrays = GameArrays.from_queryset()
+    team_ids, totals = team_totals_arrays(arrays)
+    return {
+        team_id: TeamTotals(*row)
+        for team_id, row in zip(team_ids.tolist(), totals.tolist())
+    }
+
+
+def calculate_rankings(strategy, teams, arrays=None):
+    """
+    Ranks ``teams`` with ``strategy`` using the NumPy backend.
+
+    The strategy must declare win/draw/loss weights; the result is the same
+    ``[(team, points)]`` list as ``RankingStrategy.calculate_rankings``, the
+    head-to-head tie-breakers being computed from the same arrays.
+    """
+    if not strategy.has_weights:
+        raise ValueError(
+            f"{type(strategy).__name__} does not declare win/draw/loss points."
+        )
+    if arrays is None:
+        arrays = GameArrays.from_queryset()
+    return strategy.calculate_rankings(
+        teams, totals=aggregate_team_totals(arrays), arrays=arrays
+    )
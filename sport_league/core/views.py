@@ -1,23 +1,52 @@
-import tablib
+import hashlib
+
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
-from django.http import Http404
-from django.shortcuts import redirect, render
+from django.db import transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
 from django.urls import reverse, reverse_lazy
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import FormView, RedirectView
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.throttling import UserRateThrottle
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 
+from .bulk import create_games, delete_games, resolve_team_ids, update_game_scores
+from .cache import cache_key, get_or_set, not_modified_response, request_etag
+from .exports import EXPORT_EXTENSIONS, EXPORT_FORMATS, EXPORTS
 from .forms import CustomUserCreationForm
-from .models import Game, Team
-from .resources import GameResource
-from .serializers import GameSerializer
-from .strategies import AlternateRankingStrategy, BasicRankingStrategy
+from .history import iter_team_history, team_history, team_summary
+from .importers import BulkGameImporter, iter_csv_rows
+from .jobs import enqueue_import
+from .models import Game, ImportJob, Team
+from .pagination import GameCursorPagination
+from .serializers import (
+    GameOperationSerializer,
+    GameRowSerializer,
+    GameSerializer,
+    ImportJobSerializer,
+    RankingEntrySerializer,
+    RankingStrategySerializer,
+    TeamSerializer,
+)
+from .simulation import simulate_season
+from .snapshots import get_ranking_as_of, last_round
+from .standings import GameResult, get_ranking
+from .strategies import DEFAULT_RANKING_STRATEGY, ranking_strategies
+from .streaming import NDJSONRenderer, is_streaming_request, streaming_response
+from .vectorized import PairwiseResults
+
+MAX_REPORTED_IMPORT_ERRORS = 20
 
 
 class RegisterView(FormView):
@@ -87,58 +116,463 @@ def home(request):
 def upload_game(request):
     if request.method == "POST" and request.FILES.get("csv_file"):
         csv_file = request.FILES["csv_file"]
-        resource = GameResource()
+        if csv_file.size > settings.GAME_IMPORT_BACKGROUND_THRESHOLD:
+            job = enqueue_import(csv_file, user=request.user)
+            return redirect(reverse("game:import_job", args=[job.pk]))
+        importer = BulkGameImporter(batch_size=settings.GAME_IMPORT_BATCH_SIZE)
         try:
-            dataset = tablib.Dataset().load(
-                csv_file.read().decode("utf-8"),
-                format="csv",
-                delimiter=",",
-                headers=False,
-            )
-            dataset.headers = [
-                "home_team",
-                "home_team_score",
-                "away_team",
-                "away_team_score",
-            ]
-            dataset.insert_col(0, col=lambda x: "", header="id")
-            result = resource.import_data(dataset, dry_run=False)
-            messages.success(request, "Games uploaded successfully.")
-            return redirect(reverse("game:ranking_table"))
+            result = importer.run(iter_csv_rows(csv_file.chunks()))
         except Exception as e:
             messages.error(request, f"Error uploading games: {e}")
+        else:
+            if not result.has_errors:
+                messages.success(
+                    request,
+                    f"{result.created} games uploaded successfully in "
+                    f"{result.duration:.2f}s ({result.rows_per_second:.0f} rows/s).",
+                )
+                return redirect(reverse("game:ranking_table"))
+            for error in result.errors[:MAX_REPORTED_IMPORT_ERRORS]:
+                messages.error(request, f"Line {error.line}: {error.message}")
+            if result.invalid > MAX_REPORTED_IMPORT_ERRORS:
+                messages.error(
+                    request,
+                    f"{result.invalid - MAX_REPORTED_IMPORT_ERRORS} more "
+                    f"invalid lines.",
+                )
 
     return render(request, "upload_game.html")
 
 
 @login_required
-def ranking(request):
-    strategy = BasicRankingStrategy()
-    if "ranking_strategy" in request.POST:
-        if request.POST["ranking_strategy"] == "alternate":
-            strategy = AlternateRankingStrategy()
+def import_job(request, pk):
+    job = get_object_or_404(ImportJob, pk=pk, user=request.user)
+    return render(request, "import_job.html", {"job": job})
+
+
+def parse_round(value):
+    """
+    Returns the round number of an ``as_of`` parameter, ``None`` when empty.
+
+    Raises ``ValueError`` when it is not a positive integer.
+    """
+    if value in (None, ""):
+        return None
+    round_number = int(value)
+    if round_number < 1:
+        raise ValueError(value)
+    return round_number
+
+
+def ranking_entries(strategy_name, as_of=None):
+    if as_of is None:
+        return get_ranking(strategy_name)
+    return get_ranking_as_of(strategy_name, as_of)
 
-    teams = Team.objects.all()
-    games = Game.objects.all()
-    standings = strategy.calculate_rankings(teams)
+
+def ranking_context(strategy_name, as_of=None):
+    entries = ranking_entries(strategy_name, as_of)
+    return {
+        "ranking": entries,
+        "standings": [(entry.team, entry.points) for entry in entries],
+    }
+
+
+@login_required
+def ranking(request):
+    strategy_name = request.POST.get("ranking_strategy") or request.GET.get(
+        "ranking_strategy", DEFAULT_RANKING_STRATEGY
+    )
+    strategies = ranking_strategies()
+    if strategy_name not in strategies:
+        strategy_name = DEFAULT_RANKING_STRATEGY
+    try:
+        as_of = parse_round(request.GET.get("as_of"))
+    except ValueError:
+        as_of = None
 
     if request.is_ajax():
-        return render(
-            request, "ranking_table.html", {"standings": standings, "games": games}
+        content = get_or_set(
+            cache_key("ranking", strategy_name, as_of, "partial"),
+            lambda: render_to_string(
+                "ranking_table.html",
+                {"ranking": ranking_entries(strategy_name, as_of)},
+            ),
         )
+        return HttpResponse(content)
 
-    return render(
-        request, "ranking_table_page.html", {"standings": standings, "games": games}
+    context = get_or_set(
+        cache_key("ranking", strategy_name, as_of, "page"),
+        lambda: {**ranking_context(strategy_name, as_of), "last_round": last_round()},
     )
+    context = {
+        **context,
+        "strategy": strategy_name,
+        "as_of": as_of,
+        "live_url": settings.LIVE_STANDINGS_PATH,
+        "poll_interval": settings.LIVE_STANDINGS_POLL_INTERVAL,
+        "strategies": RankingStrategySerializer(strategies.items(), many=True).data,
+    }
+    return render(request, "ranking_table_page.html", context)
+
+
+class RankingStrategyListAPIView(APIView):
+    """
+    Lists the ranking strategies that can be passed to ``StandingsAPIView``.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(
+            RankingStrategySerializer(ranking_strategies().items(), many=True).data
+        )
+
+
+class StandingsAPIView(APIView):
+    """
+    The ranking of every team for ``?strategy=<name>``, best team first.
+
+    With ``?as_of=<round>`` the ranking is the one after that round, counting
+    only the games with a round.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        strategy_name = request.query_params.get("strategy", DEFAULT_RANKING_STRATEGY)
+        strategies = ranking_strategies()
+        if strategy_name not in strategies:
+            raise ValidationError(
+                {"strategy": [f"Expected one of {', '.join(strategies)}."]}
+            )
+        try:
+            as_of = parse_round(request.query_params.get("as_of"))
+        except ValueError:
+            raise ValidationError({"as_of": ["Expected a positive round number."]})
+
+        etag = request_etag(request)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        def get_data():
+            entries = ranking_entries(strategy_name, as_of)
+            return {
+                "strategy": RankingStrategySerializer(
+                    (strategy_name, strategies[strategy_name])
+                ).data,
+                "as_of": as_of,
+                "last_round": last_round(),
+                "results": [
+                    {"position": position, **row}
+                    for position, row in enumerate(
+                        RankingEntrySerializer(entries, many=True).data, 1
+                    )
+                ],
+            }
+
+        response = Response(
+            get_or_set(cache_key("standings", strategy_name, as_of), get_data)
+        )
+        response["ETag"] = etag
+        return response
+
+
+class HeadToHeadAPIView(APIView):
+    """
+    Head-to-head records between ``?teams=<id>,<id>,...`` and the mini-league
+    table of the games they played against each other.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get_team_ids(self, request):
+        try:
+            team_ids = [
+                int(value)
+                for value in request.query_params.get("teams", "").split(",")
+                if value
+            ]
+        except ValueError:
+            raise ValidationError({"teams": ["Expected a comma-separated id list."]})
+        team_ids = list(dict.fromkeys(team_ids))
+        if not 2 <= len(team_ids) <= settings.API_MAX_HEAD_TO_HEAD_TEAMS:
+            raise ValidationError(
+                {
+                    "teams": [
+                        f"Expected between 2 and "
+                        f"{settings.API_MAX_HEAD_TO_HEAD_TEAMS} teams."
+                    ]
+                }
+            )
+        return team_ids
+
+    def get(self, request):
+        team_ids = self.get_team_ids(request)
+        strategy_name = request.query_params.get("strategy", DEFAULT_RANKING_STRATEGY)
+        strategies = ranking_strategies()
+        if strategy_name not in strategies:
+            raise ValidationError(
+                {"strategy": [f"Expected one of {', '.join(strategies)}."]}
+            )
+        teams = Team.objects.in_bulk(team_ids)
+        missing = [team_id for team_id in team_ids if team_id not in teams]
+        if missing:
+            raise ValidationError(
+                {"teams": [f"Unknown team ids: {', '.join(map(str, missing))}."]}
+            )
+
+        etag = request_etag(request)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        def get_data():
+            strategy = strategies[strategy_name]
+            pairwise = PairwiseResults.from_queryset(team_ids=team_ids)
+            table = pairwise.mini_league(team_ids, strategy.rules.weights)
+            order = sorted(
+                team_ids,
+                key=lambda team_id: (
+                    -table[team_id].points,
+                    -table[team_id].goal_difference,
+                    -table[team_id].goals_for,
+                    teams[team_id].name,
+                ),
+            )
+            return {
+                "strategy": strategy_name,
+                "table": [
+                    {
+                        "position": position,
+                        "team": TeamSerializer(teams[team_id]).data,
+                        **table[team_id]._asdict(),
+                    }
+                    for position, team_id in enumerate(order, 1)
+                ],
+                "records": [
+                    {
+                        "team": team_id,
+                        "opponent": opponent_id,
+                        **pairwise.record(team_id, opponent_id)._asdict(),
+                    }
+                    for team_id in team_ids
+                    for opponent_id in team_ids
+                    if team_id != opponent_id
+                ],
+            }
+
+        response = Response(
+            get_or_set(cache_key("head-to-head", strategy_name, *team_ids), get_data)
+        )
+        response["ETag"] = etag
+        return response
+
+
+def fixtures_digest(fixtures):
+    """
+    Returns a short digest of ``(home_team_id, away_team_id)`` pairs, for the
+    cache keys of the simulations.
+    """
+    if fixtures is None:
+        return "all"
+    pairs = ",".join(f"{home}:{away}" for home, away in fixtures)
+    return hashlib.md5(pairs.encode()).hexdigest()[:16]
+
+
+class SimulationRateThrottle(UserRateThrottle):
+    """
+    Limits the simulations requested by a user, whatever their seed.
+    """
+
+    scope = "simulation"
+
+    def get_rate(self):
+        return settings.API_SIMULATION_RATE
+
+
+class SimulationAPIView(APIView):
+    """
+    The finishing position probabilities of every team, from
+    ``?simulations=<n>`` Monte Carlo simulations of the rest of the season
+    ranked with ``?strategy=<name>``. ``?seed=<n>`` makes them reproducible.
+    ``?fixtures=<home_id>:<away_id>,...`` gives the games left to play, the
+    missing games of a double round-robin by default.
+
+    The seasons are simulated in the request thread, without a process pool,
+    and the requests of a user are throttled by ``API_SIMULATION_RATE``.
+    """
+
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [SimulationRateThrottle]
+
+    def get_int(self, request, name, default, minimum, maximum=None):
+        value = request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            value = None
+        if value is None or value < minimum or (maximum and value > maximum):
+            bounds = f"between {minimum} and {maximum}" if maximum else f">= {minimum}"
+            raise ValidationError({name: [f"Expected an integer {bounds}."]})
+        return value
+
+    def get_fixtures(self, request):
+        value = request.query_params.get("fixtures")
+        if value is None:
+            return None
+        try:
+            fixtures = [
+                tuple(int(team_id) for team_id in pair.split(":"))
+                for pair in value.split(",")
+                if pair
+            ]
+        except ValueError:
+            fixtures = None
+        if (
+            not fixtures
+            or any(len(pair) != 2 for pair in fixtures)
+            or len(fixtures) > settings.API_MAX_SIMULATION_FIXTURES
+        ):
+            raise ValidationError(
+                {
+                    "fixtures": [
+                        "Expected between 1 and "
+                        f"{settings.API_MAX_SIMULATION_FIXTURES} comma separated "
+                        "<home_team_id>:<away_team_id> pairs."
+                    ]
+                }
+            )
+        return fixtures
+
+    def get(self, request):
+        strategy_name = request.query_params.get("strategy", DEFAULT_RANKING_STRATEGY)
+        strategies = ranking_strategies()
+        if strategy_name not in strategies:
+            raise ValidationError(
+                {"strategy": [f"Expected one of {', '.join(strategies)}."]}
+            )
+        if not strategies[strategy_name].has_weights:
+            raise ValidationError(
+                {"strategy": ["This strategy does not declare win/draw/loss points."]}
+            )
+        simulations = self.get_int(
+            request,
+            "simulations",
+            settings.API_SIMULATIONS,
+            1,
+            settings.API_MAX_SIMULATIONS,
+        )
+        seed = self.get_int(request, "seed", 0, 0)
+        fixtures = self.get_fixtures(request)
+
+        etag = request_etag(request)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        def get_data():
+            try:
+                result = simulate_season(
+                    strategies[strategy_name],
+                    simulations,
+                    fixtures=fixtures,
+                    workers=1,
+                    seed=seed,
+                )
+            except ValueError as e:
+                raise ValidationError({"non_field_errors": [str(e)]})
+            return {
+                "strategy": strategy_name,
+                **result.as_dict(settings.SIMULATION_RELEGATION_PLACES),
+            }
+
+        response = Response(
+            get_or_set(
+                cache_key(
+                    "simulation",
+                    strategy_name,
+                    simulations,
+                    seed,
+                    fixtures_digest(fixtures),
+                ),
+                get_data,
+            )
+        )
+        response["ETag"] = etag
+        return response
+
+
+class ExportAPIView(APIView):
+    """
+    Streams all the games, or the standings of ``?strategy=<name>``, as a CSV
+    file or as a columnar file, see ``core.exports``.
+    """
+
+    permission_classes = [IsAuthenticated]
+    dataset = None
+
+    def get(self, request, file_format):
+        if file_format not in EXPORT_FORMATS:
+            raise Http404
+        if self.dataset == "standings":
+            strategy_name = request.query_params.get(
+                "strategy", DEFAULT_RANKING_STRATEGY
+            )
+            strategies = ranking_strategies()
+            if strategy_name not in strategies:
+                raise ValidationError(
+                    {"strategy": [f"Expected one of {', '.join(strategies)}."]}
+                )
+            content = EXPORTS[self.dataset, file_format](strategy_name)
+        else:
+            content = EXPORTS[self.dataset, file_format]()
+        response = StreamingHttpResponse(
+            content, content_type=EXPORT_FORMATS[file_format]
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="{self.dataset}.{EXPORT_EXTENSIONS[file_format]}"'
+        return response
 
 
 class GameListCreateAPIView(APIView):
+    """
+    Lists the games a page at a time with an ``id`` cursor, or all of them as
+    a streamed JSON array with ``?stream=1`` (NDJSON with ``?stream=ndjson``).
+    """
+
     permission_classes = [IsAuthenticated]
+    pagination_class = GameCursorPagination
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
 
     def get(self, request):
-        games = Game.objects.all()
-        serializer = GameSerializer(games, many=True)
-        return Response(serializer.data)
+        etag = request_etag(request)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        games = GameRowSerializer.rows(Game.objects.all())
+        if is_streaming_request(request):
+            response = streaming_response(
+                request, games.order_by("id"), GameRowSerializer.to_representation
+            )
+        else:
+            response = Response(
+                get_or_set(
+                    cache_key("games", request.build_absolute_uri()),
+                    lambda: self.get_page_data(request, games),
+                )
+            )
+        response["ETag"] = etag
+        return response
+
+    def get_page_data(self, request, games):
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(games, request, view=self)
+        serializer = GameRowSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data).data
 
     def post(self, request):
         serializer = GameSerializer(data=request.data)
@@ -148,19 +582,219 @@ class GameListCreateAPIView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class GameBatchAPIView(APIView):
+    """
+    Applies a list of create/update/delete operations in one transaction.
+
+    All the items are validated first and the referenced games and teams are
+    fetched with one query each; nothing is written when any item is invalid.
+    The response lists the result of every item in the order of the request.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not isinstance(request.data, list):
+            return Response(
+                {"non_field_errors": ["Expected a list of operations."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(request.data) > settings.API_MAX_BATCH_SIZE:
+            return Response(
+                {
+                    "non_field_errors": [
+                        f"A batch may not contain more than "
+                        f"{settings.API_MAX_BATCH_SIZE} operations."
+                    ]
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        items = [GameOperationSerializer(data=data) for data in request.data]
+        errors = {i: item.errors for i, item in enumerate(items) if not item.is_valid()}
+        operations = {
+            i: item.validated_data for i, item in enumerate(items) if i not in errors
+        }
+
+        ids = [op["id"] for op in operations.values() if "id" in op]
+        games = Game.objects.select_related("home_team", "away_team").in_bulk(ids)
+        seen = set()
+        for i, op in operations.items():
+            if op["op"] == GameOperationSerializer.CREATE:
+                continue
+            if op["id"] not in games:
+                errors[i] = {"id": ["Not found."]}
+            elif op["id"] in seen:
+                errors[i] = {"id": ["This game is already changed by the batch."]}
+            seen.add(op["id"])
+
+        if errors:
+            results = [
+                {"index": i, "status": status.HTTP_400_BAD_REQUEST, "errors": errors[i]}
+                if i in errors
+                else {"index": i, "status": status.HTTP_424_FAILED_DEPENDENCY}
+                for i in range(len(items))
+            ]
+            return Response({"results": results}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"results": self.apply(operations, games)})
+
+    def apply(self, operations, games):
+        creates, updates, deletes = {}, {}, {}
+        for i, op in operations.items():
+            if op["op"] == GameOperationSerializer.CREATE:
+                creates[i] = op
+            elif op["op"] == GameOperationSerializer.UPDATE:
+                game = games[op["id"]]
+                game.home_team_score = op.get("home_team_score", game.home_team_score)
+                game.away_team_score = op.get("away_team_score", game.away_team_score)
+                updates[i] = game
+            else:
+                deletes[i] = op["id"]
+
+        with transaction.atomic():
+            team_ids = resolve_team_ids(
+                name
+                for op in creates.values()
+                for name in (op["home_team"]["name"], op["away_team"]["name"])
+            )
+            teams = {name: Team(pk=pk, name=name) for name, pk in team_ids.items()}
+            created = create_games(
+                GameResult(
+                    team_ids[op["home_team"]["name"]],
+                    op["home_team_score"],
+                    team_ids[op["away_team"]["name"]],
+                    op["away_team_score"],
+                )
+                for op in creates.values()
+            )
+            update_game_scores(list(updates.values()))
+            delete_games(Game.objects.filter(pk__in=deletes.values()))
+
+        for game, op in zip(created, creates.values()):
+            game.home_team = teams[op["home_team"]["name"]]
+            game.away_team = teams[op["away_team"]["name"]]
+        results = {}
+        for i, game in zip(creates, created):
+            results[i] = {"status": status.HTTP_201_CREATED, "data": game}
+        for i, game in updates.items():
+            results[i] = {"status": status.HTTP_200_OK, "data": game}
+        for i, pk in deletes.items():
+            results[i] = {"status": status.HTTP_204_NO_CONTENT, "id": pk}
+        for result in results.values():
+            if "data" in result:
+                result["data"] = GameSerializer(result["data"]).data
+        return [{"index": i, **results[i]} for i in sorted(results)]
+
+
+class TeamGamesAPIView(APIView):
+    """
+    Games of a team, most recent first, a page at a time.
+
+    ``?opponent=<id>`` restricts them to the head-to-head games against
+    another team. The first page also carries a summary of the results: form,
+    streaks, record and goals.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get_int_param(self, request, name, default=None, maximum=None):
+        value = request.query_params.get(name)
+        if value is None:
+            return default
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValidationError({name: ["A valid integer is required."]})
+        if value < 1:
+            raise ValidationError({name: ["Ensure this value is greater than 0."]})
+        return min(value, maximum) if maximum else value
+
+    def get(self, request, pk):
+        etag = request_etag(request)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        team = get_object_or_404(Team, pk=pk)
+        opponent = request.query_params.get("opponent")
+        if opponent is not None:
+            opponent = get_object_or_404(
+                Team, pk=self.get_int_param(request, "opponent")
+            )
+        page_size = self.get_int_param(
+            request,
+            "page_size",
+            default=settings.API_PAGE_SIZE,
+            maximum=settings.API_MAX_PAGE_SIZE,
+        )
+        cursor = self.get_int_param(request, "cursor")
+        opponent_id = opponent.pk if opponent else None
+
+        rows = list(
+            iter_team_history(
+                team_history(team.pk, opponent_id=opponent_id, before=cursor)[
+                    : page_size + 1
+                ]
+            )
+        )
+        next_url = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_url = replace_query_param(
+                request.build_absolute_uri(), "cursor", rows[-1].id
+            )
+
+        data = {
+            "team": TeamSerializer(team).data,
+            "opponent": TeamSerializer(opponent).data if opponent else None,
+            "next": next_url,
+            "results": [
+                {
+                    "id": row.id,
+                    "venue": row.venue,
+                    "opponent": {"id": row.opponent_id, "name": row.opponent_name},
+                    "goals_for": row.goals_for,
+                    "goals_against": row.goals_against,
+                    "result": row.result,
+                }
+                for row in rows
+            ],
+        }
+        if cursor is None:
+            data["summary"] = team_summary(team.pk, opponent_id=opponent_id)
+        return Response(data, headers={"ETag": etag})
+
+
+class ImportJobRetrieveAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        job = get_object_or_404(ImportJob, pk=pk, user=request.user)
+        serializer = ImportJobSerializer(job)
+        return Response(serializer.data)
+
+
 class GameRetrieveUpdateDestroyAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self, pk):
         try:
-            return Game.objects.get(pk=pk)
+            return Game.objects.select_related("home_team", "away_team").get(pk=pk)
         except Game.DoesNotExist:
             raise Http404
 
     def get(self, request, pk):
-        game = self.get_object(pk)
-        serializer = GameSerializer(game)
-        return Response(serializer.data)
+        etag = request_etag(request)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        game = GameRowSerializer.rows(Game.objects.filter(pk=pk)).first()
+        if game is None:
+            raise Http404
+        serializer = GameRowSerializer(game)
+        return Response(serializer.data, headers={"ETag": etag})
 
     def put(self, request, pk):
         game = self.get_object(pk)
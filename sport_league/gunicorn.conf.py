@@ -0,0 +1,29 @@
+"""
+Gunicorn settings of the production profile (SERVER_PROFILE=production).
+
+The workers are uvicorn ones serving the ASGI application, which also
+carries the live standings stream and the async endpoints. The application is
+imported once in the master process and the workers are forked from it.
+"""
+import multiprocessing
+import os
+
+wsgi_app = "sport_league.asgi:application"
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+preload_app = True
+# Recycle the workers now and then to bound the growth of their memory.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = max_requests // 10
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+
+
+def post_fork(server, worker):
+    # Connections opened while preloading must not be shared by the workers.
+    from django.db import connections
+
+    connections.close_all()
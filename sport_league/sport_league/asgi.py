@@ -2,6 +2,9 @@
 ASGI config for sport_league project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The live standings stream is served by ``core.live.LiveStandingsMiddleware``
+around the Django application, whose streamed responses are produced in
+worker threads by ``core.async_views.StreamingASGIHandler``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -9,8 +12,14 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sport_league.settings")
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+# The imports below need the app registry.
+from core.async_views import StreamingASGIHandler  # noqa: E402
+from core.live import LiveStandingsMiddleware  # noqa: E402
+
+application = LiveStandingsMiddleware(StreamingASGIHandler())
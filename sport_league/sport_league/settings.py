@@ -13,6 +13,7 @@ import os
 from pathlib import Path
 
 import environ
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -38,6 +39,13 @@ DEBUG = env("DEBUG")
 
 ALLOWED_HOSTS = tuple(env.list("ALLOWED_HOSTS", default=["*"]))
 
+# "development" runs manage.py runserver, "production" a preloaded multi-worker
+# gunicorn server (gunicorn.conf.py) with persistent database connections
+SERVER_PROFILE = env("SERVER_PROFILE", default="development")
+if SERVER_PROFILE not in ("development", "production"):
+    raise ImproperlyConfigured(f"Unknown SERVER_PROFILE {SERVER_PROFILE!r}.")
+PRODUCTION = SERVER_PROFILE == "production"
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -57,6 +65,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.instrumentation.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -70,7 +79,7 @@ ROOT_URLCONF = "sport_league.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "core.instrumentation.InstrumentedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -94,8 +103,56 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Seconds a connection is kept open between requests, 0 to close it at
+        # the end of every request
+        "CONN_MAX_AGE": env.int("CONN_MAX_AGE", default=600 if PRODUCTION else 0),
     }
 }
+# Check that the persistent connections still work at the start of every
+# request, see core.database
+DB_HEALTH_CHECKS = env.bool("DB_HEALTH_CHECKS", default=PRODUCTION)
+# PRAGMA statements run on every new SQLite connection: write-ahead logging so
+# that readers do not block the writer, fewer fsyncs, memory-mapped reads and
+# a larger page cache (negative sizes are in KiB)
+SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "mmap_size": env.int("SQLITE_MMAP_SIZE", default=256 * 1024 * 1024),
+    "cache_size": env.int("SQLITE_CACHE_SIZE", default=-64 * 1024),
+    "busy_timeout": 5000,
+}
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.instrumentation.InstrumentedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
+# Cache
+# Any Django cache backend can be selected with CACHE_URL, e.g.
+# memcache://127.0.0.1:11211 or dbcache://cache_table. The workers of the
+# production profile must share it, or each one keeps its own league version,
+# cached rankings and ETags: the default is then the database cache, whose
+# table entrypoint.sh creates, and a local-memory cache is refused.
+
+CACHES = {
+    "default": env.cache(
+        "CACHE_URL",
+        default="dbcache://league_cache"
+        if PRODUCTION
+        else "locmemcache://sport-league",
+    )
+}
+if PRODUCTION and CACHES["default"]["BACKEND"].endswith(".LocMemCache"):
+    raise ImproperlyConfigured(
+        "The production profile needs a cache shared by the gunicorn workers, "
+        "set CACHE_URL to a memcache, redis or dbcache URL."
+    )
+
+# Cache holding the league version and the cached rankings and game lists
+LEAGUE_CACHE_ALIAS = "default"
+LEAGUE_CACHE_TIMEOUT = env.int("LEAGUE_CACHE_TIMEOUT", default=300)
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -146,6 +203,117 @@ MEDIA_ROOT = BASE_DIR / "uploads"
 
 AUTH_USER_MODEL = "core.User"
 
+# Default and maximum number of items per page of the paginated API lists
+API_PAGE_SIZE = env.int("API_PAGE_SIZE", default=100)
+API_MAX_PAGE_SIZE = env.int("API_MAX_PAGE_SIZE", default=1000)
+# Maximum number of operations sent at once to the games batch endpoint
+API_MAX_BATCH_SIZE = env.int("API_MAX_BATCH_SIZE", default=1000)
+# Maximum number of teams compared at once by the head-to-head endpoint
+API_MAX_HEAD_TO_HEAD_TEAMS = env.int("API_MAX_HEAD_TO_HEAD_TEAMS", default=20)
+# Default and maximum number of seasons simulated by the simulation endpoint,
+# in the request thread, the maximum number of fixtures it is given, and the
+# number of simulations a user may request, e.g. "10/min"
+API_SIMULATIONS = env.int("API_SIMULATIONS", default=2_000)
+API_MAX_SIMULATIONS = env.int("API_MAX_SIMULATIONS", default=10_000)
+API_MAX_SIMULATION_FIXTURES = env.int("API_MAX_SIMULATION_FIXTURES", default=1000)
+API_SIMULATION_RATE = env("API_SIMULATION_RATE", default="10/min")
+# Admin changelists estimate the size of unfiltered tables larger than this
+ADMIN_ESTIMATED_COUNT_THRESHOLD = env.int(
+    "ADMIN_ESTIMATED_COUNT_THRESHOLD", default=10_000
+)
+# Number of rows fetched and written at once by the streamed API lists
+API_STREAM_CHUNK_SIZE = env.int("API_STREAM_CHUNK_SIZE", default=2000)
+
+# Number of uploaded CSV rows validated and inserted at once
+GAME_IMPORT_BATCH_SIZE = env.int("GAME_IMPORT_BATCH_SIZE", default=1000)
+# Uploads larger than this many bytes are imported by `manage.py run_import_worker`
+GAME_IMPORT_BACKGROUND_THRESHOLD = env.int(
+    "GAME_IMPORT_BACKGROUND_THRESHOLD", default=5 * 1024 * 1024
+)
+# Seconds after which a running import job without progress is claimed again
+GAME_IMPORT_JOB_TIMEOUT = env.int("GAME_IMPORT_JOB_TIMEOUT", default=300)
+
+
+# Ranking strategies selectable by name on top of the built-in "basic" and
+# "alternate" ones. Tie-breakers are applied in order, see core.rules.
+RANKING_STRATEGIES = {
+    "league": {
+        "label": "League (3/1/0, goal difference, head-to-head)",
+        "points": {"win": 3, "draw": 1, "loss": 0},
+        "tie_breakers": ["goal_difference", "goals_for", "head_to_head", "wins"],
+    },
+}
+
+# Every how many rounds the standings snapshots store the full table rather
+# than the changes of the round, see core.snapshots
+STANDINGS_KEYFRAME_INTERVAL = env.int("STANDINGS_KEYFRAME_INTERVAL", default=10)
+
+# Elo ratings of the teams, see core.ratings: rating of a new team, largest
+# change after one game, and rating points added to the home team when
+# computing the expected result
+RATING_INITIAL = env.float("RATING_INITIAL", default=1500.0)
+RATING_K_FACTOR = env.float("RATING_K_FACTOR", default=20.0)
+RATING_HOME_ADVANTAGE = env.float("RATING_HOME_ADVANTAGE", default=50.0)
+# Every how many games a replay of the ratings stores the ratings of all the
+# teams, the points later replays start from
+RATING_CHECKPOINT_INTERVAL = env.int("RATING_CHECKPOINT_INTERVAL", default=1000)
+
+# Snapshot of the games read by analytics processes, see core.store
+GAME_STORE_PATH = env("GAME_STORE_PATH", default=str(BASE_DIR / "games.store"))
+
+# Processes simulating the rest of the season, all CPUs when unset, and the
+# number of bottom places counted as relegation, see core.simulation
+SIMULATION_WORKERS = env.int("SIMULATION_WORKERS", default=None)
+SIMULATION_RELEGATION_PLACES = env.int("SIMULATION_RELEGATION_PLACES", default=3)
+
+# Server-Sent Events stream of the standings served under ASGI, see core.live
+LIVE_STANDINGS_PATH = "/live/standings/"
+# Seconds between the keep-alive comments of an idle stream, which also look
+# for writes handled by other server processes
+LIVE_STANDINGS_KEEPALIVE = env.int("LIVE_STANDINGS_KEEPALIVE", default=15)
+# Events queued for a slow client before it is sent the whole table instead
+LIVE_STANDINGS_QUEUE_SIZE = 100
+# Seconds between two reloads of the ranking when the stream is unavailable,
+# e.g. under WSGI
+LIVE_STANDINGS_POLL_INTERVAL = env.int("LIVE_STANDINGS_POLL_INTERVAL", default=30)
+
+
+# Maximum number of SQL queries per request of a view, by URL name, either for
+# every method or per method, the queries producing streamed content included.
+# Exceeding a budget logs a warning, or raises when QUERY_BUDGETS_ENFORCED
+# (tests).
+QUERY_BUDGETS = {
+    "game:ranking_table": 6,
+    "game:upload_game": 30,
+    "game:game-list": {"GET": 5, "POST": 24},
+    "game:game-detail": {"GET": 4, "PUT": 16, "PATCH": 16, "DELETE": 14},
+    "game:game-batch": 52,
+    "game:team-games": 6,
+    "game:standings": 4,
+    "game:strategy-list": 2,
+    "game:head-to-head": 4,
+    "game:simulation": 4,
+    "game:export-games": 10,
+    "game:export-standings": 3,
+    "game:async-ranking_table": 6,
+    "game:async-game-list": 5,
+    "game:async-game-detail": 4,
+    "game:async-team-games": 6,
+    "game:async-standings": 4,
+}
+QUERY_BUDGETS_ENFORCED = env.bool("QUERY_BUDGETS_ENFORCED", default=False)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "core.performance": {
+            "handlers": ["console"],
+            "level": env("PERFORMANCE_LOG_LEVEL", default="WARNING"),
+        },
+    },
+}
 
 # Override configs from local.py file
 try: